@@ -1,8 +1,307 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+from __future__ import annotations
 
+import os
 
-dataframe = pd.read_csv('datasets/dataset.csv')
+# numpy, pandas и matplotlib импортируются в функциях: импорт analytics не загружает их,
+# пока данные не понадобятся
+
+from modules.aggregates import Aggregate, load_cube
+from modules.parallel import load_table_parallel
+from modules.table import COLUMNS, MISSING, WIND_DIRECTIONS, load_table, parse_number, parse_wind
+
+# Порядковый номер 1970-01-01: переводит порядковые номера дат в дни эпохи datetime64
+EPOCH_ORDINAL = 719163
+# Колонки файла данных в том порядке, в котором они записаны
+RAW_COLUMNS = ["date", "temp_morning", "pressure_morning", "wind_morning",
+               "temp_evening", "pressure_evening", "wind_evening"]
+CSV_OPTIONS = dict(header=None, names=RAW_COLUMNS, dtype=str, keep_default_na=False, na_filter=False)
+# Предел памяти на одну часть файла в потоковом режиме; задаётся переменной окружения ANALYTICS_MEMORY_LIMIT
+MEMORY_LIMIT = int(os.environ.get("ANALYTICS_MEMORY_LIMIT", 64 << 20))
+# Оценка памяти на строку при разборе части: около 500 байт текста и вдвое больше с временными массивами
+ROW_BYTES = 1024
+DATASET_PATH = 'datasets/dataset.csv'
+NUMERIC_COLUMNS = ["temp_morning", "pressure_morning", "wind_speed_morning",
+                   "temp_evening", "pressure_evening", "wind_speed_evening"]
+
+
+def decode_values(values: pd.Series, parse, missing) -> np.ndarray:
+    """
+    Разбирает текстовую колонку без цикла по строкам: разбираются только различные
+    значения колонки, а результат раскладывается по строкам индексами pd.factorize.
+
+    Аргументы:
+    values (pd.Series): Текстовая колонка.
+    parse (callable): Функция разбора одного значения.
+    missing: Значение для пропусков.
+
+    Возвращает:
+    numpy.ndarray: Разобранные значения по строкам.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values)
+    # Индекс -1 у пропусков указывает на последний элемент - значение missing
+    parsed = np.array([parse(value) for value in uniques] + [missing], dtype=np.int16)
+    return parsed[codes]
+
+
+def build_dataframe(columns: dict) -> pd.DataFrame:
+    """
+    Собирает DataFrame из колонок в формате modules.table: порядковые номера дат
+    переводятся в datetime64, коды направлений ветра - в категории, MISSING - в NaN.
+
+    Аргументы:
+    columns (dict): Массивы numpy по именам modules.table.COLUMNS.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с типизированными колонками.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = {}
+    for name in COLUMNS:
+        values = columns[name]
+        if name == "date":
+            frame[name] = (values.astype("int64") - EPOCH_ORDINAL).astype("datetime64[D]")
+        elif name.startswith("wind_direction"):
+            frame[name] = pd.Categorical.from_codes(np.where(values == MISSING, -1, values), WIND_DIRECTIONS)
+        else:
+            frame[name] = np.where(values == MISSING, np.nan, values).astype("float32")
+    return pd.DataFrame(frame)
+
+
+def decode_dataset(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Переводит строки файла данных, прочитанные как текст, в типизированные колонки:
+    даты переводятся в datetime64 целиком, а температура, давление и ветер 'ЮВ 3м/с'
+    разбираются по различным значениям колонки.
+
+    Аргументы:
+    raw (pd.DataFrame): Колонки RAW_COLUMNS в текстовом виде.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с колонками modules.table.COLUMNS.
+    """
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.to_datetime(raw["date"], format="%Y-%m-%d")
+    columns = {"date": (dates.to_numpy().astype("datetime64[D]").astype("int64") + EPOCH_ORDINAL)}
+    for period in ("morning", "evening"):
+        columns[f"temp_{period}"] = decode_values(raw[f"temp_{period}"], parse_number, MISSING)
+        columns[f"pressure_{period}"] = decode_values(raw[f"pressure_{period}"], parse_number, MISSING)
+        codes, uniques = pd.factorize(raw[f"wind_{period}"])
+        winds = np.array([parse_wind(value) for value in uniques] + [(MISSING, MISSING)], dtype=np.int16)
+        columns[f"wind_direction_{period}"] = winds[codes, 0]
+        columns[f"wind_speed_{period}"] = winds[codes, 1]
+    frame = build_dataframe(columns)
+    frame.index = raw.index
+    return frame
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    """
+    Разбирает CSV-файл данных парсером pandas с явными типами: все колонки читаются
+    как строки и переводятся в типизированные колонки decode_dataset.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с колонками modules.table.COLUMNS.
+    """
+    import pandas as pd
+
+    return decode_dataset(pd.read_csv(path, **CSV_OPTIONS))
+
+
+def iter_dataset(path: str, memory_limit: int | None = None):
+    """
+    Читает файл данных частями, объём каждой из которых вместе с временными данными
+    разбора не превышает memory_limit.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    memory_limit (int | None): Предел памяти на одну часть в байтах; по умолчанию MEMORY_LIMIT.
+
+    Возвращает:
+    Iterator[pandas.DataFrame]: Части файла с колонками modules.table.COLUMNS и сквозной нумерацией строк.
+    """
+    import pandas as pd
+
+    chunk_rows = max(1, (memory_limit or MEMORY_LIMIT) // ROW_BYTES)
+    with pd.read_csv(path, chunksize=chunk_rows, **CSV_OPTIONS) as reader:
+        for raw in reader:
+            yield decode_dataset(raw)
+
+
+def load_dataframe(path: str, workers: int = 1) -> pd.DataFrame:
+    """
+    Загружает набор данных в DataFrame с типизированными колонками modules.table.
+    Если рядом с файлом лежит актуальный файл-спутник, колонки читаются из отображённой
+    памяти без разбора текста; иначе файл разбирается read_dataset или, при workers > 1,
+    частями в нескольких процессах.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    workers (int): Количество процессов для разбора CSV-файла частями.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с колонками modules.table.COLUMNS.
+    """
+    import numpy as np
+
+    table = load_table(path, parse_csv=False)
+    if table is None:
+        if workers <= 1:
+            return read_dataset(path)
+        table = load_table_parallel(path, workers)
+    return build_dataframe({name: np.frombuffer(getattr(table, name), dtype=np.int32 if name == "date" else np.int16)
+                            for name in COLUMNS})
+
+
+def load_columns(path: str, columns: list | None = None, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """
+    Загружает из файла Parquet рядом с файлом данных (modules.columnar) только нужные колонки
+    за период [start, end]: остальные колонки и группы строк вне периода не читаются.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    columns (list | None): Колонки modules.table.COLUMNS; по умолчанию все.
+    start (str | None): Первая дата периода в формате 'гггг-мм-дд'.
+    end (str | None): Последняя дата периода в формате 'гггг-мм-дд'.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с колонкой date и запрошенными колонками.
+    """
+    import numpy as np
+    import pandas as pd
+    from modules.columnar import read_columns
+
+    table = read_columns(path, columns, start, end)
+    frame = {}
+    for name in table.column_names:
+        values = table.column(name).to_numpy()
+        if name == "date":
+            frame[name] = values.astype("datetime64[D]")
+        elif name.startswith("wind_direction"):
+            frame[name] = pd.Categorical.from_codes(np.nan_to_num(values, nan=-1).astype("int8"), WIND_DIRECTIONS)
+        else:
+            frame[name] = values.astype("float32")
+    return pd.DataFrame(frame)
+
+
+def add_derived_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Добавляет производные колонки одной векторной операцией на колонку: температуру
+    по Фаренгейту утром и вечером, разницу вечерней и утренней температуры, год и месяц.
+
+    Аргументы:
+    dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с добавленными колонками.
+    """
+    dataframe["temp_morning_f"] = dataframe["temp_morning"] * 9 / 5 + 32
+    dataframe["temp_evening_f"] = dataframe["temp_evening"] * 9 / 5 + 32
+    dataframe["temp_delta"] = dataframe["temp_evening"] - dataframe["temp_morning"]
+    dataframe["year"] = dataframe["date"].dt.year
+    dataframe["month"] = dataframe["date"].dt.month
+    return dataframe
+
+
+def monthly_means(dataframe: pd.DataFrame, columns: list = NUMERIC_COLUMNS) -> pd.DataFrame:
+    """
+    Вычисляет средние значения колонок по месяцам каждого года.
+
+    Аргументы:
+    dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
+    columns (list): Колонки для усреднения.
+
+    Возвращает:
+    pandas.DataFrame: Средние значения с индексом (год, месяц).
+    """
+    dates = dataframe["date"].dt
+    return dataframe.groupby([dates.year.rename("year"), dates.month.rename("month")])[list(columns)].mean()
+
+
+def yearly_means(dataframe: pd.DataFrame, columns: list = NUMERIC_COLUMNS) -> pd.DataFrame:
+    """
+    Вычисляет средние значения колонок по годам.
+
+    Аргументы:
+    dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
+    columns (list): Колонки для усреднения.
+
+    Возвращает:
+    pandas.DataFrame: Средние значения с индексом по годам.
+    """
+    return dataframe.groupby(dataframe["date"].dt.year.rename("year"))[list(columns)].mean()
+
+
+def morning_evening_delta(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Вычисляет среднюю, минимальную и максимальную разницу вечерней и утренней температуры по месяцам.
+
+    Аргументы:
+    dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
+
+    Возвращает:
+    pandas.DataFrame: Статистика разницы температур с индексом (год, месяц).
+    """
+    dates = dataframe["date"].dt
+    delta = (dataframe["temp_evening"] - dataframe["temp_morning"]).rename("temp_delta")
+    return delta.groupby([dates.year.rename("year"), dates.month.rename("month")]).agg(["mean", "min", "max"])
+
+
+def period_statistics(path: str, column: str, kind: str = "month") -> pd.DataFrame:
+    """
+    Возвращает статистику колонки по месяцам или неделям ISO из хранилища modules.aggregates.
+    Хранилище обновляется только при изменении файла, поэтому повторные вызовы не читают строки.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    column (str): Колонка modules.table.COLUMNS, например 'temp_morning'.
+    kind (str): 'month' или 'week'.
+
+    Возвращает:
+    pandas.DataFrame: Статистика в виде describe с индексом по ключам периодов.
+    """
+    import pandas as pd
+
+    cube = load_cube(path)
+    return pd.DataFrame.from_dict({key: cube.statistics(kind, key, column).describe() for key in cube.keys(kind)},
+                                  orient="index", dtype="float64")
+
+
+def select_period(dataframe: pd.DataFrame, date_column: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    Выбирает строки с датами из полуинтервала [start, end). Если даты упорядочены,
+    границы находятся двоичным поиском без прохода по всем строкам.
+
+    Аргументы:
+    dataframe (pd.DataFrame): Исходный DataFrame.
+    date_column (str): Название колонки с датой.
+    start (pd.Timestamp): Начало периода.
+    end (pd.Timestamp): Конец периода, не включается.
+
+    Возвращает:
+    pandas.DataFrame: Строки периода.
+    """
+    dates = dataframe[date_column]
+    if dates.is_monotonic_increasing:
+        return dataframe.iloc[dates.searchsorted(start):dates.searchsorted(end)]
+    return dataframe[dates.between(start, end, inclusive="left")]
+
+
+def __getattr__(name: str):
+    # Набор данных загружается при первом обращении к analytics.dataframe, а не при импорте
+    if name == "dataframe":
+        globals()["dataframe"] = load_dataframe(DATASET_PATH)
+        return globals()["dataframe"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
@@ -31,12 +330,13 @@ def handle_invalid_values(dataframe: pd.DataFrame) -> pd.DataFrame:
     Возвращает:
     pandas.DataFrame: DataFrame с обработанными невалидными значениями.
     """
-    return dataframe.fillna(method='ffill')
+    return dataframe.ffill()
 
 
-def add_fahrenheit_column(dataframe: pd.DataFrame, celsius_column: str) -> pd.DataFrame:
+def add_fahrenheit_column(dataframe: pd.DataFrame, celsius_column: str = "temp_morning") -> pd.DataFrame:
     """
-    Добавляет столбец с температурой в шкале по Фаренгейту в DataFrame.
+    Добавляет столбец с температурой в шкале по Фаренгейту в DataFrame: для колонки
+    'temp_morning' это 'temp_morning_f', как в add_derived_columns.
 
     Аргументы:
     dataframe (pd.DataFrame): Исходный DataFrame.
@@ -45,7 +345,7 @@ def add_fahrenheit_column(dataframe: pd.DataFrame, celsius_column: str) -> pd.Da
     Возвращает:
     pandas.DataFrame: DataFrame с добавленным столбцом температуры в Фаренгейтах.
     """
-    dataframe['Temperature_F'] = dataframe[celsius_column] * 9 / 5 + 32
+    dataframe[f"{celsius_column}_f"] = dataframe[celsius_column] * 9 / 5 + 32
     return dataframe
 
 
@@ -63,33 +363,36 @@ def compute_statistical_info(dataframe: pd.DataFrame, columns: list) -> pd.DataF
     return dataframe[columns].describe()
 
 
-def filter_by_temperature(dataframe: pd.DataFrame, temperature: float) -> pd.DataFrame:
+def filter_by_temperature(dataframe: pd.DataFrame, temperature: float, column: str = "temp_morning") -> pd.DataFrame:
     """
     Фильтрует DataFrame по значению температуры.
 
     Аргументы:
-    dataframe (pd.DataFrame): Исходный DataFrame.
+    dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
     temperature (float): Значение температуры для фильтрации.
+    column (str): Колонка температуры.
 
     Возвращает:
     pandas.DataFrame: Отфильтрованный DataFrame.
     """
-    return dataframe[dataframe['Temperature'] == temperature]
+    return dataframe[dataframe[column] == temperature]
 
 
 def filter_by_date(dataframe: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
     """
-    Фильтрует DataFrame по дате.
+    Фильтрует DataFrame по дате, включая обе границы.
 
     Аргументы:
-    dataframe (pd.DataFrame): Исходный DataFrame.
+    dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
     start_date (str): Начальная дата в формате 'гггг-мм-дд'.
     end_date (str): Конечная дата в формате 'гггг-мм-дд'.
 
     Возвращает:
     pandas.DataFrame: Отфильтрованный DataFrame.
     """
-    return dataframe[(dataframe['Date'] >= start_date) & (dataframe['Date'] <= end_date)]
+    import pandas as pd
+
+    return select_period(dataframe, "date", pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1))
 
 
 def group_by_month_and_compute_mean_temperature(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -97,13 +400,16 @@ def group_by_month_and_compute_mean_temperature(dataframe: pd.DataFrame) -> pd.D
         Вычисление среднемесячной температуры из DataFrame с группировкой по месяцам.
 
         Аргументы:
-        dataframe (pd.DataFrame): Входной DataFrame.
+        dataframe (pd.DataFrame): DataFrame с колонками modules.table.COLUMNS.
 
         Возвращает:
-        pd.DataFrame: Среднемесячная температура из DataFrame.
+        pd.DataFrame: Средняя утренняя и вечерняя температура по месяцам в Цельсиях и Фаренгейтах.
         """
 
-    return dataframe.groupby(dataframe['Date'].dt.month)['Temperature', 'Temperature_F'].mean()
+    means = dataframe.groupby(dataframe["date"].dt.month.rename("month"))[["temp_morning", "temp_evening"]].mean()
+    for column in ("temp_morning", "temp_evening"):
+        means[f"{column}_f"] = means[column] * 9 / 5 + 32
+    return means
 
 def plot_temperature_changes(dataframe: pd.DataFrame, date_column: str, temp_columns: list):
     """
@@ -117,6 +423,8 @@ def plot_temperature_changes(dataframe: pd.DataFrame, date_column: str, temp_col
     Результат:
     График изменения температуры за весь период.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 5))
     for column in temp_columns:
         plt.plot(dataframe[date_column], dataframe[column], label=column)
@@ -125,35 +433,138 @@ def plot_temperature_changes(dataframe: pd.DataFrame, date_column: str, temp_col
     plt.title('Temperature Changes')
     plt.legend()
     plt.show()
-def show_monthly_temperature_statistics(df: pd.DataFrame, month: int, year: int) -> None:
+def show_monthly_temperature_statistics(df: pd.DataFrame, month: int, year: int, column: str = "temp_morning") -> None:
     """
     Отображение графика температуры за указанный месяц в году
     и отображение медианы и средних значений
     Args:
-      df: Dataframe с исходными значениями
+      df: Dataframe с колонками modules.table.COLUMNS
       month: Месяц, для которого строится график температуры
       year: Год, для которого строится график температуры
+      column: Колонка температуры в Цельсиях
 
     """
-    month_df = df[(df.Date.dt.month == month) & (df.Date.dt.year == year)]
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    start = pd.Timestamp(year, month, 1)
+    month_df = select_period(df, "date", start, start + pd.offsets.MonthBegin())
+    days = month_df["date"].dt.day
+    celsius = month_df[column]
+    fahrenheit = celsius * 9 / 5 + 32
     fig = plt.figure(figsize=(30, 5))
 
     fig.add_subplot(1, 3, 1)
     plt.ylabel("Celsius temperature")
     plt.xlabel("Date")
-    plt.plot(month_df.Date.dt.day, month_df["Celsius temperature"],
-             color='green', linestyle='-', linewidth=2, label='Celsius temperature')
-    plt.axhline(y=month_df["Celsius temperature"].mean(), color='yellow', label="Average value")
-    plt.axhline(y=month_df["Celsius temperature"].median(), color='blue', label="Median")
+    plt.plot(days, celsius, color='green', linestyle='-', linewidth=2, label='Celsius temperature')
+    plt.axhline(y=celsius.mean(), color='yellow', label="Average value")
+    plt.axhline(y=celsius.median(), color='blue', label="Median")
     plt.legend(loc=2, prop={'size': 10})
 
     fig.add_subplot(1, 3, 2)
     plt.ylabel("Fahrenheit temperature")
     plt.xlabel("Date")
-    plt.plot(month_df.Date.dt.day, month_df["Fahrenheit temperature"],
-             color='red', linestyle='--', linewidth=2, label='Fahrenheit temperature')
-    plt.axhline(y=month_df["Fahrenheit temperature"].mean(), color='yellow', label="Average value")
-    plt.axhline(y=month_df["Fahrenheit temperature"].median(), color='blue', label="Median")
+    plt.plot(days, fahrenheit, color='red', linestyle='--', linewidth=2, label='Fahrenheit temperature')
+    plt.axhline(y=fahrenheit.mean(), color='yellow', label="Average value")
+    plt.axhline(y=fahrenheit.median(), color='blue', label="Median")
     plt.legend(loc=2, prop={'size': 10})
 
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+
+def filter_by_temperature_chunked(path: str, temperature: float, column: str = "temp_morning",
+                                  memory_limit: int | None = None) -> pd.DataFrame:
+    """
+    Потоковый вариант filter_by_temperature: фильтрует файл данных по значению температуры,
+    читая его частями, и собирает только подходящие строки.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    temperature (float): Значение температуры для фильтрации.
+    column (str): Колонка температуры.
+    memory_limit (int | None): Предел памяти на одну часть в байтах.
+
+    Возвращает:
+    pandas.DataFrame: Отфильтрованный DataFrame.
+    """
+    import pandas as pd
+
+    return pd.concat(filter_by_temperature(chunk, temperature, column) for chunk in iter_dataset(path, memory_limit))
+
+
+def filter_by_date_chunked(path: str, start_date: str, end_date: str, memory_limit: int | None = None) -> pd.DataFrame:
+    """
+    Потоковый вариант filter_by_date. Если даты в файле упорядочены, чтение
+    прекращается на первой части, которая начинается после end_date.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    start_date (str): Начальная дата в формате 'гггг-мм-дд'.
+    end_date (str): Конечная дата в формате 'гггг-мм-дд'.
+    memory_limit (int | None): Предел памяти на одну часть в байтах.
+
+    Возвращает:
+    pandas.DataFrame: Отфильтрованный DataFrame.
+    """
+    import pandas as pd
+
+    end = pd.Timestamp(end_date)
+    parts = []
+    ordered, last = True, None
+    for chunk in iter_dataset(path, memory_limit):
+        dates = chunk["date"]
+        if len(dates):
+            ordered = ordered and dates.is_monotonic_increasing and (last is None or dates.iloc[0] >= last)
+            last = dates.iloc[-1]
+        parts.append(filter_by_date(chunk, start_date, end_date))
+        if ordered and len(dates) and dates.iloc[0] > end:
+            break
+    return pd.concat(parts)
+
+
+def monthly_means_chunked(path: str, columns: list = NUMERIC_COLUMNS, memory_limit: int | None = None) -> pd.DataFrame:
+    """
+    Потоковый вариант monthly_means: суммы и количества значений по месяцам
+    накапливаются по частям файла и делятся в конце.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    columns (list): Колонки для усреднения.
+    memory_limit (int | None): Предел памяти на одну часть в байтах.
+
+    Возвращает:
+    pandas.DataFrame: Средние значения с индексом (год, месяц).
+    """
+    sums = counts = None
+    for chunk in iter_dataset(path, memory_limit):
+        dates = chunk["date"].dt
+        grouped = chunk[list(columns)].astype("float64").groupby([dates.year.rename("year"), dates.month.rename("month")])
+        part_sums, part_counts = grouped.sum(), grouped.count()
+        sums = part_sums if sums is None else sums.add(part_sums, fill_value=0)
+        counts = part_counts if counts is None else counts.add(part_counts, fill_value=0)
+    return (sums / counts.where(counts > 0)).sort_index()
+
+
+def describe_chunked(path: str, columns: list = NUMERIC_COLUMNS, memory_limit: int | None = None) -> pd.DataFrame:
+    """
+    Потоковый вариант compute_statistical_info: по частям файла накапливаются гистограммы
+    значений (modules.aggregates.Aggregate), по которым вычисляются те же показатели, что
+    и в describe, включая точные квартили.
+
+    Аргументы:
+    path (str): Путь к файлу данных.
+    columns (list): Список названий столбцов для вычисления статистики.
+    memory_limit (int | None): Предел памяти на одну часть в байтах.
+
+    Возвращает:
+    pandas.DataFrame: DataFrame с вычисленной статистической информацией.
+    """
+    import pandas as pd
+
+    aggregates = {column: Aggregate() for column in columns}
+    for chunk in iter_dataset(path, memory_limit):
+        for column in columns:
+            counts = chunk[column].value_counts()
+            aggregates[column].add_counts(dict(zip(counts.index.astype("int64").tolist(), counts.tolist())))
+    return pd.DataFrame({column: aggregate.describe() for column, aggregate in aggregates.items()}, dtype="float64")
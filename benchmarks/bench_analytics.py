@@ -0,0 +1,80 @@
+import os
+import json
+import sys
+import time
+import datetime
+import tempfile
+
+import numpy as np
+
+import analytics
+import pars_data
+import modules.add_functions as ef
+from modules.table import WeatherTable, load_table
+from modules.sidecar import write_sidecar
+from modules.aggregates import AggregateCube, load_cube
+from benchmarks.common import make_dataset, measure
+
+
+def load_rowwise(path: str):
+    # Прежний путь: разбор каждой строки в Python и сборка DataFrame из WeatherTable
+    table = WeatherTable.from_csv(path)
+    return analytics.build_dataframe({name: np.frombuffer(getattr(table, name), dtype="int32" if name == "date" else "int16")
+                                      for name in analytics.COLUMNS})
+
+
+def cube_after_upsert(path: str) -> None:
+    """
+    Инкрементальная загрузка переписывает последние месяцы (upsert_rows -> ingest.compact): хранилище
+    статистики пересчитывает только затронутые периоды и совпадает с построенным заново.
+    """
+
+    # Как в datasets/dataset.csv: строки с '\n', а слияние дописывает строки с '\r\n'
+    with open(path, "rb") as file:
+        data = file.read().replace(b"\r\n", b"\n")
+    with open(path, "wb") as file:
+        file.write(data)
+    load_cube(path)
+    table = load_table(path)
+    last = ef.ordinal_to_date(table.date[-1])
+    month = [row for row in map(table.record, range(len(table) - 40, len(table)))
+             if ef.to_date(row[0]).replace(day=1) == last.replace(day=1)]
+    for number, change in enumerate(("+1", "-3")):
+        day = ef.format_date(last.toordinal() + number + 1)
+        rows = [row[:1] + [change] + row[2:] for row in month] + [[day, change, "750", "С 1м/с", "0", "751", "С 1м/с"]]
+        pars_data.upsert_rows(path, rows)
+        started = time.perf_counter()
+        cube = load_cube(path)
+        elapsed = time.perf_counter() - started
+        expected = AggregateCube()
+        expected.update(load_table(path))
+        assert cube.rows == expected.rows == len(load_table(path))
+        assert cube.counts == expected.counts
+        assert json.loads(json.dumps(cube.to_json()["partitions"])) == json.loads(json.dumps(expected.to_json()["partitions"]))
+    print(f"  load_cube after upsert {elapsed * 1e3:8.1f} ms (last month rewritten, matches a full rebuild)")
+
+
+def main(sizes: list) -> None:
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dataset.csv")
+            make_dataset(path, rows)
+            print(f"{rows:>9} rows")
+            print(f"  row-wise parse        {measure(load_rowwise, path, repeat=1) * 1e3:9.1f} ms")
+            print(f"  read_dataset          {measure(analytics.read_dataset, path, repeat=3) * 1e3:9.1f} ms")
+            write_sidecar(path)
+            print(f"  load_dataframe .bin   {measure(analytics.load_dataframe, path, repeat=3) * 1e3:9.1f} ms")
+            dataframe = analytics.read_dataset(path)
+            for function in (analytics.add_derived_columns, analytics.monthly_means,
+                             analytics.yearly_means, analytics.morning_evening_delta):
+                print(f"  {function.__name__:<21} {measure(function, dataframe) * 1e3:9.1f} ms")
+            print(f"  load_cube build       {measure(load_cube, path, repeat=1) * 1e3:9.1f} ms")
+            cube_after_upsert(path)
+            cube = load_cube(path)
+            key = cube.keys()[-1]
+            print(f"  cube month median     {measure(lambda: cube.statistics('month', key, 'temp_morning').median) * 1e6:9.1f} us")
+            print(f"  frame month median    {measure(lambda: dataframe[(dataframe.date.dt.year == int(key[:4])) & (dataframe.date.dt.month == int(key[5:]))].temp_morning.median()) * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+from benchmarks.common import make_dataset
+
+LIMITS = (4 << 20, 16 << 20, 64 << 20)
+
+# Каждый запуск - в отдельном процессе, чтобы пиковый RSS относился только к одному режиму
+RUNNER = """
+import sys, json, time
+import analytics
+path, limit = sys.argv[1], int(sys.argv[2])
+started = time.perf_counter()
+if limit:
+    analytics.describe_chunked(path, memory_limit=limit)
+    analytics.monthly_means_chunked(path, memory_limit=limit)
+else:
+    dataframe = analytics.read_dataset(path)
+    dataframe[analytics.NUMERIC_COLUMNS].describe()
+    analytics.monthly_means(dataframe)
+elapsed = time.perf_counter() - started
+with open("/proc/self/status") as status:
+    peak = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+print(json.dumps({"seconds": elapsed, "maxrss_kb": peak}))
+"""
+
+
+def run(path: str, limit: int) -> dict:
+    output = subprocess.run([sys.executable, "-c", RUNNER, path, str(limit)], check=True,
+                            capture_output=True, text=True, cwd=os.getcwd()).stdout
+    return json.loads(output)
+
+
+def main(sizes: list) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"dataset_{rows}.csv")
+            make_dataset(path, rows)
+            print(f"{rows:>9} rows, {os.path.getsize(path) / 2 ** 20:,.0f} MiB")
+            for limit in (0,) + LIMITS:
+                result = run(path, limit)
+                label = f"chunked {limit >> 20:>3} MiB" if limit else "in-memory     "
+                print(f"  {label}: {result['seconds'] * 1e3:9.1f} ms, peak {result['maxrss_kb'] / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [100_000, 1_000_000])
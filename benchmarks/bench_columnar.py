@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+import analytics
+from modules import columnar
+from benchmarks.common import make_dataset, measure
+
+
+def month_from_csv(path: str, start: str, end: str):
+    dataframe = analytics.read_dataset(path)
+    return dataframe.loc[(dataframe.date >= start) & (dataframe.date <= end), ["date", "temp_evening"]]
+
+
+def main(sizes: list) -> None:
+    columnar.require()
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dataset.csv")
+            make_dataset(path, rows)
+            target = columnar.write_table(path)
+            print(f"{rows:>9} rows: csv {os.path.getsize(path) / 1024:,.0f} KiB, "
+                  f"parquet {os.path.getsize(target) / 1024:,.0f} KiB")
+            print(f"  full read    csv {measure(analytics.read_dataset, path, repeat=3) * 1e3:9.1f} ms, "
+                  f"parquet {measure(analytics.load_columns, path, repeat=3) * 1e3:9.1f} ms")
+            # Один месяц вечерней температуры из середины файла
+            middle = analytics.read_dataset(path).date.iloc[rows // 2]
+            start = middle.replace(day=1).strftime("%Y-%m-%d")
+            end = (middle.replace(day=1) + pd.offsets.MonthEnd()).strftime("%Y-%m-%d")
+            print(f"  month query  csv {measure(month_from_csv, path, start, end, repeat=3) * 1e3:9.1f} ms, "
+                  f"parquet {measure(analytics.load_columns, path, ['temp_evening'], start, end) * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
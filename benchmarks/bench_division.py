@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+import modules.division as dd
+from benchmarks.common import make_dataset
+
+
+def sinks(directory: str) -> list:
+    return [dd.DateDataSink(directory), dd.WeekSink(directory), dd.MonthSink(directory), dd.YearSink(directory)]
+
+
+def run(path: str, directory: str) -> tuple:
+    """Время и пиковая память разбиения файла сразу на все приёмники."""
+    started = time.perf_counter()
+    dd.partition(path, sinks(directory))
+    elapsed = time.perf_counter() - started
+    # Память измеряется отдельным проходом: tracemalloc сильно замедляет выполнение
+    tracemalloc.start()
+    dd.partition(path, sinks(directory))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(sizes: list) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"dataset_{rows}.csv")
+            output = os.path.join(directory, f"split_{rows}")
+            os.makedirs(output)
+            make_dataset(path, rows)
+            elapsed, peak = run(path, output)
+            print(f"{rows:>9} rows: {elapsed * 1e3:9.1f} ms, {rows / elapsed:12,.0f} rows/s, "
+                  f"peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,121 @@
+import os
+import csv
+import sys
+import time
+import datetime
+import tempfile
+import subprocess
+
+import modules.add_functions as ef
+import modules.ingest as ingest
+from modules.index import get_index
+from benchmarks.common import make_dataset, measure
+
+READER = """
+import os, sys
+path, stop, minimum = sys.argv[1], sys.argv[2], int(sys.argv[3])
+reads = torn = 0
+while not os.path.exists(stop):
+    with open(path, "rb") as file:
+        data = file.read()
+    reads += 1
+    if data.count(b"\\n") < minimum or not data.endswith(b"\\n"):
+        torn += 1
+print(reads, torn)
+"""
+
+
+def previous_upsert(path: str, rows: list) -> int:
+    """Прежний pars_data.upsert_rows: хвост набора переписывается на месте после truncate."""
+    new = {ef.date_to_ordinal(row[0]): row for row in rows}
+    index = get_index(path)
+    offset = index.offset(index.bisect(ef.ordinal_to_date(min(new))))
+    merged = {}
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        file.seek(offset)
+        for row in csv.reader(file):
+            if row:
+                merged[ef.date_to_ordinal(row[0])] = row
+    merged.update(new)
+    with open(path, 'a+', encoding='utf-8', newline='') as file:
+        file.seek(offset)
+        file.truncate()
+        csv.writer(file).writerows(merged[ordinal] for ordinal in sorted(merged))
+    return len(new)
+
+
+def month_rows(first: datetime.date, days: int = 30, temperature: int = 0) -> list:
+    return [[ef.format_date(first.toordinal() + day), f"{temperature:+d}", "750", "С 1м/с", "0", "751", "С 1м/с"]
+            for day in range(days)]
+
+
+def torn_reads(path: str, write, rounds: int) -> tuple:
+    """
+    Функция torn_reads читает набор данных в отдельном процессе, пока write дописывает в него месяцы,
+    и считает прочтения, в которых файл был короче исходного или обрывался на середине строки.
+
+    Аргументы:
+
+    path (str): путь к набору данных
+    write (callable): функция записи строк (path, rows)
+    rounds (int): количество записей
+    Возвращает:
+
+    result (tuple): количество прочтений и количество неполных прочтений
+    """
+
+    with open(path, "rb") as file:
+        minimum = file.read().count(b"\n")
+    # Читатель - отдельный процесс, как окно приложения, открывшее набор во время загрузки
+    stop = path + ".stop"
+    reader = subprocess.Popen([sys.executable, "-c", READER, path, stop, str(minimum)], stdout=subprocess.PIPE,
+                              text=True)
+    time.sleep(0.2)
+    index = get_index(path)
+    last = ef.to_date(index.record(len(index) - 1)[0])
+    for number in range(rounds):
+        # Перезапись последних лет и новый месяц: хвост файла меняется каждый раз
+        write(path, month_rows(last - datetime.timedelta(days=1000) + datetime.timedelta(days=30 * number), 1030,
+                               number))
+        time.sleep(0.001)
+    open(stop, "w").close()
+    reads, torn = map(int, reader.communicate()[0].split())
+    os.remove(stop)
+    return reads, torn
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dataset.csv")
+        make_dataset(path, rows)
+        last = ef.to_date(get_index(path).record(len(get_index(path)) - 1)[0])
+
+        # Результат слияния совпадает с прежней перезаписью хвоста
+        expected = os.path.join(directory, "expected.csv")
+        make_dataset(expected, rows)
+        updates = [month_rows(datetime.date(2010, 3, 1), 10, 7), month_rows(last - datetime.timedelta(days=3), 40, 9),
+                   month_rows(datetime.date(2010, 3, 5), 2, -4)]
+        for update in updates:
+            previous_upsert(expected, update)
+            ingest.append_segment(path, update)
+        assert len(ingest.segment_paths(path)) == 3
+        ingest.compact(path)
+        with open(path, "rb") as file, open(expected, "rb") as other:
+            assert file.read() == other.read()
+        assert not ingest.segment_paths(path) and get_index(path).ordered
+
+        segment = measure(lambda: ingest.append_segment(path, month_rows(last, 30)), repeat=50)
+        ingest.compact(path)
+        tail = measure(lambda: (ingest.append_segment(path, month_rows(last, 30)), ingest.compact(path)), repeat=10)
+        size = os.path.getsize(path) >> 20
+        print(f"{rows:>9} rows ({size} MiB): append a month to the log {segment * 1e3:7.3f} ms, "
+              f"append + compact {tail * 1e3:7.1f} ms")
+
+        reads, torn = torn_reads(path, previous_upsert, 50)
+        print(f"  in-place tail rewrite: {torn} of {reads} concurrent reads saw a truncated or torn file")
+        reads, torn = torn_reads(path, lambda path, rows: (ingest.append_segment(path, rows), ingest.compact(path)), 50)
+        print(f"  segment + compaction:  {torn} of {reads} concurrent reads saw a truncated or torn file")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
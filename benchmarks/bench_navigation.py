@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import datetime
+import tempfile
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtWidgets
+
+import main_window
+import modules.iterator as d_iter
+from benchmarks.common import make_dataset, measure
+from tests.helpers import run_until
+
+
+def previous_step(iterator: d_iter.DataIterator, day: datetime.date) -> tuple:
+    """Прежний шаг кнопки «Следующая дата»: переход к дате и чтение следующей строки."""
+    iterator.seek(day)
+    return next(iterator)
+
+
+def press(app, ui, action, presses: int) -> tuple:
+    """Нажимает кнопку presses раз, как при удержании, и возвращает самое долгое время обработки нажатия."""
+    longest = 0.0
+    for _ in range(presses):
+        started = time.perf_counter()
+        action()
+        longest = max(longest, time.perf_counter() - started)
+        app.processEvents(QtCore.QEventLoop.AllEvents, 1)
+    run_until(app, lambda: not ui.queries.current)
+    return longest
+
+
+def main(rows: int) -> None:
+    app = QtWidgets.QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dataset.csv")
+        make_dataset(path, rows)
+        day = datetime.date(2007, 1, 1) + datetime.timedelta(days=rows // 2)
+
+        old = d_iter.DataIterator(path)
+        new = d_iter.PrefetchIterator(path)
+        index, fetched = new.fetch(day, 1)
+        new.install(fetched)
+        first = new.move(index)
+        assert first == previous_step(old, day)
+        forward = [new.step(1) for _ in range(1000)]
+        assert forward == [next(old) for _ in range(1000)]
+        assert [new.step(-1) for _ in range(1000)] == forward[-2::-1] + [first]
+        print(f"{rows:>9} rows, one step: seek+next {measure(previous_step, old, day, repeat=2000) * 1e6:7.1f} us, "
+              f"prefetched {measure(lambda: (new.step(1), new.step(-1)), repeat=2000) / 2 * 1e6:7.1f} us")
+
+        # Чтения строк из GUI-потока означали бы синхронный доступ к диску при нажатии кнопки
+        reads = {"gui": 0, "worker": 0}
+        read = d_iter.PrefetchIterator.read
+
+        def counted(self, indices):
+            reads["gui" if threading.current_thread() is threading.main_thread() else "worker"] += 1
+            return read(self, indices)
+
+        d_iter.PrefetchIterator.read = counted
+        try:
+            window = QtWidgets.QMainWindow()
+            ui = main_window.Ui_MainWindow()
+            ui.setupUi(window)
+            ui.path = path
+            ui.queries.submit("iterator", d_iter.PrefetchIterator, path, on_done=ui._Ui_MainWindow__set_iterator)
+            run_until(app, lambda: ui.it is not None)
+            ui.date.setDate(QtCore.QDate(day.year, day.month, day.day))
+
+            longest = press(app, ui, ui.next_element, 2000)
+            forward = ui.date.date().toPyDate()
+            print(f"  hold next x2000:  longest press {longest * 1e3:6.2f} ms, now at {forward}, reads {reads}")
+            longest = press(app, ui, ui.prev_element, 2000)
+            print(f"  hold prev x2000:  longest press {longest * 1e3:6.2f} ms, now at {ui.date.date().toPyDate()}, "
+                  f"reads {reads}")
+            ui.jump_size.setValue(365)
+            longest = press(app, ui, ui.jump_forward_button.click, 100)
+            print(f"  jump +365 x100:   longest press {longest * 1e3:6.2f} ms, now at {ui.date.date().toPyDate()}, "
+                  f"reads {reads}")
+        finally:
+            d_iter.PrefetchIterator.read = read
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+import tempfile
+
+import pars_data
+from modules.parallel import load_table_parallel
+from benchmarks.common import make_dataset, make_diary_page
+
+WORKERS = (1, 2, 4, 8)
+
+
+def timed(function, *args, **kwargs) -> float:
+    started = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def main(rows: int, pages: int) -> None:
+    print(f"cores: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dataset.csv")
+        make_dataset(path, rows)
+        base = None
+        for workers in WORKERS:
+            elapsed = timed(load_table_parallel, path, workers, chunk_size=max(1 << 16, os.path.getsize(path) // 32))
+            base = base or elapsed
+            print(f"csv   {rows:>9} rows, {workers} workers: {elapsed * 1e3:9.1f} ms, speedup x{base / elapsed:.2f}")
+    saved = [(make_diary_page(2000 + number // 12, number % 12 + 1), 2000 + number // 12, number % 12 + 1)
+             for number in range(pages)]
+    base = None
+    for workers in WORKERS:
+        elapsed = timed(pars_data.parse_pages, saved, workers)
+        base = base or elapsed
+        print(f"pages {pages:>9} pages, {workers} workers: {elapsed * 1e3:9.1f} ms, speedup x{base / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000, int(sys.argv[2]) if len(sys.argv) > 2 else 400)
@@ -0,0 +1,40 @@
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+import pars_data
+from benchmarks.common import make_diary_page
+
+
+def parse_full_soup(src: str, year: int, month: int) -> list:
+    """Прежняя реализация get_table_data: полное дерево BeautifulSoup для всей страницы."""
+    soup = BeautifulSoup(src, "lxml")
+    try:
+        table = soup.find("table").find("tbody").find_all("tr")
+    except Exception:
+        return []
+    return [pars_data.make_record([td.text for td in item.find_all('td')], year, month) for item in table]
+
+
+def pages_per_second(parse, pages: list) -> float:
+    started = time.perf_counter()
+    for year, month, src in pages:
+        parse(src, year, month)
+    return len(pages) / (time.perf_counter() - started)
+
+
+def main(count: int) -> None:
+    pages = [(2000 + number // 12, number % 12 + 1, None) for number in range(count)]
+    pages = [(year, month, make_diary_page(year, month)) for year, month, _ in pages]
+    expected = [parse_full_soup(*page[2:], *page[:2]) for page in pages]
+    backends = {"full soup": parse_full_soup}
+    for backend in pars_data.PARSERS:
+        backends[backend] = lambda src, year, month, backend=backend: pars_data.get_table_data(src, year, month, backend)
+    for name, parse in backends.items():
+        assert [parse(src, year, month) for year, month, src in pages] == expected, name
+        print(f"{name:>10}: {pages_per_second(parse, pages):8.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,56 @@
+import os
+import sys
+import datetime
+import tempfile
+
+import modules.search as ds
+from modules import division
+from modules.manifest import read_manifest, week_key
+from modules.stations import dataset_path, layout_directory
+from benchmarks.common import make_dataset, measure
+
+STATION = 1
+
+
+def previous_search_by_week(day: datetime.date) -> list | None:
+    directory = layout_directory("week", STATION)
+    partition = read_manifest(directory, "week").get(week_key(day))
+    return ds.search(f"{directory}/{partition['file']}", day)
+
+
+def main(rows: int) -> None:
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # Поиск по разбиению использует относительные пути datasets/stations/<станция>
+        os.chdir(directory)
+        try:
+            os.makedirs(os.path.dirname(dataset_path(STATION)))
+            make_dataset(dataset_path(STATION), rows)
+            division.division_by_station([STATION])
+            day = datetime.date(2007, 1, 1) + datetime.timedelta(days=rows // 2)
+            week = [day + datetime.timedelta(days=offset) for offset in range(7)]
+
+            # Прежний search_by_week: индекс строк файла и чтение строки с диска на каждый поиск
+            uncached = measure(lambda: [previous_search_by_week(date) for date in week], repeat=200) / 7
+            cold = measure(lambda: [(ds.partition_cache.clear(), ds.search_by_week(date, STATION)) for date in week],
+                           repeat=50) / 7
+            ds.partition_cache.clear()
+            warm = measure(lambda: [ds.search_by_week(date, STATION) for date in week], repeat=200) / 7
+            print(f"{rows:>9} rows, week lookups: file index {uncached * 1e6:7.1f} us, "
+                  f"cache miss {cold * 1e6:7.1f} us, cache hit {warm * 1e6:7.1f} us")
+            print(f"  {ds.partition_cache.stats()}")
+
+            ds.partition_cache.clear()
+            ds.partition_cache.resize(64 << 10)
+            for _ in range(2):
+                for year in range(2007, 2007 + rows // 365):
+                    ds.search_by_year(datetime.date(year, 6, 1), STATION)
+            print(f"  two passes over all years, 64 KiB budget: {ds.partition_cache.stats()}")
+        finally:
+            os.chdir(root)
+            ds.partition_cache.clear()
+            ds.partition_cache.resize(ds.PARTITION_CACHE_BYTES)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
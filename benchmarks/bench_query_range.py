@@ -0,0 +1,73 @@
+import os
+import sys
+import datetime
+import tempfile
+
+import modules.add_functions as ef
+import modules.search as ds
+from modules import division
+from modules.stations import dataset_path
+from modules.sidecar import write_sidecar
+from modules.table import COLUMNS, parse_number
+from benchmarks.common import make_dataset, measure
+
+STATION = 1
+
+
+def month_by_days(first: datetime.date, last: datetime.date) -> list:
+    """Выборка месяца прежним способом: отдельный поиск на каждый день."""
+    days = (last - first).days + 1
+    return [ds.search(dataset_path(STATION), first + datetime.timedelta(days=offset)) for offset in range(days)]
+
+
+def main(rows: int) -> None:
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            os.makedirs(os.path.dirname(dataset_path(STATION)))
+            make_dataset(dataset_path(STATION), rows)
+            division.division_by_station([STATION])
+            middle = datetime.date(2007, 1, 1) + datetime.timedelta(days=rows // 2)
+            month = (middle.replace(day=1), (middle.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+                     - datetime.timedelta(days=1))
+            year = (datetime.date(middle.year, 1, 1), datetime.date(middle.year, 12, 31))
+
+            # Набор данных с файлом-спутником: колонки таблицы - memoryview, а не array
+            write_sidecar(dataset_path(STATION))
+            table = ds.partition_cache.get(dataset_path(STATION))
+            assert isinstance(table.date, memoryview)
+            assert list(ds.take(table.temp_morning, [2, 0, 1])) == [table.temp_morning[2], table.temp_morning[0],
+                                                                   table.temp_morning[1]]
+            by_files = ds.query_range(*year, kind="year", station=STATION)
+            assert ds.query_range(*year, kind=None, station=STATION) == by_files
+            batches = list(ds.query_batches(*year, kind=None, station=STATION, batch_size=100))
+            assert {name: sum((list(part[name]) for part in batches), []) for name in COLUMNS} == \
+                {name: list(values) for name, values in by_files.items()}
+
+            batch = ds.query_range(*month, kind="year", station=STATION)
+            expected = ds.search_range(*month, kind="year", station=STATION)
+            assert [ef.date_to_ordinal(record[0]) for record in expected] == list(batch["date"])
+            # Текст строки файла и строки таблицы может отличаться ('+0' и '0'), поэтому сравниваются значения
+            assert list(batch["temp_morning"]) == [parse_number(day[0]) for day in month_by_days(*month)]
+            batches = list(ds.query_batches(*year, kind="week", station=STATION, batch_size=100))
+            assert [len(part["date"]) for part in batches] == [100, 100, 100, 65]
+            assert sum((list(part["date"]) for part in batches), []) == list(ds.query_range(*year, station=STATION)["date"])
+
+            by_days = measure(month_by_days, *month, repeat=20)
+            print(f"{rows:>9} rows, one month: per-day search {by_days * 1e3:8.3f} ms")
+            for kind in ("year", "month", "week", None):
+                # search_range работает только по разбиениям; для набора целиком показано время по годам
+                records = measure(ds.search_range, *month, kind or "year", STATION, repeat=50)
+                columns = measure(ds.query_range, *month, COLUMNS, kind, STATION, repeat=200)
+                full = measure(ds.query_range, *year, ("date", "temp_morning"), kind, STATION, repeat=200)
+                print(f"  {kind or 'dataset':<8} month: search_range {records * 1e3:7.3f} ms, "
+                      f"query_range {columns * 1e3:7.3f} ms; year of 2 columns {full * 1e3:7.3f} ms")
+            print(f"  {ds.partition_cache.stats()}")
+        finally:
+            os.chdir(root)
+            ds.partition_cache.clear()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
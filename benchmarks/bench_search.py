@@ -0,0 +1,32 @@
+import os
+import sys
+import datetime
+import tempfile
+
+import modules.add_functions as ef
+import modules.search as ds
+from benchmarks.common import make_dataset, measure
+
+
+def linear_search(path: str, date: datetime.date) -> list | None:
+    """Прежняя реализация search: чтение всего файла и перебор строк."""
+    for day in ef.read_data(path):
+        if day[0] == f"{date.year}-{date.month}-{date.day}":
+            return day[1:]
+
+
+def main(sizes: list) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"dataset_{rows}.csv")
+            make_dataset(path, rows)
+            date = datetime.date(2007, 1, 1) + datetime.timedelta(days=rows * 3 // 4)
+            assert linear_search(path, date) == ds.search(path, date)
+            linear = measure(linear_search, path, date)
+            indexed = measure(ds.search, path, date, repeat=1000)
+            print(f"{rows:>9} rows: linear {linear * 1e3:10.3f} ms, "
+                  f"indexed {indexed * 1e6:8.2f} us, speedup x{linear / indexed:,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import subprocess
+
+import modules.add_functions as ef
+import modules.sidecar as sidecar
+from modules.iterator import DataIterator
+from modules.sidecar import write_sidecar
+from modules.table import WeatherTable, load_table
+from benchmarks.common import make_dataset
+
+# Загрузка выполняется в отдельном процессе, чтобы измерить холодный старт и пиковый RSS
+LOADER = """
+import sys, json, time
+started = time.perf_counter()
+if sys.argv[2] == "csv":
+    from modules.table import WeatherTable
+    table = WeatherTable.from_csv(sys.argv[1])
+else:
+    from modules.sidecar import open_table
+    table = open_table(sys.argv[1])
+total = sum(table.temp_morning)
+elapsed = time.perf_counter() - started
+# VmHWM - пиковый RSS текущего образа процесса; ru_maxrss после fork наследует значение родителя
+with open("/proc/self/status") as status:
+    peak = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+print(json.dumps({"seconds": elapsed, "maxrss_kb": peak}))
+"""
+
+
+def load(path: str, mode: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", LOADER, path, mode], check=True,
+                            capture_output=True, text=True, cwd=os.getcwd()).stdout
+    return json.loads(output)
+
+
+def stale_same_size(path: str, steps: int = 100) -> None:
+    """
+    Сидекар устаревает, а размер CSV-файла не меняется (значение исправлено на месте): содержимое
+    сверяется по контрольной сумме один раз, а не при каждом шаге итератора.
+    """
+
+    with open(path, "r+b") as file:
+        line = file.readline()
+        file.seek(line.index(b",") + 1)
+        # '+5' -> '-5': длина строки прежняя
+        file.write(b"-" if line[line.index(b",") + 1:][:1] == b"+" else b"+")
+    calls = 0
+    checksum = sidecar.checksum
+
+    def counted(*args):
+        nonlocal calls
+        calls += 1
+        return checksum(*args)
+
+    sidecar.checksum = counted
+    try:
+        started = time.perf_counter()
+        iterator = DataIterator(path)
+        for _ in range(steps):
+            next(iterator)
+        elapsed = time.perf_counter() - started
+    finally:
+        sidecar.checksum = checksum
+    assert load_table(path, parse_csv=False) is None
+    assert calls <= 1, calls
+    print(f"  stale sidecar of the same size: {steps} next() in {elapsed * 1e3:.1f} ms, {calls} checksum call(s)")
+
+
+def unordered_lookup(rows: int, lookups: int = 1000) -> None:
+    generator = random.Random(0)
+    ordinals = list(range(730000, 730000 + rows))
+    generator.shuffle(ordinals)
+    table = WeatherTable()
+    table.date.extend(ordinals)
+    table.ordered = False
+    wanted = [generator.choice(ordinals) for _ in range(lookups)]
+    started = time.perf_counter()
+    assert [table.date[table.lookup(ef.ordinal_to_date(ordinal))] for ordinal in wanted] == wanted
+    print(f"  unordered lookup: {lookups} dates in {(time.perf_counter() - started) * 1e3:.1f} ms "
+          f"(index built on the first call)")
+
+
+def main(sizes: list) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"dataset_{rows}.csv")
+            make_dataset(path, rows)
+            write_sidecar(path)
+            csv_result, sidecar_result = load(path, "csv"), load(path, "sidecar")
+            print(f"{rows:>9} rows: csv {csv_result['seconds'] * 1e3:9.1f} ms "
+                  f"{csv_result['maxrss_kb'] / 1024:7.1f} MiB, "
+                  f"sidecar {sidecar_result['seconds'] * 1e3:8.1f} ms "
+                  f"{sidecar_result['maxrss_kb'] / 1024:7.1f} MiB, "
+                  f"sizes {os.path.getsize(path) / 1024:,.0f} KiB / {os.path.getsize(path + '.bin') / 1024:,.0f} KiB")
+            stale_same_size(path)
+            unordered_lookup(rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import subprocess
+
+MODULES = ("main_window", "analytics", "modules.search", "modules.division", "pars_data")
+
+# Окно строится так же, как в main_window.main; время фиксируется на первой итерации цикла событий,
+# когда окно уже показано
+WINDOW = """
+import sys, time
+import main_window
+from PyQt5 import QtCore, QtWidgets
+app = QtWidgets.QApplication(sys.argv[:1])
+window = QtWidgets.QMainWindow()
+main_window.Ui_MainWindow().setupUi(window)
+window.show()
+QtCore.QTimer.singleShot(0, lambda: (print(time.time()), app.quit()))
+app.exec_()
+"""
+
+
+def import_time(module: str) -> tuple:
+    """
+    Функция import_time импортирует модуль в новом процессе с -X importtime и возвращает
+    суммарное время импорта и самые тяжёлые модули верхнего уровня.
+
+    Аргументы:
+
+    module (str): имя модуля
+    Возвращает:
+
+    result (tuple): время в секундах и список пар (модуль, время в секундах)
+    """
+
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], check=True,
+                            capture_output=True, text=True, cwd=os.getcwd()).stderr
+    total = 0
+    heaviest = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        total += int(own)
+        # Модули верхнего уровня записаны без отступа
+        if not name[1:].startswith(" "):
+            heaviest.append((name.strip(), int(cumulative) / 1e6))
+    heaviest.sort(key=lambda item: -item[1])
+    return total / 1e6, heaviest[:5]
+
+
+def time_to_first_window(repeat: int = 3) -> float:
+    """
+    Функция time_to_first_window запускает главное окно в новом процессе и возвращает
+    время от запуска процесса до первой итерации цикла событий с показанным окном.
+
+    Аргументы:
+
+    repeat (int): количество запусков
+    Возвращает:
+
+    elapsed (float): лучшее время в секундах
+    """
+
+    best = None
+    environment = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    for _ in range(repeat):
+        started = time.time()
+        output = subprocess.run([sys.executable, "-c", WINDOW], check=True, capture_output=True, text=True,
+                                cwd=os.getcwd(), env=environment).stdout
+        elapsed = float(output.split()[-1]) - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(modules: list) -> None:
+    for module in modules:
+        total, heaviest = import_time(module)
+        print(f"import {module:<17} {total * 1e3:8.1f} ms; "
+              + ", ".join(f"{name} {seconds * 1e3:.1f}" for name, seconds in heaviest))
+    try:
+        print(f"time to first window  {time_to_first_window() * 1e3:8.1f} ms")
+    except subprocess.CalledProcessError as error:
+        print(f"time to first window: окно не запустилось ({error.stderr.strip().splitlines()[-1]})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(MODULES))
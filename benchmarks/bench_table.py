@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import modules.add_functions as ef
+from modules.table import WeatherTable
+from benchmarks.common import make_dataset, measure
+
+
+def allocated(function, *args) -> int:
+    """Объём памяти в байтах, который остаётся занятым результатом функции."""
+    tracemalloc.start()
+    result = function(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(sizes: list) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"dataset_{rows}.csv")
+            make_dataset(path, rows)
+            lists = allocated(ef.read_data, path)
+            table = allocated(WeatherTable.from_csv, path)
+            print(f"{rows:>9} rows: list-of-lists {lists / rows:7.1f} B/row "
+                  f"({measure(ef.read_data, path, repeat=3) * 1e3:8.1f} ms), "
+                  f"WeatherTable {table / rows:6.1f} B/row "
+                  f"({measure(WeatherTable.from_csv, path, repeat=3) * 1e3:8.1f} ms)")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,85 @@
+import os
+import csv
+import sys
+import time
+import random
+import tempfile
+
+import pars_data
+from modules.table import MISSING, parse_wind
+from modules.validation import RowValidator, rejects_path
+from benchmarks.common import make_diary_page
+
+# Неисправности, которые встречаются в ячейках дневника; последние две ломают разбор,
+# остальные приводятся к каноническому виду
+NORMALIZED = [("wind_morning", "Ш"), ("wind_morning", "штиль"), ("wind_evening", "ЮВ 3 м/с"),
+              ("temp_morning", "−6"), ("wind_evening", "сз 4м/c")]
+BROKEN = [("temp_evening", ""), ("presure_morning", "—"), ("temp_morning", "999")]
+
+
+def dirty_months(count: int, seed: int = 0) -> tuple:
+    """
+    Функция dirty_months разбирает страницы дневника и портит часть строк: пустые и неверные ячейки,
+    другая запись ветра, повторы и пропуски дней.
+
+    Аргументы:
+
+    count (int): количество месяцев
+    seed (int): начальное значение генератора случайных чисел
+    Возвращает:
+
+    result (tuple): список месяцев и список таблиц get_table_data
+    """
+
+    generator = random.Random(seed)
+    months = [(2000 + number // 12, number % 12 + 1) for number in range(count)]
+    tables = []
+    for year, month in months:
+        table = []
+        for item in pars_data.get_table_data(make_diary_page(year, month), year, month):
+            chance = generator.random()
+            if chance < 0.01:
+                continue
+            if chance < 0.02:
+                table.append(dict(item))
+            elif chance < 0.10:
+                field, value = generator.choice(NORMALIZED)
+                item[field] = value
+            elif chance < 0.13:
+                field, value = generator.choice(BROKEN)
+                item[field] = value
+            table.append(item)
+        tables.append(table)
+    return months, tables
+
+
+def strict_row(row: list) -> tuple:
+    """Разбор строки без обработки ошибок: для проверенного файла он не должен падать."""
+    winds = parse_wind(row[3]), parse_wind(row[6])
+    assert MISSING not in winds[0] + winds[1], row
+    return row[0], int(row[1]), int(row[2]), winds[0], int(row[4]), int(row[5]), winds[1]
+
+
+def main(count: int) -> None:
+    months, tables = dirty_months(count)
+    rows = sum(map(len, tables))
+    with tempfile.TemporaryDirectory() as directory:
+        for repair in ("ffill", "reject"):
+            path = os.path.join(directory, f"{repair}.csv")
+            started = time.perf_counter()
+            with open(path, "w", newline="", encoding="utf-8") as file, \
+                    RowValidator(rejects_path(path), repair) as validator:
+                csv.writer(file).writerows(pars_data.validate_months(validator, months, tables))
+            elapsed = time.perf_counter() - started
+            with open(path, encoding="utf-8") as file:
+                parsed = [strict_row(row) for row in csv.reader(file)]
+            with open(rejects_path(path), encoding="utf-8") as file:
+                reasons = {}
+                for row in csv.reader(file):
+                    reasons[row[0]] = reasons.get(row[0], 0) + 1
+            print(f"{repair:>6}: {rows} rows in {elapsed * 1e3:7.1f} ms ({rows / elapsed:,.0f} rows/s), "
+                  f"{len(parsed)} written and parsed strictly; {validator.counts}; side file {reasons}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 120)
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtWidgets
+
+import main_window
+from modules import division
+from workers import TaskRunner
+from tests.helpers import make_dataset, run_until
+
+
+class StallMeter:
+    """Таймер цикла событий: самая длинная пауза между срабатываниями - время, на которое окно «замирало»"""
+
+    def __init__(self):
+        self.last = time.perf_counter()
+        self.longest = 0.0
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(5)
+
+    def tick(self) -> None:
+        now = time.perf_counter()
+        self.longest = max(self.longest, now - self.last)
+        self.last = now
+
+
+def main(rows: int) -> None:
+    app = QtWidgets.QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dataset.csv")
+        make_dataset(path, rows)
+        target = os.path.join(directory, "weeks")
+        os.makedirs(target)
+
+        started = time.perf_counter()
+        division.division_by_week(target, path)
+        print(f"split on the GUI thread: window frozen for {(time.perf_counter() - started) * 1e3:8.1f} ms")
+
+        runner = TaskRunner(1)
+        events = []
+        meter = StallMeter()
+        runner.submit("split", division.division_by_week, target, path, cancellable=True,
+                      on_progress=events.append, on_done=lambda result: events.append("done"))
+        run_until(app, lambda: "done" in events)
+        print(f"split on a worker:       longest event loop stall {meter.longest * 1e3:8.1f} ms, "
+              f"{len(events) - 1} progress updates")
+
+        for name in os.listdir(target):
+            os.remove(os.path.join(target, name))
+        outcome = []
+        requested = []
+
+        def cancel_at(fraction: float) -> None:
+            if fraction > 0.2 and not requested:
+                requested.append(time.perf_counter())
+                runner.cancel("split")
+
+        runner.submit("split", division.division_by_week, target, path, cancellable=True, on_progress=cancel_at,
+                      on_done=lambda result: outcome.append("done"),
+                      on_cancelled=lambda: outcome.append(time.perf_counter()))
+        run_until(app, lambda: outcome)
+        leftovers = os.listdir(target)
+        cancelled = outcome[0] != "done"
+        # Разбиение, успевшее завершиться до отмены, оставляет все файлы и сообщает о выполнении
+        assert leftovers == [] if cancelled else leftovers, f"{outcome[0]}, {len(leftovers)} files left"
+        print(f"cancel:                  {'cancelled' if cancelled else 'completed first'}, "
+              f"{len(leftovers)} files left, "
+              f"{(outcome[0] - requested[0]) * 1e3 if cancelled else 0:.1f} ms from request to cleanup")
+
+        # Порядок: задачи одного потока выполняются в порядке запуска, в канале побеждает последняя
+        delivered = []
+        for number in range(20):
+            runner.submit(f"query {number}", lambda value: value, number, on_done=delivered.append)
+        for number in range(20):
+            runner.submit("info", lambda value: value, 100 + number, on_done=delivered.append)
+        run_until(app, lambda: not runner.current)
+        expected = list(range(20)) + [119]
+        assert delivered == expected, delivered
+        print("ordering:                ok")
+
+        # Окно приложения: поиск выполняется в потоке и обновляет self.info по завершении
+        window = QtWidgets.QMainWindow()
+        ui = main_window.Ui_MainWindow()
+        ui.setupUi(window)
+        ui.path = path
+        ui.date.setDate(QtCore.QDate(2007, 1, 5))
+        ui.get_data()
+        run_until(app, lambda: not ui.queries.current)
+        print(f"window search:           {ui.info.text().splitlines()[0]}")
+        meter.timer.stop()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
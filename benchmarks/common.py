@@ -0,0 +1,26 @@
+import time
+
+# Синтетические данные создаются теми же генераторами, что и в тестах
+from tests.helpers import make_dataset, make_diary_page
+
+
+def measure(function, *args, repeat: int = 5) -> float:
+    """
+    Функция measure возвращает лучшее время выполнения функции в секундах из repeat запусков.
+
+    Аргументы:
+
+    function (callable): измеряемая функция
+    args: аргументы функции
+    repeat (int): количество запусков
+    Возвращает:
+
+    seconds (float): лучшее время выполнения
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
@@ -0,0 +1,393 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import statistics
+import subprocess
+
+import modules.add_functions as ef
+from modules.stations import dataset_path, layout_directory
+from benchmarks.common import make_dataset, make_diary_page
+
+# Строк в одном наборе данных станции: по строке на день, так что в календарь до 9999 года
+# помещается около 2.9 млн строк. Большие размеры раскладываются на несколько станций
+STATION_ROWS = 2_500_000
+# ef.read_data держит в памяти список строк всего файла; на больших файлах он не запускается
+READ_DATA_ROWS = 1_000_000
+# Первый запуск дольше этого времени не повторяется, даже если тёплое время ещё не измерено
+COLD_LIMIT = 10.0
+GROUPS = ("ingest", "read", "split", "search", "iterate", "analytics")
+START = datetime.date(2007, 1, 1)
+
+
+def parse_size(text: str) -> int:
+    """
+    Функция parse_size переводит размер вида '10k', '1M', '10M' или '2500' в количество строк.
+
+    Аргументы:
+
+    text (str): размер
+    Возвращает:
+
+    rows (int): количество строк
+    """
+
+    text = text.strip()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1:].lower(), 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def size_label(rows: int) -> str:
+    if rows % 1_000_000 == 0:
+        return f"{rows // 1_000_000}M"
+    if rows % 1_000 == 0:
+        return f"{rows // 1_000}k"
+    return str(rows)
+
+
+def timed(function, setup=None, min_time: float = 0.5, max_runs: int = 100, items: int = 1) -> dict:
+    """
+    Функция timed запускает функцию, пока суммарное время запусков после первого не превысит min_time
+    или число запусков не достигнет max_runs. Первый запуск учитывается отдельно: в нём строятся кэши
+    и индексы; если он дольше COLD_LIMIT, функция больше не запускается.
+
+    Аргументы:
+
+    function (callable): измеряемая функция без аргументов
+    setup (callable | None): подготовка перед каждым запуском, не входит во время
+    min_time (float): минимальное суммарное время в секундах
+    max_runs (int): наибольшее количество запусков
+    items (int): сколько операций выполняет один запуск; времена делятся на него
+    Возвращает:
+
+    result (dict): first, best, median (секунды на операцию) и runs
+    """
+
+    times = []
+    while not times or (len(times) < max_runs and sum(times[1:]) < min_time and times[0] < COLD_LIMIT):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return {"first": times[0] / items, "best": min(times) / items, "median": statistics.median(times) / items,
+            "runs": len(times), "items": items}
+
+
+class Suite:
+    """
+    Suite - это набор замеров для одного размера данных. Наборы данных станций создаются
+    в datasets/stations текущей папки, как их раскладывает pars_data, поэтому функции поиска
+    по станциям работают без дополнительных путей.
+
+    Аргументы:
+
+    rows (int): общее количество строк
+    min_time (float): минимальное время замера одного случая
+    Атрибуты:
+
+    results (dict): результаты по именам случаев 'группа/функция'
+    Методы:
+
+    run(self, groups) -> dict:
+      Выполняет группы замеров и возвращает результаты.
+    """
+
+    def __init__(self, rows: int, min_time: float = 0.5):
+        self.rows = rows
+        self.min_time = min_time
+        count = -(-rows // STATION_ROWS)
+        self.stations = list(range(1, count + 1))
+        self.station_rows = [rows // count + (number < rows % count) for number in range(count)]
+        self.path = dataset_path(1)
+        self.last = START + datetime.timedelta(days=self.station_rows[0] - 1)
+        generator = random.Random(0)
+        self.dates = [START + datetime.timedelta(days=generator.randrange(self.station_rows[0])) for _ in range(100)]
+        self.root = os.getcwd()
+        self.results = {}
+
+    def case(self, name: str, function, rows: int = None, **options) -> None:
+        options.setdefault("min_time", self.min_time)
+        try:
+            result = timed(function, **options)
+        except Exception as error:
+            result = {"error": f"{type(error).__name__}: {error}"}
+        result["rows"] = self.station_rows[0] if rows is None else rows
+        self.results[name] = result
+        shown = f"{result['best'] * 1e3:12.3f} ms" if "best" in result else result["error"]
+        print(f"  {name:<52} {shown}", flush=True)
+
+    def generate(self) -> None:
+        for station, rows in zip(self.stations, self.station_rows):
+            os.makedirs(os.path.dirname(dataset_path(station)), exist_ok=True)
+            make_dataset(dataset_path(station), rows, START, seed=station)
+
+    def run(self, groups: list) -> dict:
+        started = time.perf_counter()
+        self.generate()
+        print(f"{size_label(self.rows)}: {len(self.stations)} station(s), generated in "
+              f"{time.perf_counter() - started:.1f} s", flush=True)
+        # Поиск и итерация по разбиениям используют файлы, созданные группой split
+        if ("search" in groups or "iterate" in groups) and "split" not in groups:
+            from modules import division
+
+            division.division_by_station(self.stations[:1])
+        for group in groups:
+            getattr(self, f"bench_{group}")()
+        return self.results
+
+    def bench_ingest(self) -> None:
+        import pars_data
+        from modules import ingest
+        from modules.validation import RowValidator
+
+        os.makedirs("fixtures", exist_ok=True)
+        months = [(START.year + number // 12, number % 12 + 1) for number in range(24)]
+        for year, month in months:
+            with open(f"fixtures/{year}-{month:02d}.html", "w", encoding="utf-8") as file:
+                file.write(make_diary_page(year, month))
+
+        def parse(backend):
+            for year, month in months:
+                with open(f"fixtures/{year}-{month:02d}.html", encoding="utf-8") as file:
+                    pars_data.get_table_data(file.read(), year, month, backend)
+
+        tables = [pars_data.get_table_data(make_diary_page(year, month), year, month) for year, month in months]
+        rows = sum(map(len, tables))
+        for backend in pars_data.PARSERS:
+            self.case(f"ingest/get_table_data[{backend}]", lambda backend=backend: parse(backend), rows=rows)
+        self.case("ingest/validate_months", lambda: list(pars_data.validate_months(RowValidator(), months, tables)),
+                  rows=rows)
+
+        # Журнал загрузки копии набора: каждый запуск дописывает месяц после последней даты набора.
+        # Первое слияние строит индекс набора, следующие находят хвост чтением с конца файла
+        target = "ingest/dataset.csv"
+        os.makedirs("ingest", exist_ok=True)
+        shutil.copyfile(self.path, target)
+        month = [[ef.format_date(self.last.toordinal() + day), "+1", "750", "С 1м/с", "0", "751", "С 1м/с"]
+                 for day in range(1, 31)]
+        self.case("ingest/append_segment", lambda: ingest.append_segment(target, month), rows=len(month))
+        self.case("ingest/compact", lambda: ingest.compact(target), setup=lambda: ingest.append_segment(target, month))
+
+    def bench_read(self) -> None:
+        from modules.table import decode_table, load_table
+        from modules.sidecar import write_sidecar
+
+        if self.station_rows[0] <= READ_DATA_ROWS:
+            self.case("read/read_data", lambda: ef.read_data(self.path))
+        self.case("read/decode_table[csv]", lambda: decode_table(self.path))
+        self.case("read/write_sidecar", lambda: write_sidecar(self.path))
+        self.case("read/decode_table[sidecar]", lambda: decode_table(self.path))
+        self.case("read/load_table", lambda: load_table(self.path))
+
+    def bench_split(self) -> None:
+        from modules import division
+
+        def fresh(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+            os.makedirs(directory)
+
+        for name in ("division_by_week", "division_by_month", "division_by_year", "division_date_and_data"):
+            self.case(f"split/{name}", lambda name=name: getattr(division, name)("split", self.path),
+                      setup=lambda: fresh("split"), max_runs=3)
+        source = os.path.abspath(self.path)
+        self.case("split/split_csv_by_weeks", lambda: division.split_csv_by_weeks(source, 6),
+                  setup=lambda: (fresh("split"), os.chdir("split")), max_runs=1)
+        os.chdir(self.root)
+        shutil.rmtree("split", ignore_errors=True)
+
+        def clear_layouts():
+            for station in self.stations:
+                for kind in ("year", "month", "week", "date_and_data"):
+                    shutil.rmtree(layout_directory(kind, station), ignore_errors=True)
+
+        self.case("split/division_by_station", lambda: division.division_by_station(self.stations), rows=self.rows,
+                  setup=clear_layouts, max_runs=1)
+
+    def bench_search(self) -> None:
+        import modules.search as ds
+
+        dates = self.dates
+        year = (datetime.date(dates[0].year, 1, 1), datetime.date(dates[0].year, 12, 31))
+        month = (dates[0].replace(day=1), dates[0].replace(day=28))
+        for name, function in (("search", lambda day: ds.search(self.path, day)),
+                               ("find", lambda day: ds.find(self.path, day)),
+                               ("search_station", lambda day: ds.search_station(1, day)),
+                               ("search_by_year", lambda day: ds.search_by_year(day, 1)),
+                               ("search_by_week", lambda day: ds.search_by_week(day, 1)),
+                               ("search_by_date", lambda day: ds.search_by_date(day, 1))):
+            self.case(f"search/{name}", lambda function=function: [function(day) for day in dates], items=len(dates))
+        for kind in ("year", "month", "week"):
+            self.case(f"search/search_range[{kind}, month]", lambda kind=kind: ds.search_range(*month, kind, 1))
+            self.case(f"search/query_range[{kind}, year]",
+                      lambda kind=kind: ds.query_range(*year, ds.COLUMNS, kind, 1))
+        self.case("search/query_range[dataset, year]", lambda: ds.query_range(*year, ds.COLUMNS, None, 1))
+        self.case("search/query_batches[week, year]",
+                  lambda: sum(1 for _ in ds.query_batches(*year, kind="week", station=1, batch_size=64)))
+
+    def bench_iterate(self) -> None:
+        import modules.iterator as d_iter
+
+        steps = min(self.station_rows[0] - 1, 100_000)
+
+        def traverse(iterator):
+            for _ in range(steps):
+                next(iterator)
+
+        def step_back(iterator):
+            for _ in range(steps):
+                iterator.previous()
+
+        self.case("iterate/DataIterator[next]", lambda: traverse(d_iter.DataIterator(self.path)), items=steps)
+        iterator = d_iter.DataIterator(self.path)
+        self.case("iterate/DataIterator[seek]", lambda: [iterator.seek(day) for day in self.dates],
+                  items=len(self.dates))
+        self.case("iterate/PrefetchIterator[next]", lambda: traverse(d_iter.PrefetchIterator(self.path)), items=steps)
+        prefetch = d_iter.PrefetchIterator(self.path)
+        # Каждый проход назад начинается с конца пройденного участка
+        self.case("iterate/PrefetchIterator[previous]", lambda: step_back(prefetch), items=steps,
+                  setup=lambda: setattr(prefetch, "index", steps))
+
+    def bench_analytics(self) -> None:
+        import pandas as pd
+        import analytics
+
+        self.case("analytics/read_dataset", lambda: analytics.read_dataset(self.path), max_runs=5)
+        self.case("analytics/load_dataframe", lambda: analytics.load_dataframe(self.path), max_runs=5)
+        frame = analytics.load_dataframe(self.path)
+        start, end = self.dates[0].isoformat(), (self.dates[0] + datetime.timedelta(days=365)).isoformat()
+        for function in (analytics.add_derived_columns, analytics.monthly_means, analytics.yearly_means,
+                         analytics.morning_evening_delta):
+            self.case(f"analytics/{function.__name__}", lambda function=function: function(frame.copy()))
+        self.case("analytics/select_period",
+                  lambda: analytics.select_period(frame, "date", pd.Timestamp(start), pd.Timestamp(end)))
+        self.case("analytics/compute_statistical_info",
+                  lambda: analytics.compute_statistical_info(frame, analytics.NUMERIC_COLUMNS))
+        # Первый вызов строит хранилище агрегатов, следующие читают его
+        for name, runs in (("period_statistics[cold]", 1), ("period_statistics[warm]", 100)):
+            self.case(f"analytics/{name}", lambda: analytics.period_statistics(self.path, "temp_morning"), max_runs=runs)
+        from modules import columnar
+
+        if columnar.available():
+            self.case("analytics/write_table", lambda: columnar.write_table(self.path), max_runs=3)
+            self.case("analytics/load_columns", lambda: analytics.load_columns(self.path, ["temp_morning"], start, end))
+
+        # Прежние функции работают с колонками Date и Temperature
+        legacy = frame.rename(columns={"date": "Date", "temp_morning": "Temperature"})
+        self.case("analytics/handle_invalid_values", lambda: analytics.handle_invalid_values(legacy))
+        self.case("analytics/add_fahrenheit_column",
+                  lambda: analytics.add_fahrenheit_column(legacy.copy(), "Temperature"))
+        legacy = analytics.add_fahrenheit_column(legacy, "Temperature")
+        self.case("analytics/filter_by_temperature", lambda: analytics.filter_by_temperature(legacy, 5))
+        self.case("analytics/filter_by_date", lambda: analytics.filter_by_date(legacy, start, end))
+        self.case("analytics/group_by_month_and_compute_mean_temperature",
+                  lambda: analytics.group_by_month_and_compute_mean_temperature(legacy))
+
+        for name, function in (("filter_by_temperature_chunked", lambda: analytics.filter_by_temperature_chunked(self.path, 5)),
+                               ("filter_by_date_chunked", lambda: analytics.filter_by_date_chunked(self.path, start, end)),
+                               ("monthly_means_chunked", lambda: analytics.monthly_means_chunked(self.path)),
+                               ("describe_chunked", lambda: analytics.describe_chunked(self.path))):
+            self.case(f"analytics/{name}", function, max_runs=3)
+
+
+def metadata(min_time: float) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count(), "min_time": min_time}
+
+
+def compare(results: dict, baseline: dict, threshold: float, normalize: bool = True) -> list:
+    """
+    Функция compare сравнивает лучшие времена с прежним запуском и печатает отношения.
+    Скорость общей машины меняется между запусками сразу для всех случаев, поэтому регрессией
+    считается случай, отношение которого больше медианного отношения по всем случаям.
+
+    Аргументы:
+
+    results (dict): результаты текущего запуска (поле 'sizes')
+    baseline (dict): результаты прежнего запуска (поле 'sizes')
+    threshold (float): во сколько раз медленнее случай считается регрессией
+    normalize (bool): делить ли отношения на медианное отношение
+    Возвращает:
+
+    regressions (list): имена случаев с регрессией в виде 'размер/группа/функция'
+    """
+
+    ratios = {}
+    for size, current in results.items():
+        previous = baseline.get(size, {}).get("cases", {})
+        for name, result in current["cases"].items():
+            old = previous.get(name, {})
+            if "best" in result and "best" in old:
+                ratios[size, name] = (old["best"], result["best"], result["best"] / old["best"])
+    if not ratios:
+        return []
+    shift = statistics.median(ratio for _, _, ratio in ratios.values()) if normalize else 1.0
+    print(f"median ratio x{shift:.2f}" + ("; regressions are measured against it" if normalize else ""))
+    regressions = []
+    for (size, name), (old, new, ratio) in ratios.items():
+        mark = "  REGRESSION" if ratio / shift > threshold else ""
+        print(f"{size:>4} {name:<52} {old * 1e3:12.3f} -> {new * 1e3:12.3f} ms  x{ratio:5.2f} "
+              f"(x{ratio / shift:5.2f}){mark}")
+        if mark:
+            regressions.append(f"{size}/{name}")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры загрузки, разбиения, поиска, итерации и аналитики")
+    parser.add_argument("--sizes", default="10k,1M,10M", help="размеры наборов через запятую, например 10k,1M,10M")
+    parser.add_argument("--groups", default=",".join(GROUPS), help="группы замеров: " + ", ".join(GROUPS))
+    parser.add_argument("--output", default="benchmark_results.json", help="файл результатов JSON")
+    parser.add_argument("--min-time", type=float, default=0.5, help="минимальное время замера одного случая, с")
+    parser.add_argument("--compare", help="файл результатов прежнего запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=1.5, help="порог регрессии для --compare")
+    parser.add_argument("--no-normalize", dest="normalize", action="store_false",
+                        help="сравнивать с порогом сами отношения, а не отношения к медианному")
+    args = parser.parse_args(argv)
+    groups = [group for group in args.groups.split(",") if group]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"неизвестные группы: {', '.join(sorted(unknown))}")
+
+    root = os.getcwd()
+    output = os.path.abspath(args.output)
+    report = {"meta": metadata(args.min_time), "sizes": {}}
+    for rows in map(parse_size, args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                suite = Suite(rows, args.min_time)
+                cases = suite.run(groups)
+            finally:
+                os.chdir(root)
+        report["sizes"][size_label(rows)] = {"rows": rows, "stations": len(suite.stations),
+                                             "station_rows": suite.station_rows[0], "cases": cases}
+        # Результаты записываются после каждого размера, чтобы прерванный запуск не терял готовые
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=1)
+    print(f"results: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        return 1 if compare(report["sizes"], baseline["sizes"], args.threshold, args.normalize) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
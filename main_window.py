@@ -1,32 +1,52 @@
+import os
 import sys
+import shutil
+import argparse
+import datetime
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import QDate
 
 import modules.add_functions as ef
+from workers import TaskRunner
 
-import modules.search as ds
-import modules.iterator as d_iter
-import modules.division as dd
-
-import shutil
-import os
-import datetime
+# Модули поиска, итерации и разбиения загружаются при первом обращении из обработчиков кнопок,
+# чтобы не задерживать появление окна
 
 file_name = 'dataset.csv'
 target_folder = 'C:\\Users\\andre\\PycharmProjects\\pythonProject\\pythonProject4\\pythonProgram\\target_folder'
 
-timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-new_file_name = f"{timestamp}_{file_name}"
-new_file_path = os.path.join(target_folder, new_file_name)
 
-if os.path.exists(new_file_path):
-    new_file_path = shutil.copy2(file_name, target_folder)
-    print("Файл успешно скопирован с уникальным именем:", new_file_path)
-else:
-    shutil.move(file_name, new_file_path)
-    print(f"Файл успешно перемещен с уникальным именем: {new_file_name}")
+def archive_dataset(file_name: str = file_name, target_folder: str = target_folder) -> str:
+    """
+    Функция archive_dataset переносит файл набора данных в папку архива под уникальным именем
+    с отметкой времени; если такое имя уже занято, файл копируется. Перед переносом с файлом
+    сливаются незаписанные сегменты журнала загрузки (modules.ingest).
+
+    Аргументы:
+
+    file_name (str): путь к файлу набора данных
+    target_folder (str): папка архива
+    Возвращает:
+
+    path (str): путь к файлу в архиве
+    """
+
+    import modules.ingest as ingest
+
+    ingest.compact(file_name)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    new_file_name = f"{timestamp}_{os.path.basename(file_name)}"
+    new_file_path = os.path.join(target_folder, new_file_name)
+
+    if os.path.exists(new_file_path):
+        new_file_path = shutil.copy2(file_name, target_folder)
+        print("Файл успешно скопирован с уникальным именем:", new_file_path)
+    else:
+        shutil.move(file_name, new_file_path)
+        print(f"Файл успешно перемещен с уникальным именем: {new_file_name}")
+    return new_file_path
 
 
 class Ui_MainWindow(object):
@@ -39,11 +59,19 @@ class Ui_MainWindow(object):
 
         self.path = ""
         self.it = None
+        # Строка, к которой ведёт навигация, и показанная дата: если дату изменили вручную,
+        # следующий шаг начинается от неё
+        self.__target = -1
+        self.__shown = None
+        self.__queued = 0
+        # Поиск и итерация выполняются по одной задаче в порядке нажатий, разбиение - в отдельном потоке
+        self.queries = TaskRunner(1, MainWindow)
+        self.jobs = TaskRunner(1, MainWindow)
 
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         self.verticalLayoutWidget = QtWidgets.QWidget(self.centralwidget)
-        self.verticalLayoutWidget.setGeometry(QtCore.QRect(20, 310, 613, 215))
+        self.verticalLayoutWidget.setGeometry(QtCore.QRect(20, 310, 613, 250))
         self.verticalLayoutWidget.setObjectName("verticalLayoutWidget")
         self.verticalLayout = QtWidgets.QVBoxLayout(self.verticalLayoutWidget)
         self.verticalLayout.setContentsMargins(0, 0, 0, 0)
@@ -87,11 +115,38 @@ class Ui_MainWindow(object):
         self.info = QtWidgets.QLabel(self.verticalLayoutWidget)
         self.info.setObjectName("info")
         self.verticalLayout.addWidget(self.info)
+        # Кнопки навигации повторяют нажатие, пока их удерживают
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.prev_button = QtWidgets.QPushButton(self.verticalLayoutWidget)
+        self.prev_button.setObjectName("prev_button")
+        self.prev_button.setAutoRepeat(True)
+        self.prev_button.clicked.connect(self.prev_element)
+        self.horizontalLayout_3.addWidget(self.prev_button)
         self.next_button = QtWidgets.QPushButton(self.verticalLayoutWidget)
         self.next_button.setObjectName("next_button")
+        self.next_button.setAutoRepeat(True)
         self.next_button.clicked.connect(self.next_element)
-
-        self.verticalLayout.addWidget(self.next_button)
+        self.horizontalLayout_3.addWidget(self.next_button)
+        self.verticalLayout.addLayout(self.horizontalLayout_3)
+        self.horizontalLayout_4 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_4.setObjectName("horizontalLayout_4")
+        self.jump_back_button = QtWidgets.QPushButton(self.verticalLayoutWidget)
+        self.jump_back_button.setObjectName("jump_back_button")
+        self.jump_back_button.setAutoRepeat(True)
+        self.jump_back_button.clicked.connect(lambda: self.jump(-self.jump_size.value()))
+        self.horizontalLayout_4.addWidget(self.jump_back_button)
+        self.jump_size = QtWidgets.QSpinBox(self.verticalLayoutWidget)
+        self.jump_size.setObjectName("jump_size")
+        self.jump_size.setRange(1, 36500)
+        self.jump_size.setValue(7)
+        self.horizontalLayout_4.addWidget(self.jump_size)
+        self.jump_forward_button = QtWidgets.QPushButton(self.verticalLayoutWidget)
+        self.jump_forward_button.setObjectName("jump_forward_button")
+        self.jump_forward_button.setAutoRepeat(True)
+        self.jump_forward_button.clicked.connect(lambda: self.jump(self.jump_size.value()))
+        self.horizontalLayout_4.addWidget(self.jump_forward_button)
+        self.verticalLayout.addLayout(self.horizontalLayout_4)
         self.verticalLayoutWidget_2 = QtWidgets.QWidget(self.centralwidget)
         self.verticalLayoutWidget_2.setGeometry(
             QtCore.QRect(20, 100, 378, 178))
@@ -134,6 +189,16 @@ class Ui_MainWindow(object):
         self.statusbar = QtWidgets.QStatusBar(MainWindow)
         self.statusbar.setObjectName("statusbar")
         MainWindow.setStatusBar(self.statusbar)
+        self.progress = QtWidgets.QProgressBar(self.statusbar)
+        self.progress.setRange(0, 100)
+        self.progress.setObjectName("progress")
+        self.progress.hide()
+        self.statusbar.addPermanentWidget(self.progress)
+        self.cancel_button = QtWidgets.QPushButton(self.statusbar)
+        self.cancel_button.setObjectName("cancel_button")
+        self.cancel_button.clicked.connect(lambda: self.jobs.cancel("split"))
+        self.cancel_button.hide()
+        self.statusbar.addPermanentWidget(self.cancel_button)
 
         self.retranslateUi(MainWindow)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
@@ -147,7 +212,11 @@ class Ui_MainWindow(object):
         self.info.setText(_translate("MainWindow", "Температура: -20 °C\n"
                                      "Давление: 765 мм.рт.ст.\n"
                                      "Ветер: В 2 м/c"))
+        self.prev_button.setText(_translate("MainWindow", "Предыдущая дата "))
         self.next_button.setText(_translate("MainWindow", " Следующая дата"))
+        self.jump_back_button.setText(_translate("MainWindow", "Назад на"))
+        self.jump_size.setSuffix(_translate("MainWindow", " дн."))
+        self.jump_forward_button.setText(_translate("MainWindow", "Вперёд на"))
         self.div_text_label.setText(_translate(
             "MainWindow", "Разделение основного датасета"))
         self.btn_div_by_data_date.setText(_translate(
@@ -158,75 +227,187 @@ class Ui_MainWindow(object):
             "MainWindow", "Разделить файлы по годам"))
         self.pushButton.setText(_translate(
             "MainWindow", "Загрузить основной датасет"))
+        self.cancel_button.setText(_translate("MainWindow", "Отмена"))
 
     def upload_path(self):
         self.path = QtWidgets.QFileDialog.getOpenFileName()[0]
         if self.path:
-            try:
-                self.it = d_iter.DataIterator(self.path)
-            except:
-                self.path = ""
-                self.__warning_icon(
-                    "Предупреждение", "Возможно, что вы выбрали файл не того формата")
+            import modules.iterator as d_iter
+
+            self.it = None
+            self.__target = -1
+            self.__shown = None
+            self.__queued = 0
+            self.queries.submit("iterator", d_iter.PrefetchIterator, self.path,
+                                on_done=self.__set_iterator, on_error=self.__wrong_file)
+
+    def __set_iterator(self, iterator):
+        self.it = iterator
+
+    def __wrong_file(self, error):
+        self.path = ""
+        self.__warning_icon(
+            "Предупреждение", "Возможно, что вы выбрали файл не того формата")
 
     def get_data(self):
+        if self.path:
+            import modules.search as ds
+
+            self.queries.submit("info", ds.search, self.path, self.date.date().toPyDate(),
+                                on_done=self.__show_data,
+                                on_error=lambda error: self.info.setText("Информация за этот день отсутствует"))
+        else:
+            self.__warning_icon(
+                "Предупреждение", "Загрузите файл с исходным датасетом")
+
+    def __show_data(self, data):
         try:
-            if self.path:
-                data = ds.search(self.path, self.date.date().toPyDate())
-                self.info.setText(
-                    f"Температура: {data[0]} °C\nДавление: {data[1]} мм.рт.ст.\nВетер: {data[2]} {data[3]} м/c")
-            else:
-                self.__warning_icon(
-                    "Предупреждение", "Загрузите файл с исходным датасетом")
+            self.info.setText(
+                f"Температура: {data[0]} °C\nДавление: {data[1]} мм.рт.ст.\nВетер: {data[2]} {data[3]} м/c")
         except:
             self.info.setText("Информация за этот день отсутствует")
 
     def next_element(self):
-        try:
-            self.it.index = ds.find(self.path, self.date.date().toPyDate())
-            data = next(self.it)
-            self.info.setText(
-                f"Температура: {data[1]} °C\nДавление: {data[2]} мм.рт.ст.\nВетер: {data[3]} {data[4]} м/c")
-            date = list(map(int, data[0].split("-")))
-            self.date.setDate(QDate(*date))
-        except StopIteration:
+        self.jump(1)
+
+    def prev_element(self):
+        self.jump(-1)
+
+    def jump(self, count):
+        if self.it is None:
+            self.__warning_icon(
+                "Предупреждение", "Загрузите файл с исходным датасетом")
+            return
+        if self.queries.busy("iterator"):
+            # Пока строки читаются, нажатия копятся и применяются одним шагом
+            self.__queued += count
+            return
+        day = self.date.date().toPyDate()
+        if day != self.__shown:
+            # Дату изменили вручную: строка ищется в потоке поиска
+            self.queries.submit("iterator", self.it.fetch, day, count,
+                                on_done=self.__fetched, on_error=self.__step_failed)
+            return
+        target = self.__target + count
+        if not 0 <= target < len(self.it):
+            self.__step_failed(StopIteration())
+            return
+        self.__target = target
+        if self.it.cached(target):
+            self.__show_next(self.it.move(target))
+            self.__prefetch(count)
+        else:
+            # Переход дальше подкачанных строк: строки читаются в потоке, окно не блокируется
+            self.queries.submit("iterator", self.it.fetch, target, 0, count,
+                                on_done=self.__fetched, on_error=self.__step_failed)
+
+    def __fetched(self, result):
+        index, fetched = result
+        self.it.install(fetched)
+        self.__target = index
+        self.__show_next(self.it.move(index))
+        if self.__queued:
+            count, self.__queued = self.__queued, 0
+            self.jump(count)
+
+    def __prefetch(self, stride):
+        if self.queries.busy("prefetch"):
+            return
+        rows = self.it.refill(stride)
+        if rows:
+            self.queries.submit("prefetch", self.it.read, rows, on_done=self.it.install)
+
+    def __show_next(self, data):
+        self.info.setText(
+            f"Температура: {data[1]} °C\nДавление: {data[2]} мм.рт.ст.\nВетер: {data[3]} {data[4]} м/c")
+        date = ef.to_date(data[0])
+        self.__shown = date
+        self.date.setDate(QDate(date.year, date.month, date.day))
+
+    def __step_failed(self, error):
+        self.__queued = 0
+        if isinstance(error, StopIteration):
             self.__warning_icon(
                 "Предупреждение", "Элементов в датесете больше нет")
-        except:
+        else:
             self.__warning_icon(
                 "Предупреждение", "Загрузите файл с исходным датасетом")
 
-    def div_by_data_date(self):
+    def __split(self, name):
         folderpath = QtWidgets.QFileDialog.getExistingDirectory()
-        if folderpath:
-            dd.division_date_and_data(folderpath, self.path)
-        else:
+        if not folderpath:
             self.__warning_icon(
                 "Предупреждение", "Укажите папку, куда сохранить разделенные файлы")
+            return
+        if not self.path:
+            self.__warning_icon(
+                "Предупреждение", "Загрузите файл с исходным датасетом")
+            return
+        import modules.division as dd
+
+        self.progress.setValue(0)
+        self.progress.show()
+        self.cancel_button.show()
+        self.jobs.submit("split", getattr(dd, name), folderpath, self.path, cancellable=True,
+                         on_progress=lambda fraction: self.progress.setValue(int(fraction * 100)),
+                         on_done=lambda result: self.__split_finished("Разбиение завершено"),
+                         on_cancelled=lambda: self.__split_finished("Разбиение отменено"),
+                         on_error=self.__split_failed)
+
+    def __split_finished(self, message):
+        self.progress.hide()
+        self.cancel_button.hide()
+        self.statusbar.showMessage(message, 5000)
+
+    def __split_failed(self, error):
+        self.__split_finished("")
+        self.__warning_icon(
+            "Предупреждение", "Загрузите файл с исходным датасетом")
+
+    def div_by_data_date(self):
+        self.__split("division_date_and_data")
 
     def div_by_week(self):
-        folderpath = QtWidgets.QFileDialog.getExistingDirectory()
-        if folderpath:
-            dd.division_by_week(folderpath, self.path)
-        else:
-            self.__warning_icon(
-                "Предупреждение", "Укажите папку, куда сохранить разделенные файлы")
+        self.__split("division_by_week")
 
     def div_by_year(self):
-        try:
-            folderpath = QtWidgets.QFileDialog.getExistingDirectory()
-            if folderpath:
-                dd.division_by_year(folderpath, self.path)
-            else:
-                self.__warning_icon(
-                    "Предупреждение", "Укажите папку, куда сохранить разделенные файлы")
-        except:
-            self.__warning_icon(
-                "Предупреждение", "Загрузите файл с исходным датасетом")
+        self.__split("division_by_year")
 
     def __warning_icon(self, text, info):
         error = QtWidgets.QMessageBox()
         error.setIcon(QMessageBox.Warning)
         error.setWindowTitle(text)
         error.setText(info)
-        error.exec_()
\ No newline at end of file
+        error.exec_()
+
+
+def main(argv: list = None) -> int:
+    """
+    Функция main запускает окно приложения.
+
+    Аргументы:
+
+    argv (list): аргументы командной строки; по умолчанию sys.argv
+    Возвращает:
+
+    code (int): код завершения цикла событий Qt
+    """
+
+    argv = sys.argv if argv is None else argv
+    parser = argparse.ArgumentParser(description="Просмотр и разбиение набора данных о погоде")
+    parser.add_argument("--archive", action="store_true",
+                        help=f"перед запуском перенести {file_name} в папку архива {target_folder}")
+    # Остальные аргументы (например, -platform) разбирает Qt
+    args, qt_argv = parser.parse_known_args(argv[1:])
+    if args.archive:
+        archive_dataset()
+    app = QtWidgets.QApplication(argv[:1] + qt_argv)
+    window = QtWidgets.QMainWindow()
+    ui = Ui_MainWindow()
+    ui.setupUi(window)
+    window.show()
+    return app.exec_()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,6 +22,116 @@ def read_data(path: str) -> list:
     return data
 
 
+def file_signature(path: str) -> tuple:
+    """
+    Функция file_signature возвращает время изменения и размер файла. По ней кэши
+    определяют, что файл изменился и построенные по нему структуры нужно обновить.
+
+    Аргументы:
+
+    path (str): путь к файлу
+    Возвращает:
+
+    signature (tuple): время изменения в наносекундах и размер файла в байтах
+    """
+
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def date_to_ordinal(value: str | bytes | datetime.date) -> int:
+    """
+    Функция date_to_ordinal переводит дату в порядковый номер дня (datetime.date.toordinal).
+    Принимаются строки 'гггг-м-д' с ведущими нулями и без них, строки 'ггггммдд' и объекты date.
+
+    Аргументы:
+
+    value (str | bytes | datetime.date): дата
+    Возвращает:
+
+    ordinal (int): порядковый номер дня
+
+    Исключения:
+
+    ValueError: если строку нельзя разобрать как дату
+    """
+
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    value = value.strip()
+    if "-" in value:
+        year, month, day = value.split("-")
+    elif len(value) == 8:
+        year, month, day = value[:4], value[4:6], value[6:]
+    else:
+        raise ValueError(f"Неверный формат даты: {value!r}")
+    return datetime.date(int(year), int(month), int(day)).toordinal()
+
+
+def parts_to_ordinal(year: str | int, month: str | int, day: str | int) -> int:
+    """
+    Функция parts_to_ordinal переводит дату, записанную тремя полями (как в X.csv), в порядковый номер дня.
+
+    Аргументы:
+
+    year (str | int): год
+    month (str | int): месяц
+    day (str | int): день
+    Возвращает:
+
+    ordinal (int): порядковый номер дня
+    """
+
+    return datetime.date(int(year), int(month), int(day)).toordinal()
+
+
+def ordinal_to_date(ordinal: int) -> datetime.date:
+    """
+    Функция ordinal_to_date переводит порядковый номер дня обратно в дату.
+
+    Аргументы:
+
+    ordinal (int): порядковый номер дня
+    Возвращает:
+
+    date (datetime.date): дата
+    """
+
+    return datetime.date.fromordinal(ordinal)
+
+
+def to_date(value: str | bytes | datetime.date) -> datetime.date:
+    """
+    Функция to_date разбирает дату в любом виде, который принимает date_to_ordinal, в объект date.
+
+    Аргументы:
+
+    value (str | bytes | datetime.date): дата
+    Возвращает:
+
+    date (datetime.date): дата
+    """
+
+    return datetime.date.fromordinal(date_to_ordinal(value))
+
+
+def format_date(ordinal: int) -> str:
+    """
+    Функция format_date возвращает каноническую запись даты 'гггг-мм-дд'.
+
+    Аргументы:
+
+    ordinal (int): порядковый номер дня
+    Возвращает:
+
+    date (str): дата в формате 'гггг-мм-дд'
+    """
+
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
 def growth(today: str, next_day: str) -> int:
     """
     Функция growth вычисляет количество дней роста между двумя датами.
@@ -35,6 +145,4 @@ def growth(today: str, next_day: str) -> int:
     growth (int): количество дней роста
     """
 
-    current_day = datetime.datetime.strptime(today, '%Y-%m-%d').date()
-    following_day = datetime.datetime.strptime(next_day, '%Y-%m-%d').date()
-    return (following_day - current_day).days
\ No newline at end of file
+    return date_to_ordinal(next_day) - date_to_ordinal(today)
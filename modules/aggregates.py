@@ -0,0 +1,426 @@
+import os
+import io
+import csv
+import json
+import bisect
+import operator
+import datetime
+from collections import Counter
+
+import modules.add_functions as ef
+import modules.ingest as ingest
+from modules.manifest import week_key
+from modules.table import COLUMNS, MISSING, WeatherTable, load_table
+
+# Колонки, по которым накапливается статистика; направление ветра - код, а не число
+NUMERIC_COLUMNS = tuple(name for name in COLUMNS[1:] if not name.startswith("wind_direction"))
+KINDS = ("month", "week")
+SUFFIX = ".agg.json"
+
+
+class Aggregate:
+    """
+    Aggregate - это накопленная статистика одной колонки за период: количество, сумма,
+    сумма квадратов, минимум, максимум и гистограмма значений. Значения в колонках целые
+    и их немного, поэтому гистограмма компактна и по ней медиана и квантили вычисляются
+    точно, без обращения к строкам.
+
+    Методы:
+
+    add_counts(self, counts) -> None:
+      Добавляет значения, заданные количеством повторов каждого значения.
+    merge(self, other) -> Aggregate:
+      Добавляет статистику другого периода.
+    quantile(self, q) -> float | None:
+      Возвращает квантиль с линейной интерполяцией, как pandas.
+    describe(self) -> dict:
+      Возвращает статистику в виде pandas.DataFrame.describe.
+    """
+
+    __slots__ = ("count", "sum", "sumsq", "min", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0
+        self.sumsq = 0
+        self.min = None
+        self.max = None
+        self.histogram = {}
+
+    def add_counts(self, counts: dict) -> None:
+        counts = dict(counts)
+        counts.pop(MISSING, None)
+        if not counts:
+            return
+        if self.histogram:
+            histogram = self.histogram
+            for value, number in counts.items():
+                histogram[value] = histogram.get(value, 0) + number
+        else:
+            self.histogram = counts
+        # Суммы считаются встроенными функциями без цикла Python по значениям
+        values, numbers = counts.keys(), counts.values()
+        self.count += sum(numbers)
+        self.sum += sum(map(operator.mul, values, numbers))
+        self.sumsq += sum(map(operator.mul, map(operator.mul, values, values), numbers))
+        low, high = min(counts), max(counts)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.add_counts(other.histogram)
+        return self
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def std(self) -> float | None:
+        # Выборочное отклонение (ddof=1), как в pandas
+        if self.count < 2:
+            return None
+        variance = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return max(variance, 0.0) ** 0.5
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Метод quantile возвращает квантиль по гистограмме с линейной интерполяцией между
+        соседними значениями, как pandas.Series.quantile.
+        """
+
+        if not self.count:
+            return None
+        position = q * (self.count - 1)
+        lower = int(position)
+        seen = 0
+        low = high = None
+        # Значения с номерами lower и lower + 1 в отсортированном порядке
+        for value in sorted(self.histogram):
+            seen += self.histogram[value]
+            if low is None and seen > lower:
+                low = value
+            if seen > lower + 1:
+                high = value
+                break
+        if high is None:
+            high = low
+        return low + (high - low) * (position - lower)
+
+    @property
+    def median(self) -> float | None:
+        return self.quantile(0.5)
+
+    def describe(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "25%": self.quantile(0.25),
+            "50%": self.quantile(0.5),
+            "75%": self.quantile(0.75),
+            "max": self.max,
+        }
+
+    def to_json(self) -> dict:
+        # Целые ключи json записывает строками, from_json разбирает их обратно
+        return self.histogram
+
+    @classmethod
+    def from_json(cls, histogram: dict) -> "Aggregate":
+        aggregate = cls()
+        aggregate.add_counts({int(value): number for value, number in histogram.items()})
+        return aggregate
+
+
+def period_start(kind: str, ordinal: int) -> int:
+    day = ef.ordinal_to_date(ordinal)
+    if kind == "month":
+        return datetime.date(day.year, day.month, 1).toordinal()
+    return ordinal - (ordinal - 1) % 7
+
+
+def period(kind: str, ordinal: int) -> tuple:
+    """
+    Функция period возвращает ключ периода, в который попадает дата, и порядковый номер
+    первого дня следующего периода.
+
+    Аргументы:
+
+    kind (str): 'month' или 'week' (неделя ISO)
+    ordinal (int): порядковый номер даты
+    Возвращает:
+
+    period (tuple): ключ вида 'гггг-мм' или 'гггг-Wнн' и граница периода
+    """
+
+    day = ef.ordinal_to_date(ordinal)
+    if kind == "month":
+        following = datetime.date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        return f"{day.year}-{day.month:02d}", following.toordinal()
+    # Порядковый номер 1 - понедельник, поэтому недели ISO начинаются с номеров 7k + 1
+    return week_key(day), ordinal - (ordinal - 1) % 7 + 7
+
+
+class AggregateCube:
+    """
+    AggregateCube - это хранилище статистики Aggregate по каждой числовой колонке
+    для каждого месяца и каждой недели ISO набора данных. Статистика добавляется
+    порциями строк, поэтому при дописывании файла пересчитываются только новые строки,
+    а при перезаписи хвоста - только периоды, которые он затрагивает.
+
+    Атрибуты:
+
+    partitions (dict): статистика по видам периодов, ключам периодов и колонкам; статистика,
+      прочитанная из файла, хранится гистограммой (dict) до первого обращения
+    counts (dict): количество строк по видам периодов и ключам периодов
+    rows (int): количество учтённых строк
+    size (int): размер учтённой части файла в байтах
+    mtime_ns (int): время изменения файла на момент последнего обновления
+    crc (int): контрольная сумма учтённой части файла
+    Методы:
+
+    update(self, table, start=0) -> None:
+      Добавляет статистику строк таблицы, начиная со строки start.
+    replace(self, table, first) -> None:
+      Пересчитывает статистику периодов, начиная с периода даты first.
+    statistics(self, kind, key, column) -> Aggregate | None:
+      Возвращает статистику колонки за период.
+    total(self, column, kind='month', keys=None) -> Aggregate:
+      Объединяет статистику колонки за несколько периодов.
+    """
+
+    def __init__(self):
+        self.partitions = {kind: {} for kind in KINDS}
+        self.counts = {kind: {} for kind in KINDS}
+        self.rows = 0
+        self.size = 0
+        self.mtime_ns = 0
+        self.crc = 0
+
+    def update(self, table: WeatherTable, start: int = 0) -> None:
+        for kind in KINDS:
+            self.__update(kind, table, start)
+        self.rows += len(table) - start
+
+    def replace(self, table: WeatherTable, first: int) -> None:
+        """
+        Метод replace удаляет статистику периодов, начиная с периода, в который попадает дата first,
+        и строит её заново по строкам упорядоченной таблицы table. Таблица должна содержать все строки
+        файла с начала самого раннего из этих периодов (month или week).
+        """
+
+        for kind in KINDS:
+            start = period_start(kind, first)
+            stale = period(kind, start)[0]
+            # Ключи 'гггг-мм' и 'гггг-Wнн' упорядочены как строки
+            for key in [key for key in self.partitions[kind] if key >= stale]:
+                del self.partitions[kind][key]
+                removed = self.counts[kind].pop(key, 0)
+                if kind == "month":
+                    self.rows -= removed
+            row = bisect.bisect_left(table.date, start)
+            self.__update(kind, table, row)
+            if kind == "month":
+                self.rows += len(table) - row
+
+    def __update(self, kind: str, table: WeatherTable, start: int) -> None:
+        dates = table.date
+        end = len(table)
+        if table.ordered:
+            # Строки одного периода идут подряд - границы находятся двоичным поиском
+            row = start
+            while row < end:
+                key, following = period(kind, dates[row])
+                stop = bisect.bisect_left(dates, following, row, end)
+                self.__add(kind, key, table, slice(row, stop))
+                row = stop
+            return
+        groups = {}
+        for row in range(start, end):
+            groups.setdefault(period(kind, dates[row])[0], []).append(row)
+        for key, rows in groups.items():
+            self.__add(kind, key, table, rows)
+
+    def __add(self, kind: str, key: str, table: WeatherTable, rows) -> None:
+        count = rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+        self.counts[kind][key] = self.counts[kind].get(key, 0) + count
+        self.partitions[kind].setdefault(key, {})
+        for name in NUMERIC_COLUMNS:
+            column = getattr(table, name)
+            values = column[rows] if isinstance(rows, slice) else (column[row] for row in rows)
+            aggregate = self.statistics(kind, key, name)
+            if aggregate is None:
+                aggregate = self.partitions[kind][key][name] = Aggregate()
+            aggregate.add_counts(Counter(values))
+
+    def statistics(self, kind: str, key: str, column: str) -> Aggregate | None:
+        cell = self.partitions[kind].get(key)
+        if cell is None:
+            return None
+        aggregate = cell.get(column)
+        if isinstance(aggregate, dict):
+            # Статистика из файла разбирается при первом обращении
+            aggregate = cell[column] = Aggregate.from_json(aggregate)
+        return aggregate
+
+    def keys(self, kind: str = "month") -> list:
+        return sorted(self.partitions[kind])
+
+    def total(self, column: str, kind: str = "month", keys=None) -> Aggregate:
+        total = Aggregate()
+        for key in self.partitions[kind] if keys is None else keys:
+            aggregate = self.statistics(kind, key, column)
+            if aggregate is not None:
+                total.merge(aggregate)
+        return total
+
+    def to_json(self) -> dict:
+        return {
+            "rows": self.rows,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "crc": self.crc,
+            "counts": self.counts,
+            "partitions": {
+                kind: {key: {name: aggregate if isinstance(aggregate, dict) else aggregate.to_json()
+                             for name, aggregate in cell.items()}
+                       for key, cell in cells.items()}
+                for kind, cells in self.partitions.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "AggregateCube":
+        cube = cls()
+        cube.rows, cube.size, cube.mtime_ns, cube.crc = data["rows"], data["size"], data["mtime_ns"], data["crc"]
+        cube.counts = {kind: dict(data["counts"][kind]) for kind in KINDS}
+        for kind, cells in data["partitions"].items():
+            cube.partitions[kind] = cells
+        return cube
+
+
+def cube_path(path: str) -> str:
+    return path + SUFFIX
+
+
+def write_cube(path: str, cube: AggregateCube) -> str:
+    target = cube_path(path)
+    with open(target + ".tmp", "w", encoding="utf-8") as file:
+        # json.dumps кодирует целиком на C; json.dump пишет по кусочкам через кодировщик на Python
+        file.write(json.dumps(cube.to_json(), separators=(",", ":")))
+    os.replace(target + ".tmp", target)
+    return target
+
+
+def read_cube(path: str) -> AggregateCube | None:
+    try:
+        with open(cube_path(path), "r", encoding="utf-8") as file:
+            return AggregateCube.from_json(json.load(file))
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def read_tail(path: str, start: int) -> WeatherTable:
+    with open(path, "rb") as file:
+        file.seek(start)
+        text = file.read().decode("utf-8")
+    return WeatherTable.from_rows(csv.reader(io.StringIO(text, newline="")))
+
+
+_cubes = {}
+
+
+def refresh_cube(path: str, cube: AggregateCube, signature: tuple) -> bool:
+    """
+    Функция refresh_cube приводит хранилище, построенное по прежней версии файла, к текущей версии,
+    если это можно сделать без полного пересчёта: файл не изменился по содержимому, только дописан
+    или его хвост переписан слияниями журнала загрузки.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    cube (AggregateCube): хранилище статистики
+    signature (tuple): текущая подпись файла
+    Возвращает:
+
+    changed (bool | None): True - хранилище обновлено (или только время изменения файла),
+      False - оно уже соответствовало файлу, None - нужен полный пересчёт
+    """
+
+    from modules.sidecar import checksum
+
+    mtime_ns, size = signature
+    if cube.size == size and cube.mtime_ns == mtime_ns:
+        return False
+    if cube.size == size and checksum(path) == cube.crc:
+        # Файл только перезаписан или затронут: запоминается новое время, чтобы не сверять его снова
+        cube.mtime_ns = mtime_ns
+        return True
+    rewritten = ingest.rewritten_since(path, (cube.mtime_ns, cube.size))
+    if rewritten is not None:
+        first = rewritten[1]
+        with open(path, "rb") as file:
+            # Набор после слияния упорядочен, поэтому начало затронутых периодов ищется с конца файла
+            offset = ingest.tail_offset(file, min(period_start(kind, first) for kind in KINDS))
+        if offset is not None:
+            cube.replace(read_tail(path, offset), first)
+            return True
+    if cube.size < size and checksum(path, cube.size) == cube.crc:
+        cube.update(read_tail(path, cube.size))
+        return True
+    return None
+
+
+def load_cube(path: str, persist: bool = True) -> AggregateCube:
+    """
+    Функция load_cube возвращает хранилище статистики для файла данных.
+    Сохранённое рядом с файлом хранилище используется, пока файл не изменился; если файл
+    только дописан (начало файла совпадает по контрольной сумме), учитываются лишь новые строки.
+    Если хвост файла переписан слияниями журнала загрузки (modules.ingest), пересчитываются
+    только периоды переписанных дат; иначе статистика пересчитывается заново.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    persist (bool): сохранять ли обновлённое хранилище рядом с файлом
+    Возвращает:
+
+    cube (AggregateCube): хранилище статистики
+    """
+
+    from modules.sidecar import checksum
+
+    key = os.path.abspath(path)
+    signature = ef.file_signature(path)
+    cached = _cubes.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    # Сначала хранилище прежней версии файла из памяти, затем сохранённое рядом с файлом
+    changed = None
+    if cached is not None:
+        cube = cached[1]
+        changed = refresh_cube(path, cube, signature)
+    if changed is None:
+        cube = read_cube(path)
+        changed = None if cube is None else refresh_cube(path, cube, signature)
+    if changed is None:
+        cube = AggregateCube()
+        cube.update(load_table(path))
+    if changed is not False:
+        if (cube.mtime_ns, cube.size) != signature:
+            cube.size, cube.mtime_ns = signature[1], signature[0]
+            cube.crc = checksum(path)
+        if persist:
+            write_cube(path, cube)
+    _cubes[key] = (signature, cube)
+    return cube
+
+
+if __name__ == "__main__":
+    import sys
+
+    for argument in sys.argv[1:]:
+        load_cube(argument)
+        print(cube_path(argument))
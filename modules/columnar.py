@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import datetime
+from array import array
+
+import modules.add_functions as ef
+from modules.table import COLUMNS, MISSING, WeatherTable, load_table
+
+# pyarrow - необязательная зависимость: без неё колоночный формат просто не используется
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+SUFFIX = ".parquet"
+# Строк в группе: по статистике дат групп чтение за период пропускает остальные группы
+ROW_GROUP_SIZE = 8192
+# Порядковый номер 1970-01-01: date32 в Arrow хранит дни от этой даты
+EPOCH_ORDINAL = 719163
+METADATA_KEY = b"weather"
+
+
+def available() -> bool:
+    return pq is not None
+
+
+def require() -> None:
+    if pq is None:
+        raise ImportError("Для колоночного формата нужен пакет pyarrow")
+
+
+def columnar_path(path: str) -> str:
+    """
+    Функция columnar_path возвращает путь к файлу Parquet для CSV-файла: 'dataset.csv' -> 'dataset.parquet'.
+    """
+
+    return os.path.splitext(path)[0] + SUFFIX
+
+
+def to_arrow(table: WeatherTable) -> "pa.Table":
+    """
+    Функция to_arrow переводит колонки WeatherTable в таблицу Arrow без разбора строк:
+    даты становятся date32, а значения MISSING - пропусками (null).
+
+    Аргументы:
+
+    table (WeatherTable): таблица данных
+    Возвращает:
+
+    table (pyarrow.Table): таблица Arrow
+    """
+
+    require()
+    rows = len(table)
+    columns = []
+    for name in COLUMNS:
+        column = getattr(table, name)
+        if name == "date":
+            ordinals = pa.Array.from_buffers(pa.int32(), rows, [None, pa.py_buffer(column)])
+            columns.append(pc.subtract(ordinals, pa.scalar(EPOCH_ORDINAL, pa.int32())).cast(pa.date32()))
+            continue
+        values = pa.Array.from_buffers(pa.int16(), rows, [None, pa.py_buffer(column)])
+        columns.append(pc.if_else(pc.equal(values, MISSING), pa.scalar(None, pa.int16()), values))
+    return pa.Table.from_arrays(columns, names=list(COLUMNS))
+
+
+def column_bytes(column, typecode: str) -> array:
+    chunk = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    data = array(typecode)
+    if len(chunk):
+        start = chunk.offset * data.itemsize
+        data.frombytes(chunk.buffers()[1].to_pybytes()[start:start + len(chunk) * data.itemsize])
+    return data
+
+
+def from_arrow(arrow_table: "pa.Table", ordered: bool = True) -> WeatherTable:
+    """
+    Функция from_arrow строит WeatherTable из таблицы Arrow, записанной to_arrow.
+
+    Аргументы:
+
+    arrow_table (pyarrow.Table): таблица Arrow со всеми колонками modules.table.COLUMNS
+    ordered (bool): упорядочены ли строки по дате
+    Возвращает:
+
+    table (WeatherTable): таблица данных
+    """
+
+    table = WeatherTable()
+    for name in COLUMNS:
+        column = arrow_table.column(name)
+        if name == "date":
+            table.date = column_bytes(pc.add(column.cast(pa.int32()), pa.scalar(EPOCH_ORDINAL, pa.int32())), "i")
+        else:
+            setattr(table, name, column_bytes(pc.fill_null(column, MISSING), "h"))
+    table.ordered = ordered
+    return table
+
+
+def write_parquet(target: str, table: WeatherTable, metadata: dict, row_group_size: int = ROW_GROUP_SIZE) -> str:
+    """
+    Функция write_parquet записывает таблицу в файл Parquet с метаданными metadata.
+    Файл записывается во временный и подменяется атомарно.
+
+    Аргументы:
+
+    target (str): путь к файлу Parquet
+    table (WeatherTable): таблица данных
+    metadata (dict): метаданные, сохраняемые в схеме файла
+    row_group_size (int): количество строк в группе
+    Возвращает:
+
+    path (str): путь к файлу Parquet
+    """
+
+    require()
+    arrow_table = to_arrow(table).replace_schema_metadata({METADATA_KEY: json.dumps(metadata)})
+    pq.write_table(arrow_table, target + ".tmp", row_group_size=row_group_size, write_statistics=True)
+    os.replace(target + ".tmp", target)
+    return target
+
+
+def write_table(path: str, table: WeatherTable | None = None, row_group_size: int = ROW_GROUP_SIZE) -> str:
+    """
+    Функция write_table записывает CSV-файл данных в файл Parquet рядом с ним.
+    В метаданных файла сохраняются размер, время изменения и контрольная сумма CSV-файла,
+    чтобы читатели могли проверить, что файл Parquet не устарел.
+
+    Аргументы:
+
+    path (str): путь к CSV-файлу данных
+    table (WeatherTable | None): уже разобранная таблица этого файла
+    row_group_size (int): количество строк в группе
+    Возвращает:
+
+    path (str): путь к файлу Parquet
+    """
+
+    from modules.sidecar import checksum
+
+    require()
+    if table is None:
+        table = load_table(path)
+    mtime_ns, size = ef.file_signature(path)
+    metadata = {"size": size, "mtime_ns": mtime_ns, "crc": checksum(path), "ordered": table.ordered}
+    return write_parquet(columnar_path(path), table, metadata, row_group_size)
+
+
+def read_metadata(path: str) -> dict | None:
+    target = columnar_path(path)
+    if pq is None or not os.path.exists(target):
+        return None
+    metadata = pq.read_schema(target).metadata or {}
+    if METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[METADATA_KEY])
+
+
+def is_fresh(path: str, metadata: dict | None) -> bool:
+    from modules.sidecar import checksum
+
+    if metadata is None:
+        return False
+    mtime_ns, size = ef.file_signature(path)
+    if (metadata["mtime_ns"], metadata["size"]) == (mtime_ns, size):
+        return True
+    return metadata["size"] == size and checksum(path) == metadata["crc"]
+
+
+def read_columns(path: str, columns: list | None = None, start: datetime.date | str | None = None,
+                 end: datetime.date | str | None = None) -> "pa.Table":
+    """
+    Функция read_columns читает из файла Parquet только нужные колонки и только группы строк,
+    даты которых пересекаются с [start, end]: колонки и фильтр по дате передаются в pyarrow,
+    который пропускает остальные данные по статистике групп.
+
+    Аргументы:
+
+    path (str): путь к CSV-файлу данных или к файлу Parquet
+    columns (list | None): колонки modules.table.COLUMNS; колонка date добавляется всегда
+    start (datetime.date | str | None): первая дата периода
+    end (datetime.date | str | None): последняя дата периода
+    Возвращает:
+
+    table (pyarrow.Table): таблица Arrow с колонкой date и запрошенными колонками
+    """
+
+    require()
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", ef.to_date(start)))
+    if end is not None:
+        filters.append(("date", "<=", ef.to_date(end)))
+    names = None if columns is None else ["date"] + [name for name in columns if name != "date"]
+    target = path if path.endswith(SUFFIX) else columnar_path(path)
+    return pq.read_table(target, columns=names, filters=filters or None)
+
+
+def open_table(path: str) -> WeatherTable | None:
+    """
+    Функция open_table возвращает WeatherTable из файла Parquet рядом с CSV-файлом.
+    Если pyarrow не установлен, файла нет или он не соответствует CSV-файлу, возвращается None.
+
+    Аргументы:
+
+    path (str): путь к CSV-файлу данных
+    Возвращает:
+
+    table (WeatherTable) | None: таблица данных или None
+    """
+
+    metadata = read_metadata(path)
+    if not is_fresh(path, metadata):
+        return None
+    table = from_arrow(pq.read_table(columnar_path(path)), metadata["ordered"])
+    table.signature = ef.file_signature(path)
+    return table
+
+
+if __name__ == "__main__":
+    for argument in sys.argv[1:]:
+        print(write_table(argument))
@@ -1,9 +1,14 @@
 import csv
+from collections import OrderedDict
+from datetime import date
 from datetime import datetime
 from datetime import timedelta
-import shutil
 import os
 import modules.add_functions as ef
+from modules.tasks import PROGRESS_ROWS
+from modules.manifest import OFFSET_RECORD, week_key, write_manifest
+from modules.table import WeatherTable
+from modules.stations import LAYOUTS, ROOT, dataset_path, layout_directory, list_stations
 
 
 def get_data_for_date(current_date, data_file):
@@ -59,90 +64,364 @@ class WeatherDataIterator:
         # Возвращаем кортеж с текущей датой и соответствующими данными
         return (self.current_date - timedelta(days=1), data)
 
-start_date = datetime(2023, 1, 1)
-end_date = datetime(2023, 12, 31)
-data_file = 'weather_data.csv'
 
-weather_data_iter = WeatherDataIterator(start_date, end_date, data_file)
+# Сколько файлов разбиения может быть открыто одновременно
+MAX_OPEN_FILES = 64
 
-def division_date_and_data(directory_path: str, file_path: str) -> None:
-    """Splitting the main file into two files by date and by data
-    Args:
-      directory_path: the path to the working directory for the shift
-    """
-    path = os.getcwd()
-    os.chdir(directory_path)
-    data = ef.read_data(file_path)
-    with open('X.csv', 'w', encoding="utf-8", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerows([i[0].split("-") for i in data])
-    with open('Y.csv', 'w', encoding="utf-8", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerows([i[1:] for i in data])
-    os.chdir(path)
 
+class WriterPool:
+    """Класс для записи строк в множество csv-файлов через ограниченный набор открытых файлов
+
+        Аргументы:
+        - max_open (int): максимальное количество одновременно открытых файлов
 
+        Возвращает:
+        - None
+        """
 
-def split_csv_by_weeks(input_file, num_files):
-    """Функция для разделения csv-файла на отдельные файлы по неделям
+    def __init__(self, max_open: int = MAX_OPEN_FILES):
+        self.max_open = max_open
+        self.__writers = OrderedDict()
+        self.__created = set()
+
+    def writerow(self, path: str, row) -> None:
+        writer = self.__writers.get(path)
+        if writer is None:
+            if len(self.__writers) >= self.max_open:
+                # Закрываем файл, в который дольше всего не писали
+                _, (file, _) = self.__writers.popitem(last=False)
+                file.close()
+            # Файл, закрытый пулом, открывается повторно на дозапись
+            mode = 'a' if path in self.__created else 'w'
+            self.__created.add(path)
+            file = open(path, mode, encoding="utf-8", newline="")
+            writer = self.__writers[path] = (file, csv.writer(file))
+        else:
+            self.__writers.move_to_end(path)
+        writer[1].writerow(row)
+
+    def close(self) -> None:
+        while self.__writers:
+            _, (file, _) = self.__writers.popitem()
+            file.close()
+
+
+class ByteCountingFile:
+    """Класс-обёртка над двоичным файлом для csv.writer: writerow возвращает число записанных байтов
+
+        Аргументы:
+        - file: двоичный файл, открытый на запись
+
+        Возвращает:
+        - None
+        """
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, text: str) -> int:
+        return self.file.write(text.encode("utf-8"))
+
+
+class DateDataSink:
+    """Класс приёмника, раскладывающего строки на файл с датами X.csv и файл с данными Y.csv.
+    Рядом записываются индекс Y.idx (дата и смещение строки в Y.csv для каждой строки)
+    и манифест разбиения с количеством строк и диапазоном дат. Файла Parquet для этого разбиения
+    нет: поиск по дате читает одну строку Y.csv по индексу, а колонки всего набора хранит
+    файл Parquet самого набора данных (modules.columnar).
+
+        Аргументы:
+        - directory_path (str): папка для файлов разбиения
+
+        Возвращает:
+        - None
+        """
+
+    kind = "date_and_data"
+
+    def __init__(self, directory_path: str):
+        self.directory_path = directory_path
+        self.x_path = os.path.join(directory_path, 'X.csv')
+        self.y_path = os.path.join(directory_path, 'Y.csv')
+        self.index_path = os.path.join(directory_path, 'Y.idx')
+        self.__files = []
+        self.count = 0
+        self.first = self.last = None
+        self.ordered = True
+
+    def __open(self) -> None:
+        x_file = open(self.x_path, 'w', encoding="utf-8", newline="")
+        y_file = open(self.y_path, 'wb')
+        self.__index = open(self.index_path, 'wb')
+        self.__files = [x_file, y_file, self.__index]
+        self.__x = csv.writer(x_file)
+        self.__y = csv.writer(ByteCountingFile(y_file))
+        self.__offset = 0
+
+    def route(self, number: int, day: date, row: list, pool: WriterPool) -> None:
+        if not self.__files:
+            self.__open()
+        ordinal = day.toordinal()
+        if self.count == 0:
+            self.first = self.last = day
+        elif day < self.last:
+            self.ordered = False
+        self.first = min(self.first, day)
+        self.last = max(self.last, day)
+        self.count += 1
+        self.__x.writerow((day.year, day.month, day.day))
+        self.__index.write(OFFSET_RECORD.pack(ordinal, self.__offset))
+        self.__offset += self.__y.writerow(row[1:])
+
+    def close(self) -> None:
+        while self.__files:
+            self.__files.pop().close()
+
+    def abort(self) -> None:
+        for path in (self.x_path, self.y_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def finish(self) -> None:
+        self.close()
+        partitions = {}
+        if self.count:
+            partitions['Y.csv'] = {"file": 'Y.csv', "dates": 'X.csv', "index": 'Y.idx',
+                                   "count": self.count, "ordered": self.ordered,
+                                   "min_date": self.first.isoformat(), "max_date": self.last.isoformat()}
+        write_manifest(self.directory_path, self.kind, partitions)
+
+
+class PeriodSink:
+    """Базовый класс приёмника, раскладывающего строки по файлам периодов.
+    Файл периода называется по первой и последней дате в нём: 'ггггммдд_ггггммдд.csv'.
+    Наследники определяют метод key, возвращающий ключ периода для даты, и имя вида
+    разбиения kind. Рядом с файлами записывается манифест (modules.manifest):
+    для каждого ключа - имя файла, диапазон номеров строк исходного файла,
+    количество строк и диапазон дат. При columnar=True рядом с каждым файлом периода
+    записывается файл Parquet (modules.columnar).
+
+        Аргументы:
+        - directory_path (str): папка для файлов разбиения
+        - columnar (bool): записывать ли файлы Parquet
+
+        Возвращает:
+        - None
+        """
+
+    kind = None
+
+    def __init__(self, directory_path: str, columnar: bool = False):
+        self.directory_path = directory_path
+        self.columnar = columnar
+        self.bounds = {}
+        self.paths = {}
+
+    def key(self, day: date):
+        raise NotImplementedError
+
+    def part_path(self, key) -> str:
+        return os.path.join(self.directory_path, f".{key}.part")
+
+    def route(self, number: int, day: date, row: list, pool: WriterPool) -> None:
+        key = self.key(day)
+        bounds = self.bounds.get(key)
+        if bounds is None:
+            self.bounds[key] = [day, day, number, number, 1]
+            self.paths[key] = self.part_path(key)
+        else:
+            if day < bounds[0]:
+                bounds[0] = day
+            elif day > bounds[1]:
+                bounds[1] = day
+            bounds[3] = number
+            bounds[4] += 1
+        pool.writerow(self.paths[key], row)
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        for path in self.paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def finish(self) -> None:
+        # Имя файла известно только после прохода по всем строкам
+        partitions = {}
+        for key, (first, last, first_row, last_row, count) in self.bounds.items():
+            file_name = f"{first.strftime('%Y%m%d')}_{last.strftime('%Y%m%d')}.csv"
+            target = os.path.join(self.directory_path, file_name)
+            os.replace(self.paths[key], target)
+            partitions[str(key)] = {"file": file_name, "rows": [first_row, last_row], "count": count,
+                                    "min_date": first.isoformat(), "max_date": last.isoformat()}
+            if self.columnar:
+                import modules.columnar as columnar
+
+                # Таблица не кэшируется через load_table, чтобы память не росла с числом периодов
+                columnar_file = columnar.write_table(target, WeatherTable.from_csv(target))
+                partitions[str(key)]["columnar"] = os.path.basename(columnar_file)
+        write_manifest(self.directory_path, self.kind, partitions)
+
+
+class WeekSink(PeriodSink):
+    """Приёмник, раскладывающий строки по неделям ISO с учётом года недели"""
+
+    kind = "week"
+
+    def key(self, day: date):
+        return week_key(day)
+
+
+class MonthSink(PeriodSink):
+    """Приёмник, раскладывающий строки по месяцам"""
+
+    kind = "month"
+
+    def key(self, day: date):
+        return f"{day.year}-{day.month:02d}"
+
+
+class YearSink(PeriodSink):
+    """Приёмник, раскладывающий строки по годам"""
+
+    kind = "year"
+
+    def key(self, day: date):
+        return day.year
+
+
+def partition(file_path: str, sinks: list, max_open: int = MAX_OPEN_FILES, progress=None, cancel=None) -> None:
+    """Функция для разбиения файла с данными за один проход сразу на несколько приёмников.
+    Строки читаются потоково и сразу записываются, поэтому память не зависит от размера файла.
+    Если разбиение прервано (в том числе отменой), недописанные файлы приёмников удаляются.
 
        Аргументы:
-       - input_file (str): имя входного csv-файла
-       - num_files (int): количество выходных файлов
+       - file_path (str): путь к исходному файлу с данными
+       - sinks (list): приёмники (DateDataSink, WeekSink, MonthSink, YearSink)
+       - max_open (int): максимальное количество одновременно открытых файлов
+       - progress (callable): вызывается с долей прочитанного файла от 0 до 1
+       - cancel (modules.tasks.CancelToken): флаг отмены; при отмене возбуждается modules.tasks.Cancelled
 
        Возвращает:
        - None
        """
-    # Читаем исходный csv файл
-    with open(input_file, 'r') as file:
-        reader = csv.reader(file)
-        header = next(reader)  # Пропускаем заголовок
+    pool = WriterPool(max_open)
+    size = os.path.getsize(file_path) or 1
+    completed = False
+    try:
+        with open(file_path, 'r', encoding="utf-8") as file:
+            for number, row in enumerate(csv.reader(file)):
+                if number % PROGRESS_ROWS == 0:
+                    if cancel is not None:
+                        cancel.check()
+                    if progress is not None:
+                        # Позиция буфера опережает разобранные строки не больше чем на размер блока чтения
+                        progress(min(file.buffer.tell() / size, 1.0))
+                if not row:
+                    continue
+                day = ef.to_date(row[0])
+                # Все приёмники получают дату в каноническом виде 'гггг-мм-дд'
+                row[0] = day.isoformat()
+                for sink in sinks:
+                    sink.route(number, day, row, pool)
+        completed = True
+    finally:
+        pool.close()
+        for sink in sinks:
+            sink.close()
+            if not completed:
+                sink.abort()
+    for sink in sinks:
+        sink.finish()
+    if progress is not None:
+        progress(1.0)
+
+
+def division_date_and_data(directory_path: str, file_path: str, progress=None, cancel=None) -> None:
+    """Splitting the main file into two files by date and by data
+    Args:
+      directory_path: the path to the working directory for the shift
+      file_path: the path to the main file
+      progress, cancel: progress callback and cancel token, see partition
+    """
+    partition(file_path, [DateDataSink(directory_path)], progress=progress, cancel=cancel)
+
+
+def division_by_week(directory_path: str, file_path: str, columnar: bool = False, progress=None, cancel=None) -> None:
+    """Splitting the main file into files by weeks
+    Args:
+      directory_path: the path to the directory for the week files
+      file_path: the path to the main file
+      columnar: also write a Parquet file next to every week file
+      progress, cancel: progress callback and cancel token, see partition
+    """
+    partition(file_path, [WeekSink(directory_path, columnar)], progress=progress, cancel=cancel)
 
-        # Создаем словарь для хранения данных по неделям
-        weeks_data = {}
 
-        # Обрабатываем каждую строку в csv файле
-        for row in reader:
-            date_str = row[0]
-            data = row[1:]
+def division_by_month(directory_path: str, file_path: str, columnar: bool = False, progress=None, cancel=None) -> None:
+    """Splitting the main file into files by months
+    Args:
+      directory_path: the path to the directory for the month files
+      file_path: the path to the main file
+      columnar: also write a Parquet file next to every month file
+      progress, cancel: progress callback and cancel token, see partition
+    """
+    partition(file_path, [MonthSink(directory_path, columnar)], progress=progress, cancel=cancel)
+
 
-            # Преобразуем строку с датой в объект datetime
-            date = datetime.strptime(date_str, '%Y-%m-%d')
+def division_by_year(directory_path: str, file_path: str, columnar: bool = False, progress=None, cancel=None) -> None:
+    """Splitting the main file into files by years
+    Args:
+      directory_path: the path to the directory for the year files
+      file_path: the path to the main file
+      columnar: also write a Parquet file next to every year file
+      progress, cancel: progress callback and cancel token, see partition
+    """
+    partition(file_path, [YearSink(directory_path, columnar)], progress=progress, cancel=cancel)
 
-            # Определяем номер недели для данной даты
-            week_number = date.isocalendar()[1]
 
-            # Добавляем данные в соответствующую неделю в словаре
-            if week_number in weeks_data:
-                weeks_data[week_number].append((date, data))
-            else:
-                weeks_data[week_number] = [(date, data)]
+def division_by_station(stations: list = None, root: str = ROOT, max_open: int = MAX_OPEN_FILES,
+                        columnar: bool = False) -> None:
+    """Функция для разбиения наборов данных станций: каждый dataset.csv станции за один проход
+    раскладывается по годам, месяцам, неделям и на файлы с датой и данными в папках станции
 
-    # Создаем отдельные файлы для каждой недели
-    for week_number, data in weeks_data.items():
-        start_date = data[0][0]
-        end_date = data[-1][0]
-        file_name = f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"
+       Аргументы:
+       - stations (list): идентификаторы станций; по умолчанию все станции в root
+       - root (str): папка с данными станций
+       - max_open (int): максимальное количество одновременно открытых файлов
+       - columnar (bool): записывать ли рядом с файлами разбиения по периодам файлы Parquet
 
-        with open(file_name, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(header)
+       Возвращает:
+       - None
+       """
+    for station in stations or list_stations(root):
+        directories = {kind: layout_directory(kind, station, root) for kind in LAYOUTS}
+        for directory in directories.values():
+            os.makedirs(directory, exist_ok=True)
+        partition(dataset_path(station, root), [DateDataSink(directories["date_and_data"]),
+                                                WeekSink(directories["week"], columnar),
+                                                MonthSink(directories["month"], columnar),
+                                                YearSink(directories["year"], columnar)], max_open)
 
-            for date, row_data in data:
-                writer.writerow([date.strftime('%Y-%m-%d')] + row_data)
 
+def split_csv_by_weeks(input_file, num_files):
+    """Функция для разделения csv-файла на отдельные файлы по неделям в текущей папке
 
-        print(f"Файл {file_name} успешно создан.")
+       Аргументы:
+       - input_file (str): имя входного csv-файла
+       - num_files (int): не используется, оставлен для совместимости
 
-        datasets= "C:\\Users\\andre\\PycharmProjects\\pythonProject\\pythonProject4\\pythonProgram\\datasets"  # Замените на реальный путь
+       Возвращает:
+       - None
+       """
+    division_by_week(os.curdir, input_file)
 
-        # Прохождение по всем файлам в текущем каталоге
-        for file_name in os.listdir(os.curdir):
-            # Проверка, является ли файл csv
-            if file_name.endswith('.csv'):
-                # Перемещение файл в целевую папку
-                shutil.move(file_name, datasets)
 
+def main() -> None:
+    """Функция запуска модуля как программы: разбивает dataset.csv текущей папки по неделям"""
+    split_csv_by_weeks('dataset.csv', 6)
 
 
-split_csv_by_weeks('dataset.csv', 6)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import os
+import csv
+import bisect
+import datetime
+from array import array
+
+import modules.add_functions as ef
+
+
+def parse_date(line: bytes) -> int | None:
+    """
+    Функция parse_date извлекает дату из первой колонки строки вида 'гггг-м-д'.
+
+    Аргументы:
+
+    line (bytes): строка файла данных
+    Возвращает:
+
+    ordinal (int) | None: порядковый номер даты или None, если дату разобрать нельзя
+    """
+
+    try:
+        return ef.date_to_ordinal(line.split(b",", 1)[0])
+    except ValueError:
+        return None
+
+
+def parse_date_parts(line: bytes) -> int | None:
+    """
+    Функция parse_date_parts извлекает дату, записанную в три колонки (год, месяц, день), как в X.csv.
+
+    Аргументы:
+
+    line (bytes): строка файла данных
+    Возвращает:
+
+    ordinal (int) | None: порядковый номер даты или None, если дату разобрать нельзя
+    """
+
+    try:
+        return ef.parts_to_ordinal(*line.split(b",")[:3])
+    except (ValueError, TypeError):
+        return None
+
+
+class DateIndex:
+    """
+    DateIndex - это индекс файла данных, который хранит смещения строк в байтах и нормализованные даты.
+
+    Индекс строится один раз за проход по файлу. Если даты в файле упорядочены, поиск выполняется
+    двоичным поиском по массиву дат, иначе - по словарю, который строится при первом поиске.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    parse (callable | None): функция, извлекающая порядковый номер даты из строки;
+      None - индексировать только смещения строк
+    Атрибуты:
+
+    path (str): путь к файлу данных
+    signature (tuple): время изменения и размер файла на момент построения индекса
+    Методы:
+
+    bisect(self, date, right=False) -> int:
+      Возвращает позицию даты в упорядоченном файле.
+    lookup(self, date) -> int | None:
+      Возвращает номер первой строки с заданной датой или None.
+    offset(self, row) -> int:
+      Возвращает смещение строки с заданным номером в байтах.
+    record(self, row) -> list:
+      Читает строку с заданным номером и возвращает её в виде списка.
+    """
+
+    def __init__(self, path: str, parse=parse_date):
+        self.path = path
+        self.signature = ef.file_signature(path)
+        self.__offsets = array("q")
+        self.__ordinals = array("l")
+        self.__ordered = True
+        self.__rows = None
+        self.__build(parse)
+
+    def __build(self, parse) -> None:
+        ordinals = self.__ordinals
+        previous = 0
+        with open(self.path, "rb") as file:
+            offset = 0
+            for line in file:
+                self.__offsets.append(offset)
+                offset += len(line)
+                if parse is None:
+                    continue
+                # Строка без даты получает 0 (порядковые номера дат начинаются с 1) и ломает упорядоченность
+                ordinal = parse(line) or 0
+                if ordinal < previous or not ordinal:
+                    self.__ordered = False
+                previous = ordinal
+                ordinals.append(ordinal)
+        self.__offsets.append(offset)
+
+    def __len__(self) -> int:
+        return len(self.__offsets) - 1
+
+    @property
+    def ordered(self) -> bool:
+        return self.__ordered
+
+    def bisect(self, date: datetime.date | str, right: bool = False) -> int:
+        """
+        Метод bisect возвращает номер первой строки с датой не меньше заданной
+        (при right=True - строго больше). Доступен только для упорядоченных файлов.
+        """
+
+        if not self.__ordered:
+            raise ValueError(f"Даты в файле {self.path} не упорядочены")
+        if right:
+            return bisect.bisect_right(self.__ordinals, ef.date_to_ordinal(date))
+        return bisect.bisect_left(self.__ordinals, ef.date_to_ordinal(date))
+
+    def lookup(self, date: datetime.date | str) -> int | None:
+        ordinal = ef.date_to_ordinal(date)
+        if not self.__ordered:
+            if self.__rows is None:
+                # Словарь дат строится при первом поиске и только для неупорядоченного файла
+                self.__rows = {}
+                for row, value in enumerate(self.__ordinals):
+                    if value:
+                        self.__rows.setdefault(value, row)
+            return self.__rows.get(ordinal)
+        position = bisect.bisect_left(self.__ordinals, ordinal)
+        if position < len(self.__ordinals) and self.__ordinals[position] == ordinal:
+            # В упорядоченном файле каждая строка имеет дату, поэтому позиция совпадает с номером строки
+            return position
+        return None
+
+    def offset(self, row: int) -> int:
+        """
+        Метод offset возвращает смещение строки в байтах; для row=len(index) - размер файла.
+        """
+
+        return self.__offsets[row]
+
+    def record(self, row: int) -> list:
+        with open(self.path, "rb") as file:
+            file.seek(self.__offsets[row])
+            line = file.read(self.__offsets[row + 1] - self.__offsets[row])
+        return next(csv.reader([line.decode("utf-8")]), [])
+
+
+_indexes = {}
+
+
+def get_index(path: str, parse=parse_date) -> DateIndex:
+    """
+    Функция get_index возвращает индекс файла данных, построенный один раз на файл.
+    Индекс перестраивается, если изменились время изменения или размер файла.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    parse (callable | None): функция, извлекающая дату из строки
+    Возвращает:
+
+    index (DateIndex): индекс файла данных
+    """
+
+    key = (os.path.abspath(path), parse)
+    index = _indexes.get(key)
+    if index is None or index.signature != ef.file_signature(path):
+        index = DateIndex(path, parse)
+        _indexes[key] = index
+    return index
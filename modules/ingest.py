@@ -0,0 +1,353 @@
+import csv
+import json
+import os
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировка файла через msvcrt
+    fcntl = None
+    import msvcrt
+
+import modules.add_functions as ef
+from modules.index import get_index
+
+# Сколько сегментов может накопиться, прежде чем write_to_csv сольёт их с набором данных
+COMPACT_SEGMENTS = 16
+COPY_CHUNK = 1 << 20
+# Сколько последних слияний помнит маркер: по ним хранилища, построенные по прежней версии
+# набора (modules.aggregates), находят переписанный хвост
+MARKER_HISTORY = 32
+
+_lock = threading.Lock()
+
+
+def ingest_directory(path: str) -> str:
+    return path + ".ingest"
+
+
+@contextlib.contextmanager
+def ingest_lock(path: str):
+    """
+    Контекстный менеджер ingest_lock удерживает блокировку журнала загрузки набора данных.
+    Блокируется файл <набор>.ingest/lock, поэтому нумерацию сегментов и слияние разделяют
+    не только потоки, но и процессы (загрузчик pars_data и окно приложения).
+
+    Аргументы:
+
+    path (str): путь к набору данных
+    Возвращает:
+
+    None
+    """
+
+    directory = ingest_directory(path)
+    os.makedirs(directory, exist_ok=True)
+    with _lock, open(os.path.join(directory, "lock"), "a+b") as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            while True:
+                # LK_LOCK ждёт около 10 секунд и сообщает об ошибке, если файл всё ещё занят
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def marker_path(path: str) -> str:
+    # Подпись набора, записанного compact: такой набор упорядочен по дате
+    return os.path.join(ingest_directory(path), "compacted.json")
+
+
+def read_marker(path: str) -> dict | None:
+    # Маркер: подпись набора после последнего слияния и история слияний, после которых набор не менялся
+    try:
+        with open(marker_path(path), encoding="utf-8") as file:
+            marker = json.load(file)
+        if tuple(marker["signature"]) == ef.file_signature(path):
+            return marker
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+    return None
+
+
+def is_compacted(path: str) -> bool:
+    return read_marker(path) is not None
+
+
+def rewritten_since(path: str, signature: tuple) -> tuple | None:
+    """
+    Функция rewritten_since возвращает, с какого места набор данных переписан слияниями
+    с тех пор, как у него была подпись signature. Байты до этого смещения не менялись.
+
+    Аргументы:
+
+    path (str): путь к набору данных
+    signature (tuple): прежняя подпись набора (время изменения, размер)
+    Возвращает:
+
+    result (tuple) | None: смещение и порядковый номер самой ранней переписанной даты или None,
+      если набор с тех пор менялся не только слияниями или история слияний короче
+    """
+
+    marker = read_marker(path)
+    if marker is None:
+        return None
+    offset = first = None
+    for entry in reversed(marker["history"]):
+        offset = entry["offset"] if offset is None else min(offset, entry["offset"])
+        first = entry["first"] if first is None else min(first, entry["first"])
+        if tuple(entry["source"]) == tuple(signature):
+            return offset, first
+    return None
+
+
+def segment_paths(path: str) -> list:
+    """
+    Функция segment_paths возвращает пути сегментов набора данных в порядке записи.
+    Недописанные сегменты (*.tmp) не возвращаются.
+
+    Аргументы:
+
+    path (str): путь к набору данных
+    Возвращает:
+
+    paths (list): пути сегментов
+    """
+
+    directory = ingest_directory(path)
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".csv")]
+
+
+def append_segment(path: str, rows) -> str | None:
+    """
+    Функция append_segment записывает строки в новый сегмент рядом с набором данных
+    (<набор>.ingest/<номер>.csv). Сегмент пишется во временный файл и появляется под своим
+    именем целиком, поэтому слияние никогда не видит его частично; сам набор данных не меняется.
+
+    Аргументы:
+
+    path (str): путь к набору данных
+    rows (iterable): строки из семи колонок
+    Возвращает:
+
+    segment (str) | None: путь сегмента или None, если строк нет
+    """
+
+    directory = ingest_directory(path)
+    os.makedirs(directory, exist_ok=True)
+    temporary = os.path.join(directory, f"{os.getpid()}-{threading.get_ident()}.tmp")
+    count = 0
+    with open(temporary, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        file.flush()
+        os.fsync(file.fileno())
+    if not count:
+        os.remove(temporary)
+        return None
+    with ingest_lock(path):
+        existing = segment_paths(path)
+        number = int(os.path.basename(existing[-1])[:-4]) + 1 if existing else 0
+        segment = os.path.join(directory, f"{number:08d}.csv")
+        os.replace(temporary, segment)
+    return segment
+
+
+def read_segments(segments: list) -> dict:
+    # Более поздний сегмент заменяет строки с теми же датами
+    rows = {}
+    for segment in segments:
+        with open(segment, "r", newline="", encoding="utf-8") as file:
+            for row in csv.reader(file):
+                if row:
+                    rows[ef.date_to_ordinal(row[0])] = row
+    return rows
+
+
+def merge_rows(old, new: dict):
+    """
+    Генератор merge_rows сливает упорядоченные по дате строки набора данных с новыми строками.
+    Новая строка заменяет строку набора с той же датой.
+
+    Аргументы:
+
+    old (iterable): строки набора данных в порядке дат
+    new (dict): новые строки по порядковым номерам дат
+    Возвращает:
+
+    rows (generator): строки в порядке дат
+    """
+
+    pending = sorted(new)
+    position = 0
+    for row in old:
+        if not row:
+            continue
+        ordinal = ef.date_to_ordinal(row[0])
+        while position < len(pending) and pending[position] < ordinal:
+            yield new[pending[position]]
+            position += 1
+        if position < len(pending) and pending[position] == ordinal:
+            yield new[pending[position]]
+            position += 1
+        else:
+            yield row
+    for ordinal in pending[position:]:
+        yield new[ordinal]
+
+
+def compact(path: str, min_segments: int = 1) -> int:
+    """
+    Функция compact сливает сегменты с набором данных. Новый файл собирается рядом: часть набора
+    до самой ранней новой даты копируется байтами, хвост сливается с новыми строками по дате.
+    Если набор записан предыдущим слиянием и с тех пор не менялся, начало хвоста ищется чтением
+    файла с конца (tail_offset); иначе один раз строится полный индекс, который проверяет порядок
+    дат. Затем файл подменяет набор одним os.replace, поэтому читатели видят либо прежний, либо
+    новый набор целиком. Сегменты удаляются после подмены; если слияние прервано, временный файл
+    удаляется, а повторный запуск даёт тот же результат.
+    Смещение и самая ранняя дата переписанного хвоста записываются в маркер слияния, по ним
+    хранилища, построенные по прежней версии набора, обновляют только переписанную часть
+    (rewritten_since). Слияния разных процессов не пересекаются (ingest_lock).
+
+    Аргументы:
+
+    path (str): путь к набору данных
+    min_segments (int): сливать, только если сегментов не меньше
+    Возвращает:
+
+    count (int): количество новых или обновлённых строк
+    """
+
+    if len(segment_paths(path)) < max(min_segments, 1):
+        return 0
+    with ingest_lock(path):
+        # Пока блокировка ожидалась, сегменты мог слить другой процесс
+        segments = segment_paths(path)
+        if not segments or len(segments) < min_segments:
+            return 0
+        new = read_segments(segments)
+        temporary = path + ".compact.tmp"
+        source = open(path, "rb") if os.path.exists(path) else None
+        marker = read_marker(path) if source is not None else None
+        ordered = False
+        replaced = False
+        try:
+            tail = ()
+            with open(temporary, "wb") as target:
+                if source is not None:
+                    signature = ef.file_signature(path)
+                    offset = tail_offset(source, min(new)) if marker is not None else None
+                    ordered = offset is not None
+                    if not ordered:
+                        index = get_index(path)
+                        ordered = index.ordered
+                        offset = index.offset(index.bisect(ef.ordinal_to_date(min(new)))) if ordered else 0
+                    source.seek(0)
+                    if not copy_prefix(source, target, offset).endswith(b"\n"):
+                        # Последняя строка набора может быть без перевода строки
+                        target.write(b"\r\n")
+                    tail = csv.reader(line.decode("utf-8") for line in source)
+                    if not ordered:
+                        # Неупорядоченный набор сортируется при первом слиянии
+                        tail = [row for _, row in sorted((ef.date_to_ordinal(row[0]), row) for row in tail if row)]
+            with open(temporary, "a", newline="", encoding="utf-8") as file:
+                csv.writer(file, delimiter=",").writerows(merge_rows(tail, new))
+                file.flush()
+                os.fsync(file.fileno())
+            if source is not None:
+                source.close()
+            os.replace(temporary, path)
+            replaced = True
+        finally:
+            if source is not None:
+                source.close()
+            if not replaced and os.path.exists(temporary):
+                os.remove(temporary)
+        # История продолжается, только если набор не менялся после предыдущего слияния
+        history = marker["history"] if marker is not None else []
+        if ordered:
+            history = (history + [{"source": signature, "offset": offset, "first": min(new)}])[-MARKER_HISTORY:]
+        else:
+            history = []
+        with open(marker_path(path), "w", encoding="utf-8") as file:
+            json.dump({"signature": ef.file_signature(path), "history": history}, file)
+        for segment in segments:
+            os.remove(segment)
+        return len(new)
+
+
+def tail_offset(file, ordinal: int) -> int | None:
+    """
+    Функция tail_offset находит смещение первой строки с датой не меньше заданной, читая файл
+    с конца блоками, поэтому время поиска зависит от длины хвоста, а не от размера файла.
+
+    Аргументы:
+
+    file: файл набора данных, открытый в двоичном режиме
+    ordinal (int): порядковый номер даты
+    Возвращает:
+
+    offset (int) | None: смещение строки или None, если даты в прочитанном хвосте
+      не упорядочены или не разбираются - тогда нужен полный индекс
+    """
+
+    end = file.seek(0, os.SEEK_END)
+    position = end
+    buffer = b""
+    following = None
+    while position > 0:
+        size = min(COPY_CHUNK, position)
+        position -= size
+        file.seek(position)
+        buffer = file.read(size) + buffer
+        lines = buffer.split(b"\n")
+        # Первая строка блока может быть неполной, если блок начинается не с начала файла
+        buffer = lines.pop(0) if position > 0 else b""
+        start = position + len(buffer) + (1 if position > 0 else 0)
+        offsets = []
+        for line in lines:
+            offsets.append(start)
+            start += len(line) + 1
+        for line, offset in zip(reversed(lines), reversed(offsets)):
+            if not line.strip():
+                continue
+            try:
+                value = ef.date_to_ordinal(line.split(b",", 1)[0])
+            except ValueError:
+                return None
+            if following is not None and value > following:
+                return None
+            if value < ordinal:
+                return min(offset + len(line) + 1, end)
+            following = value
+    return 0
+
+
+def copy_prefix(source, target, size: int) -> bytes:
+    # Возвращает последний скопированный блок; пустой префикс считается законченной строкой
+    chunk = b"\n"
+    while size:
+        chunk = source.read(min(COPY_CHUNK, size))
+        if not chunk:
+            break
+        target.write(chunk)
+        size -= len(chunk)
+    return chunk or b"\n"
@@ -1,16 +1,29 @@
+import csv
+import datetime
+
 import modules.add_functions as ef
+from modules.index import DateIndex
+from modules.table import WeatherTable, open_dataset
+
+# Сколько строк вперёд по ходу движения читает одна подкачка PrefetchIterator
+PREFETCH_ROWS = 256
 
 
 class DataIterator():
     """
     DataIterator - это класс, который итерирует по данным в заданном наборе данных.
+    Строки читаются по одной из файла-спутника или из CSV-файла, который остаётся открытым между
+    шагами, поэтому шаг итерации и переход к дате не зависят от размера файла. Изменение файла
+    проверяется только при переходе к дате и на конце файла или при недочитанной строке.
+    Для CSV-файла итератор использует индекс modules.index.DateIndex, который хранит смещение
+    и дату каждой строки, поэтому память растёт с числом строк (16 байт на строку).
 
     Аргументы:
 
     path (str): путь к файлу данных
     Атрибуты:
 
-    __data (ndarray): массив данных
+    __path (str): путь к файлу данных
     __index (int): индекс текущего элемента итерации
     Методы:
 
@@ -18,12 +31,23 @@ class DataIterator():
       Этот метод возвращает итератор для этого объекта DataIterator.
     next(self) -> tuple:
       Этот метод возвращает следующий элемент итерации в виде кортежа. Если все элементы были пройдены, вызывается исключение StopIteration.
+    seek(self, position) -> int:
+      Этот метод переходит к строке с заданным номером или датой и возвращает новый индекс.
+    close(self) -> None:
+      Этот метод закрывает файл данных.
     """
 
-
     def __init__(self, path: str):
-        self.__data = ef.read_data(path)
+        self.__path = path
         self.__index = -1
+        self.__source = None
+        self.__file = None
+        # Номер строки, с начала которой прочитает открытый файл
+        self.__line = None
+        source = self.__reload()
+        if len(source):
+            # Проверяем формат файла по первой строке
+            ef.date_to_ordinal(source.record(0)[0])
 
     @property
     def index(self):
@@ -33,12 +57,236 @@ class DataIterator():
     def index(self, value):
         self.__index = value
 
+    def __reload(self) -> WeatherTable | DateIndex:
+        # Источник строк берётся заново, только если файл изменился
+        source = open_dataset(self.__path)
+        if source is not self.__source:
+            self.close()
+            self.__source = source
+        return source
+
+    def __record(self, row: int) -> list | None:
+        source = self.__source
+        if not isinstance(source, DateIndex):
+            return source.record(row)
+        if self.__file is None:
+            self.__file = open(self.__path, "rb")
+        if self.__line != row:
+            self.__file.seek(source.offset(row))
+        line = self.__file.readline()
+        self.__line = row + 1
+        if len(line) != source.offset(row + 1) - source.offset(row):
+            # Строка недочитана или длиннее, чем в индексе: файл изменился
+            self.__line = None
+            return None
+        return next(csv.reader([line.decode("utf-8")]), [])
+
+    def seek(self, position: int | datetime.date | str) -> int:
+        """
+        Метод seek устанавливает текущую позицию итератора, не читая остальной файл.
+        Следующий вызов next вернёт строку, идущую после позиции.
+
+        Аргументы:
+
+        position (int | datetime.date | str): номер строки или дата. Если даты нет в
+          упорядоченном файле, позиция ставится перед ближайшей следующей датой
+        Возвращает:
+
+        index (int): новый индекс текущего элемента
+        """
+
+        source = self.__reload()
+        if isinstance(position, int):
+            self.__index = position
+            return self.__index
+        if source.ordered:
+            self.__index = source.bisect(position, right=True) - 1
+        else:
+            row = source.lookup(position)
+            if row is None:
+                raise KeyError(position)
+            self.__index = row
+        return self.__index
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+            self.__line = None
+
+    def __del__(self):
+        self.close()
+
     def __iter__(self):
         return self
 
     def __next__(self) -> tuple:
-        if self.__index < len(self.__data) - 1:
-            self.__index += 1
-            return tuple(self.__data[self.__index])
-        else:
-            raise StopIteration
\ No newline at end of file
+        row = self.__index + 1
+        record = self.__record(row) if row < len(self.__source) else None
+        if record is None:
+            # Конец файла или недочитанная строка: файл мог быть дописан или переписан
+            source = self.__reload()
+            if row >= len(source):
+                raise StopIteration
+            record = self.__record(row)
+            if record is None:
+                record = source.record(row)
+        self.__index = row
+        return tuple(record)
+
+
+class PrefetchIterator:
+    """
+    PrefetchIterator - это итератор по набору данных, который ходит в обе стороны и на произвольный
+    шаг. Строки вокруг курсора хранятся в памяти: шаг по закэшированным строкам не читает файл,
+    а следующие строки по ходу движения подкачиваются заранее.
+
+    Методы locate, read и fetch не меняют состояние итератора, поэтому их можно выполнять в другом
+    потоке; install и move вызываются в потоке, который владеет итератором.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    prefetch (int): сколько строк вперёд читает одна подкачка
+    Атрибуты:
+
+    index (int): индекс текущей строки (-1 - перед первой строкой)
+    length (int): количество строк в наборе данных
+    signature (tuple): подпись файла, из которого прочитаны строки в памяти
+    Методы:
+
+    fetch(self, position, offset=0, stride=None) -> tuple:
+      Находит строку на offset строк от позиции и читает строки вокруг неё.
+    install(self, fetched) -> None:
+      Добавляет прочитанные строки в память; строки прежней версии файла отбрасываются.
+    move(self, index) -> tuple:
+      Переходит к закэшированной строке и возвращает её.
+    step(self, count) -> tuple:
+      Сдвигает курсор на count строк (отрицательный count - назад) и возвращает строку.
+    refill(self, stride) -> list | None:
+      Возвращает номера строк, которые пора подкачать по ходу движения.
+    """
+
+    def __init__(self, path: str, prefetch: int = PREFETCH_ROWS):
+        self.path = path
+        self.prefetch = prefetch
+        self.index = -1
+        source = open_dataset(path)
+        self.length = len(source)
+        self.signature = source.signature
+        if self.length:
+            # Проверяем формат файла по первой строке
+            ef.date_to_ordinal(source.record(0)[0])
+        self.__rows = {}
+
+    def __len__(self) -> int:
+        return self.length
+
+    def locate(self, position: int | datetime.date | str, before: bool = False) -> int:
+        """
+        Метод locate возвращает номер строки с заданной датой. Если даты нет в упорядоченном файле,
+        возвращается предыдущая строка, а при before=True - следующая, так что шаг назад от
+        отсутствующей даты не пропускает строк.
+        """
+
+        if isinstance(position, int):
+            return position
+        source = open_dataset(self.path)
+        if source.ordered:
+            return source.bisect(position) if before else source.bisect(position, right=True) - 1
+        row = source.lookup(position)
+        if row is None:
+            raise KeyError(position)
+        return row
+
+    def around(self, index: int, stride: int) -> list:
+        """
+        Метод around возвращает номера строк, которые стоит держать в памяти при движении
+        с шагом stride от строки index: prefetch шагов вперёд и четверть этого назад.
+        """
+
+        stride = stride or 1
+        rows = (index + stride * step for step in range(-(self.prefetch // 4), self.prefetch + 1))
+        return [row for row in rows if 0 <= row < self.length]
+
+    def read(self, rows: list) -> tuple:
+        """
+        Метод read читает строки с номерами rows и возвращает для install подпись файла,
+        количество строк в нём и словарь прочитанных строк. Номера за концом файла пропускаются.
+        """
+
+        source = open_dataset(self.path)
+        length = len(source)
+        return source.signature, length, {row: tuple(source.record(row)) for row in rows if row < length}
+
+    def fetch(self, position: int | datetime.date | str, offset: int = 0, stride: int = None) -> tuple:
+        """
+        Метод fetch находит строку на offset строк от позиции и читает строки вокруг неё.
+
+        Аргументы:
+
+        position (int | datetime.date | str): номер строки или дата
+        offset (int): смещение от позиции в строках
+        stride (int | None): шаг движения для подкачки; по умолчанию - offset
+        Возвращает:
+
+        result (tuple): номер найденной строки и прочитанные строки для install
+        """
+
+        index = self.locate(position, before=offset < 0) + offset
+        if not 0 <= index < self.length:
+            raise StopIteration
+        return index, self.read(self.around(index, stride or offset))
+
+    def install(self, fetched: tuple) -> None:
+        signature, length, rows = fetched
+        if signature != self.signature:
+            # Файл изменился: закэшированные строки и их число относятся к прежней версии
+            self.__rows.clear()
+            self.signature, self.length = signature, length
+        self.__rows.update(rows)
+        # Новые строки сохраняются, из прежних остаются ближайшие к курсору
+        limit = 4 * self.prefetch
+        if len(self.__rows) > limit:
+            older = sorted((row for row in self.__rows if row not in rows), key=lambda row: abs(row - self.index))
+            for row in older[max(limit - len(rows), 0):]:
+                del self.__rows[row]
+
+    def cached(self, index: int) -> bool:
+        return index in self.__rows
+
+    def move(self, index: int) -> tuple:
+        self.index = index
+        return self.__rows[index]
+
+    def step(self, count: int = 1) -> tuple:
+        index = self.index + count
+        if not 0 <= index < self.length:
+            raise StopIteration
+        if index not in self.__rows:
+            self.install(self.read(self.around(index, count)))
+            if index not in self.__rows:
+                # Файл укоротился после прошлого чтения
+                raise StopIteration
+        return self.move(index)
+
+    def previous(self) -> tuple:
+        return self.step(-1)
+
+    def refill(self, stride: int) -> list | None:
+        """
+        Метод refill возвращает номера строк для подкачки, если среди ближайших четверти
+        prefetch шагов по ходу движения есть незакэшированные строки, иначе None.
+        """
+
+        stride = stride or 1
+        ahead = (self.index + stride * step for step in range(1, self.prefetch // 4 + 1))
+        if all(row in self.__rows for row in ahead if 0 <= row < self.length):
+            return None
+        return [row for row in self.around(self.index, stride) if row not in self.__rows]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        return self.step(1)
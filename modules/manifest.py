@@ -0,0 +1,81 @@
+import os
+import json
+import struct
+import datetime
+
+import modules.add_functions as ef
+
+# Запись индекса Y.idx: порядковый номер даты и смещение строки в Y.csv в байтах
+OFFSET_RECORD = struct.Struct("<iq")
+
+
+def week_key(day: datetime.date) -> str:
+    """
+    Функция week_key возвращает ключ недели ISO для даты в виде 'гггг-Wнн'.
+    Год берётся по календарю ISO, поэтому недели разных лет не смешиваются.
+
+    Аргументы:
+
+    day (datetime.date): дата
+    Возвращает:
+
+    key (str): ключ недели
+    """
+
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def manifest_path(directory: str, kind: str) -> str:
+    return os.path.join(directory, f"manifest_{kind}.json")
+
+
+def write_manifest(directory: str, kind: str, partitions: dict) -> str:
+    """
+    Функция write_manifest записывает манифест разбиения: описание файлов, на которые разбит набор данных.
+    Файл записывается во временный и подменяется атомарно.
+
+    Аргументы:
+
+    directory (str): папка с файлами разбиения
+    kind (str): вид разбиения, например 'week'
+    partitions (dict): описания файлов разбиения по ключам
+    Возвращает:
+
+    path (str): путь к манифесту
+    """
+
+    path = manifest_path(directory, kind)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"kind": kind, "partitions": partitions}, file, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+_manifests = {}
+
+
+def read_manifest(directory: str, kind: str) -> dict | None:
+    """
+    Функция read_manifest возвращает описания файлов разбиения из манифеста.
+    Манифест читается один раз и перечитывается, если файл изменился.
+
+    Аргументы:
+
+    directory (str): папка с файлами разбиения
+    kind (str): вид разбиения
+    Возвращает:
+
+    partitions (dict) | None: описания файлов по ключам или None, если манифеста нет
+    """
+
+    path = manifest_path(directory, kind)
+    try:
+        signature = ef.file_signature(path)
+    except FileNotFoundError:
+        return None
+    cached = _manifests.get(path)
+    if cached is None or cached[0] != signature:
+        with open(path, "r", encoding="utf-8") as file:
+            cached = _manifests[path] = (signature, json.load(file)["partitions"])
+    return cached[1]
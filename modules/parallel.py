@@ -0,0 +1,109 @@
+import io
+import os
+import csv
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import modules.add_functions as ef
+from modules.table import COLUMNS, WeatherTable
+
+# Размер части файла, которую разбирает один процесс
+CHUNK_SIZE = 4 << 20
+
+
+def chunk_ranges(path: str, chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Функция chunk_ranges делит файл на части примерно по chunk_size байтов.
+    Границы частей сдвигаются к концу строки, поэтому каждая строка попадает ровно в одну часть.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    chunk_size (int): примерный размер части в байтах
+    Возвращает:
+
+    ranges (list): пары (начало, конец) в байтах в порядке следования в файле
+    """
+
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_chunk(path: str, start: int, end: int) -> list:
+    with open(path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+    return list(csv.reader(io.StringIO(text, newline="")))
+
+
+def parse_chunk(path: str, start: int, end: int) -> tuple:
+    # Процессу возвращаются байты колонок: их передача дешевле, чем передача списков строк
+    table = WeatherTable.from_rows(read_chunk(path, start, end))
+    return tuple(getattr(table, name).tobytes() for name in COLUMNS), table.ordered
+
+
+def map_chunks(function, path: str, workers: int, chunk_size: int):
+    ranges = chunk_ranges(path, chunk_size)
+    starts, ends = [start for start, _ in ranges], [end for _, end in ranges]
+    if workers <= 1:
+        return map(function, [path] * len(ranges), starts, ends)
+    # executor.map возвращает результаты в порядке частей, независимо от порядка завершения
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, [path] * len(ranges), starts, ends))
+
+
+def read_data_parallel(path: str, workers: int = None, chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Функция read_data_parallel считывает данные из файла CSV, разбирая части файла в нескольких процессах.
+    Результат совпадает с add_functions.read_data.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    workers (int): количество процессов; по умолчанию - количество ядер
+    chunk_size (int): примерный размер части в байтах
+    Возвращает:
+
+    data (list): список данных
+    """
+
+    data = []
+    for rows in map_chunks(read_chunk, path, workers or os.cpu_count(), chunk_size):
+        data.extend(rows)
+    return data
+
+
+def load_table_parallel(path: str, workers: int = None, chunk_size: int = CHUNK_SIZE) -> WeatherTable:
+    """
+    Функция load_table_parallel строит WeatherTable, разбирая части файла в нескольких процессах
+    и склеивая колонки в порядке частей.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    workers (int): количество процессов; по умолчанию - количество ядер
+    chunk_size (int): примерный размер части в байтах
+    Возвращает:
+
+    table (WeatherTable): таблица данных
+    """
+
+    table = WeatherTable()
+    for columns, ordered in map_chunks(parse_chunk, path, workers or os.cpu_count(), chunk_size):
+        previous = table.date[-1] if table.date else None
+        for name, data in zip(COLUMNS, columns):
+            getattr(table, name).frombytes(data)
+        first = array("i", columns[0][:4])
+        if not ordered or (previous is not None and first and first[0] < previous):
+            table.ordered = False
+    table.signature = ef.file_signature(path)
+    return table
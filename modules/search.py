@@ -1,7 +1,118 @@
+import bisect
+import csv
 import datetime
+import mmap
 import os
+from array import array
+from collections import OrderedDict
 
 import modules.add_functions as ef
+from modules.index import get_index, parse_date_parts
+from modules.manifest import OFFSET_RECORD, read_manifest, week_key
+from modules.stations import dataset_path, layout_directory
+from modules.table import COLUMNS, WeatherTable, decode_table, open_dataset
+
+# Бюджет памяти кэша файлов разбиения; задаётся переменной окружения PARTITION_CACHE_BYTES
+PARTITION_CACHE_BYTES = int(os.environ.get("PARTITION_CACHE_BYTES", 32 << 20))
+# Количество строк в пакете query_batches по умолчанию
+BATCH_ROWS = 4096
+
+
+class PartitionCache:
+    """
+    PartitionCache - это кэш разобранных файлов разбиения (WeatherTable) с вытеснением давно
+    не использованных файлов, когда объём колонок превышает бюджет. Перед выдачей таблицы
+    сверяются время изменения и размер файла, поэтому изменённый файл разбирается заново.
+    Таблица, которая одна больше бюджета, всё равно кэшируется, пока её не вытеснит следующая.
+
+    Аргументы:
+
+    max_bytes (int): бюджет памяти в байтах
+    Атрибуты:
+
+    hits, misses, evictions (int): попадания, промахи и вытеснения
+    bytes (int): объём колонок таблиц в кэше
+    Методы:
+
+    get(self, path) -> WeatherTable:
+      Возвращает таблицу файла разбиения, разбирая его при промахе.
+    stats(self) -> dict:
+      Возвращает счётчики кэша.
+    resize(self, max_bytes) -> None:
+      Меняет бюджет и вытесняет лишнее.
+    clear(self) -> None:
+      Очищает кэш и счётчики.
+    """
+
+    def __init__(self, max_bytes: int = PARTITION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, path: str) -> WeatherTable:
+        key = os.path.abspath(path)
+        signature = ef.file_signature(path)
+        entry = self.__entries.get(key)
+        if entry is not None:
+            if entry[0] == signature:
+                self.hits += 1
+                self.__entries.move_to_end(key)
+                return entry[1]
+            # Файл изменился: устаревшая таблица удаляется без учёта как вытеснение
+            self.bytes -= self.__entries.pop(key)[2]
+        self.misses += 1
+        table = decode_table(path)
+        size = table.nbytes()
+        self.__entries[key] = (signature, table, size)
+        self.bytes += size
+        self.__evict()
+        return table
+
+    def __evict(self) -> None:
+        while self.bytes > self.max_bytes and len(self.__entries) > 1:
+            self.bytes -= self.__entries.popitem(last=False)[1][2]
+            self.evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.__evict()
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.__entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+
+partition_cache = PartitionCache()
+_partition_bounds = {}
+
+
+def search_partition(path: str, date: datetime) -> list | None:
+    """
+    Функция search_partition ищет данные для заданной даты в файле разбиения через partition_cache:
+    повторные поиски в том же файле не читают его заново.
+
+    Аргументы:
+
+    path (str): путь к файлу разбиения
+    date (datetime): дата, для которой ищется данные
+    Возвращает:
+
+    data (list) | None: список данных для заданной даты или None, если данные не найдены
+    """
+
+    table = partition_cache.get(path)
+    row = table.lookup(date)
+    if row is not None:
+        return table.record(row)[1:]
 
 
 def search(path: str, date: datetime) -> list | None:
@@ -17,9 +128,10 @@ def search(path: str, date: datetime) -> list | None:
     data (list) | None: список данных для заданной даты или None, если данные не найдены
     """
 
-    for day in ef.read_data(path):
-        if day[0] == str(date):
-            return day[1:]
+    source = open_dataset(path)
+    row = source.lookup(date)
+    if row is not None:
+        return source.record(row)[1:]
 
 
 def find(path: str, date: datetime) -> list | None:
@@ -35,73 +147,365 @@ def find(path: str, date: datetime) -> list | None:
     index (int) | None: индекс строки с заданной датой или None, если дата не найдена
     """
 
+    return open_dataset(path).lookup(date)
+
+
+def partition_files(directory: str, kind: str, start: datetime, end: datetime) -> list:
+    """
+    Функция partition_files возвращает имена файлов разбиения, диапазон дат которых пересекается
+    с заданным, в порядке возрастания дат. Диапазоны берутся из манифеста разбиения, а если его нет -
+    из имён файлов вида 'ггггммдд_ггггммдд.csv'.
+
+    Аргументы:
+
+    directory (str): папка с файлами разбиения
+    kind (str): вид разбиения ('year', 'month', 'week')
+    start (datetime): начальная дата
+    end (datetime): конечная дата
+    Возвращает:
+
+    files (list): имена подходящих файлов
+    """
+
+    first, last = ef.date_to_ordinal(start), ef.date_to_ordinal(end)
+    partitions = read_manifest(directory, kind)
+    if partitions is not None:
+        lefts, rights, filenames = partition_bounds(directory, kind, partitions)
+        # Диапазоны файлов разбиения не пересекаются, поэтому обе границы упорядочены
+        return filenames[bisect.bisect_left(rights, first):bisect.bisect_right(lefts, last)]
+    bounds = []
+    for filename in os.listdir(directory):
+        try:
+            bounds.append((ef.date_to_ordinal(filename[:8]), ef.date_to_ordinal(filename[9:17]), filename))
+        except ValueError:
+            continue
+    return [filename for left, right, filename in sorted(bounds) if left <= last and first <= right]
+
+
+def partition_bounds(directory: str, kind: str, partitions: dict) -> tuple:
+    """
+    Функция partition_bounds возвращает упорядоченные границы файлов разбиения из манифеста.
+    Границы вычисляются один раз для каждого прочитанного манифеста.
 
-    data = ef.read_data(path)
-    for i in range(len(data)):
-        if data[i][0] == str(date):
-            return i
+    Аргументы:
 
+    directory (str): папка с файлами разбиения
+    kind (str): вид разбиения
+    partitions (dict): описания файлов из read_manifest
+    Возвращает:
 
-def search_by_year(date: datetime) -> list | None:
+    bounds (tuple): списки первых дат, последних дат (порядковые номера) и имён файлов
+    """
+
+    cached = _partition_bounds.get((directory, kind))
+    if cached is None or cached[0] is not partitions:
+        bounds = sorted((ef.date_to_ordinal(partition["min_date"]), ef.date_to_ordinal(partition["max_date"]),
+                         partition["file"]) for partition in partitions.values())
+        cached = _partition_bounds[directory, kind] = (partitions, tuple(map(list, zip(*bounds))) or ([], [], []))
+    return cached[1]
+
+
+def search_station(station, date: datetime) -> list | None:
+    """
+    Функция search_station ищет данные станции для заданной даты. Путь к набору данных станции
+    вычисляется по идентификатору, поэтому время поиска не зависит от количества станций.
+
+    Аргументы:
+
+    station (int | str): идентификатор станции
+    date (datetime): дата, для которой ищется данные
+    Возвращает:
+
+    data (list) | None: список данных для заданной даты или None, если данные не найдены
+    """
+
+    path = dataset_path(station)
+    if not os.path.exists(path):
+        return None
+    return search(path, date)
+
+
+def search_by_year(date: datetime, station=None) -> list | None:
     """
     Функция search_by_year ищет данные для заданной даты в файлах, содержащих данные по годам. Если данные найдены, возвращает список данных для этой даты, в противном случае возвращает None.
 
     Аргументы:
 
     date (datetime): дата, для которой ищется данные
+    station (int | str | None): идентификатор станции; без него поиск идёт в общем наборе данных
     Возвращает:
 
     data (list) | None: список данных для заданной даты или None, если данные не найдены
     """
 
-    directory = "datasets/data_by_year"
-    for filename in os.listdir(directory):
-        if (int(filename[0:4]) == date.year):
-            data = ef.read_data(f"{directory}/{filename}")
-            for day in data:
-                if day[0] == str(date):
-                    return day[1:]
+    directory = layout_directory("year", station)
+    for filename in partition_files(directory, "year", date, date):
+        data = search_partition(f"{directory}/{filename}", date)
+        if data is not None:
+            return data
 
 
-def search_by_week(date: datetime) -> list | None:
+def search_by_week(date: datetime, station=None) -> list | None:
     """
     Функция search_by_week ищет данные для заданной даты в файлах, содержащих данные по неделям. Если данные найдены, возвращает список данных для этой даты, в противном случае возвращает None.
 
     Аргументы:
 
     date (datetime): дата, для которой ищется данные
+    station (int | str | None): идентификатор станции; без него поиск идёт в общем наборе данных
     Возвращает:
 
     data (list) | None: список данных для заданной даты или None, если данные не найдены
     """
 
-    directory = "datasets/data_by_week"
-    for filename in os.listdir(directory):
-        left_date = datetime.datetime.strptime(filename[:8], '%Y%m%d').date()
-        right_date = datetime.datetime.strptime(
-            filename[9:17], '%Y%m%d').date()
-        if (left_date <= date <= right_date):
-            data = ef.read_data(f"{directory}/{filename}")
-            for day in data:
-                if day[0] == str(date):
-                    return day[1:]
+    directory = layout_directory("week", station)
+    partitions = read_manifest(directory, "week")
+    if partitions is not None:
+        partition = partitions.get(week_key(ef.to_date(date)))
+        if partition is not None:
+            return search_partition(f"{directory}/{partition['file']}", date)
+        return None
+
+    # Папка без манифеста: подходящие файлы ищутся по датам в именах
+    for filename in partition_files(directory, "week", date, date):
+        data = search_partition(f"{directory}/{filename}", date)
+        if data is not None:
+            return data
+
+
+def find_offset(index_path: str, date: datetime, ordered: bool = True) -> int | None:
+    """
+    Функция find_offset ищет в индексе Y.idx смещение строки с заданной датой в файле Y.csv.
+    В упорядоченном индексе используется двоичный поиск по отображённому в память файлу.
+
+    Аргументы:
+
+    index_path (str): путь к индексу
+    date (datetime): дата
+    ordered (bool): упорядочены ли записи индекса по дате
+    Возвращает:
 
+    offset (int) | None: смещение строки в байтах или None, если даты нет
+    """
 
-def search_by_date(date: datetime) -> list | None:
+    ordinal = ef.date_to_ordinal(date)
+    size = OFFSET_RECORD.size
+    with open(index_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if not ordered:
+                for value, offset in OFFSET_RECORD.iter_unpack(buffer):
+                    if value == ordinal:
+                        return offset
+                return None
+            low, high = 0, len(buffer) // size
+            while low < high:
+                middle = (low + high) // 2
+                if OFFSET_RECORD.unpack_from(buffer, middle * size)[0] < ordinal:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < len(buffer) // size:
+                value, offset = OFFSET_RECORD.unpack_from(buffer, low * size)
+                if value == ordinal:
+                    return offset
+    return None
+
+
+def search_by_date(date: datetime, station=None) -> list | None:
     """
     Функция search_by_date ищет данные для заданной даты в файлах, содержащих данные по дате и данные. Если данные найдены, возвращает список данных для этой даты, в противном случае возвращает None.
 
     Аргументы:
 
     date (datetime): дата, для которой ищется данные
+    station (int | str | None): идентификатор станции; без него поиск идёт в общем наборе данных
     Возвращает:
 
     data (list) | None: список данных для заданной даты или None, если данные не найдены
     """
 
-    data_from_x = ef.read_data(f"datasets/date_and_data/X.csv")
-    for row, value in enumerate(data_from_x):
-        time = "-".join(value)
-        if time == str(date):
-            data_from_y = ef.read_data(f"datasets/date_and_data/Y.csv")
-            return data_from_y[row]
+    directory = layout_directory("date_and_data", station)
+    partitions = read_manifest(directory, "date_and_data")
+    if partitions is None:
+        # Разбиение без манифеста и индекса
+        row = get_index(f"{directory}/X.csv", parse_date_parts).lookup(date)
+        if row is not None:
+            return get_index(f"{directory}/Y.csv", None).record(row)
+        return None
+
+    ordinal = ef.date_to_ordinal(date)
+    for partition in partitions.values():
+        if not ef.date_to_ordinal(partition["min_date"]) <= ordinal <= ef.date_to_ordinal(partition["max_date"]):
+            continue
+        offset = find_offset(f"{directory}/{partition['index']}", date, partition["ordered"])
+        if offset is not None:
+            with open(f"{directory}/{partition['file']}", "rb") as file:
+                file.seek(offset)
+                return next(csv.reader([file.readline().decode("utf-8")]), [])
+
+
+def search_range(start: datetime, end: datetime, kind: str = "year", station=None) -> list:
+    """
+    Функция search_range возвращает данные за все дни между двумя датами включительно, читая
+    только файлы разбиения, диапазон дат которых пересекается с заданным.
+
+    Аргументы:
+
+    start (datetime): начальная дата
+    end (datetime): конечная дата
+    kind (str): вид разбиения, по которому ведётся поиск ('year', 'month', 'week')
+    station (int | str | None): идентификатор станции; без него поиск идёт в общем наборе данных
+    Возвращает:
+
+    data (list): список строк с датой и данными в порядке файлов разбиения
+    """
+
+    data = []
+    for table, rows in range_rows(start, end, kind, station):
+        data.extend(table.record(row) for row in rows)
+    return data
+
+
+def range_rows(start: datetime, end: datetime, kind: str = "year", station=None):
+    """
+    Генератор range_rows выдаёт пары (таблица, строки) для всех дней между двумя датами
+    включительно. Открываются только файлы разбиения, диапазон дат которых пересекается с заданным;
+    в упорядоченных файлах границы находятся двоичным поиском, и строки выдаются как range.
+
+    Аргументы:
+
+    start (datetime): начальная дата
+    end (datetime): конечная дата
+    kind (str | None): вид разбиения ('year', 'month', 'week'); None - набор данных целиком
+      (станции или datasets/dataset.csv)
+    station (int | str | None): идентификатор станции
+    Возвращает:
+
+    pairs (generator): пары (WeatherTable, range | list) в порядке файлов разбиения
+    """
+
+    if kind is None:
+        paths = [dataset_path(station) if station is not None else os.path.join("datasets", "dataset.csv")]
+    else:
+        directory = layout_directory(kind, station)
+        paths = [f"{directory}/{filename}" for filename in partition_files(directory, kind, start, end)]
+    first, last = ef.date_to_ordinal(start), ef.date_to_ordinal(end)
+    for path in paths:
+        table = partition_cache.get(path)
+        if table.ordered:
+            rows = range(table.bisect(start), table.bisect(end, right=True))
+        else:
+            rows = [row for row, value in enumerate(table.date) if first <= value <= last]
+        if rows:
+            yield table, rows
+
+
+def take(column: array | memoryview, rows: range | list) -> array:
+    """
+    Функция take возвращает значения колонки таблицы в строках rows в виде нового массива.
+    Строки подряд (range) копируются одним срезом, остальные - по одной.
+
+    Аргументы:
+
+    column (array | memoryview): колонка WeatherTable; у таблицы из файла-спутника это memoryview
+    rows (range | list): номера строк, как их выдаёт range_rows
+    Возвращает:
+
+    values (array): значения колонки с тем же кодом типа
+    """
+
+    if isinstance(column, memoryview):
+        # Колонки таблицы из файла-спутника (modules.sidecar) - memoryview с кодом типа в format
+        if isinstance(rows, range):
+            return array(column.format, column[rows.start:rows.stop].tobytes())
+        return array(column.format, map(column.__getitem__, rows))
+    if isinstance(rows, range):
+        return column[rows.start:rows.stop]
+    return array(column.typecode, map(column.__getitem__, rows))
+
+
+def check_columns(columns) -> None:
+    """
+    Функция check_columns проверяет, что все запрошенные колонки есть в WeatherTable.
+
+    Аргументы:
+
+    columns (iterable): имена колонок
+    Возвращает:
+
+    None; при неизвестной колонке возбуждается ValueError
+    """
+
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Неизвестные колонки: {', '.join(sorted(unknown))}")
+
+
+def query_batches(start: datetime, end: datetime, columns=COLUMNS, kind: str = "year", station=None,
+                  batch_size: int = BATCH_ROWS):
+    """
+    Генератор query_batches выдаёт данные между двумя датами включительно пакетами по batch_size
+    строк (последний пакет может быть короче). Пакет - это словарь колонок WeatherTable: даты - это
+    порядковые номера (array 'i'), остальные значения - array 'h' с MISSING на месте пропусков.
+
+    Аргументы:
+
+    start (datetime): начальная дата
+    end (datetime): конечная дата
+    columns (tuple): имена колонок из COLUMNS
+    kind (str | None): вид разбиения ('year', 'month', 'week'); None - набор данных целиком
+    station (int | str | None): идентификатор станции
+    batch_size (int): количество строк в пакете
+    Возвращает:
+
+    batches (generator): словари {колонка: array}
+    """
+
+    check_columns(columns)
+    if batch_size < 1:
+        raise ValueError("batch_size должен быть положительным")
+    batch = None
+    for table, rows in range_rows(start, end, kind, station):
+        offset = 0
+        while offset < len(rows):
+            if batch is None:
+                batch = {name: array("i" if name == "date" else "h") for name in columns}
+                filled = 0
+            part = rows[offset:offset + batch_size - filled]
+            for name in columns:
+                batch[name].extend(take(getattr(table, name), part))
+            filled += len(part)
+            offset += len(part)
+            if filled == batch_size:
+                yield batch
+                batch = None
+    if batch is not None:
+        yield batch
+
+
+def query_range(start: datetime, end: datetime, columns=COLUMNS, kind: str = "year", station=None) -> dict:
+    """
+    Функция query_range возвращает данные между двумя датами включительно одним колоночным пакетом.
+    В отличие от search_range строки не переводятся в текст, а копируются срезами колонок, поэтому
+    выборка месяца или года стоит O(log n + k).
+
+    Аргументы:
+
+    start (datetime): начальная дата
+    end (datetime): конечная дата
+    columns (tuple): имена колонок из COLUMNS
+    kind (str | None): вид разбиения ('year', 'month', 'week'); None - набор данных целиком
+    station (int | str | None): идентификатор станции
+    Возвращает:
+
+    batch (dict): словарь {колонка: array}; пустые массивы, если данных нет
+    """
+
+    check_columns(columns)
+    batch = {name: array("i" if name == "date" else "h") for name in columns}
+    for table, rows in range_rows(start, end, kind, station):
+        for name in columns:
+            batch[name].extend(take(getattr(table, name), rows))
+    return batch
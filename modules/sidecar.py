@@ -0,0 +1,145 @@
+import os
+import sys
+import mmap
+import zlib
+import struct
+
+import modules.add_functions as ef
+from modules.table import COLUMNS, WeatherTable
+
+# Формат файла-спутника: заголовок и колонки WeatherTable одна за другой.
+# Колонки лежат целиком, поэтому каждая открывается как memoryview без копирования.
+# Данные колонок записаны в порядке байтов машины, на которой создан файл.
+MAGIC = b"WTHR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHQqIQ")
+ORDERED = 1
+BIG_ENDIAN = 2
+BYTEORDER = BIG_ENDIAN if sys.byteorder == "big" else 0
+TYPECODES = {"date": "i"}
+SUFFIX = ".bin"
+
+
+def sidecar_path(path: str) -> str:
+    return path + SUFFIX
+
+
+def checksum(path: str, size: int | None = None) -> int:
+    """
+    Функция checksum вычисляет контрольную сумму CRC32 файла, читая его блоками.
+
+    Аргументы:
+
+    path (str): путь к файлу
+    size (int | None): сколько первых байтов учитывать; None - весь файл
+    Возвращает:
+
+    crc (int): контрольная сумма
+    """
+
+    crc = 0
+    left = os.path.getsize(path) if size is None else size
+    with open(path, "rb") as file:
+        while left > 0:
+            block = file.read(min(left, 1 << 20))
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            left -= len(block)
+    return crc
+
+
+def write_sidecar(path: str, table: WeatherTable | None = None) -> str:
+    """
+    Функция write_sidecar создаёт бинарный файл-спутник для CSV-файла данных.
+    Файл записывается во временный и подменяется атомарно.
+
+    Аргументы:
+
+    path (str): путь к CSV-файлу данных
+    table (WeatherTable | None): уже разобранная таблица этого файла
+    Возвращает:
+
+    path (str): путь к файлу-спутнику
+    """
+
+    if table is None:
+        table = WeatherTable.from_csv(path)
+    mtime_ns, size = ef.file_signature(path)
+    target = sidecar_path(path)
+    temporary = target + ".tmp"
+    with open(temporary, "wb") as file:
+        flags = (ORDERED if table.ordered else 0) | BYTEORDER
+        file.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), flags, size, mtime_ns, checksum(path), len(table)))
+        for name in COLUMNS:
+            file.write(getattr(table, name).tobytes())
+    os.replace(temporary, target)
+    return target
+
+
+def read_header(buffer) -> tuple | None:
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, columns, flags, size, mtime_ns, crc, rows = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or columns != len(COLUMNS) or flags & BIG_ENDIAN != BYTEORDER:
+        return None
+    return flags, size, mtime_ns, crc, rows
+
+
+def open_table(path: str) -> WeatherTable | None:
+    """
+    Функция open_table открывает файл-спутник через mmap и возвращает таблицу, колонки
+    которой ссылаются прямо на отображённую память. Если файла-спутника нет, он другой
+    версии или не соответствует CSV-файлу, возвращается None.
+
+    Аргументы:
+
+    path (str): путь к CSV-файлу данных
+    Возвращает:
+
+    table (WeatherTable) | None: таблица данных или None
+    """
+
+    target = sidecar_path(path)
+    if not os.path.exists(target) or os.path.getsize(target) == 0:
+        return None
+    with open(target, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        table = map_table(path, buffer)
+    except BaseException:
+        buffer.close()
+        raise
+    if table is None:
+        # Отображение не должно пережить отказ: открытый mmap мешает подменить файл в Windows
+        buffer.close()
+    return table
+
+
+def map_table(path: str, buffer: mmap.mmap) -> WeatherTable | None:
+    header = read_header(buffer)
+    if header is None:
+        return None
+    flags, size, mtime_ns, crc, rows = header
+    if len(buffer) < HEADER.size + rows * sum(struct.calcsize(TYPECODES.get(name, "h")) for name in COLUMNS):
+        return None
+    signature = ef.file_signature(path)
+    if signature != (mtime_ns, size):
+        # Файл мог быть скопирован или затронут без изменений - сверяем содержимое
+        if signature[1] != size or checksum(path) != crc:
+            return None
+    view = memoryview(buffer)
+    table = WeatherTable()
+    offset = HEADER.size
+    for name in COLUMNS:
+        typecode = TYPECODES.get(name, "h")
+        column = view[offset:offset + rows * struct.calcsize(typecode)].cast(typecode)
+        setattr(table, name, column)
+        offset += column.nbytes
+    table.signature = signature
+    table.ordered = bool(flags & ORDERED)
+    return table
+
+if __name__ == "__main__":
+    for argument in sys.argv[1:]:
+        print(write_sidecar(argument))
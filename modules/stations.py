@@ -0,0 +1,66 @@
+import os
+
+# Папка с данными станций: datasets/stations/<станция>/dataset.csv и папки разбиений рядом
+ROOT = os.path.join("datasets", "stations")
+LAYOUTS = {
+    "year": "data_by_year",
+    "month": "data_by_month",
+    "week": "data_by_week",
+    "date_and_data": "date_and_data",
+}
+
+
+def station_directory(station, root: str = ROOT) -> str:
+    return os.path.join(root, str(station))
+
+
+def dataset_path(station, root: str = ROOT) -> str:
+    """
+    Функция dataset_path возвращает путь к набору данных станции.
+
+    Аргументы:
+
+    station (int | str): идентификатор станции Gismeteo
+    root (str): папка с данными станций
+    Возвращает:
+
+    path (str): путь к dataset.csv станции
+    """
+
+    return os.path.join(station_directory(station, root), "dataset.csv")
+
+
+def layout_directory(kind: str, station=None, root: str = ROOT) -> str:
+    """
+    Функция layout_directory возвращает папку разбиения заданного вида. Без станции
+    возвращается папка общего набора данных в datasets.
+
+    Аргументы:
+
+    kind (str): вид разбиения ('year', 'month', 'week', 'date_and_data')
+    station (int | str | None): идентификатор станции
+    root (str): папка с данными станций
+    Возвращает:
+
+    directory (str): путь к папке разбиения
+    """
+
+    base = "datasets" if station is None else station_directory(station, root)
+    return os.path.join(base, LAYOUTS[kind])
+
+
+def list_stations(root: str = ROOT) -> list:
+    """
+    Функция list_stations возвращает идентификаторы станций, для которых есть набор данных.
+
+    Аргументы:
+
+    root (str): папка с данными станций
+    Возвращает:
+
+    stations (list): идентификаторы станций
+    """
+
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.exists(dataset_path(name, root)))
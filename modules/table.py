@@ -0,0 +1,364 @@
+import os
+import csv
+import bisect
+import datetime
+import functools
+from array import array
+
+import modules.add_functions as ef
+from modules.index import DateIndex, get_index
+
+# Коды направлений ветра; "Ш" - штиль
+WIND_DIRECTIONS = ("Ш", "С", "СВ", "В", "ЮВ", "Ю", "ЮЗ", "З", "СЗ")
+WIND_CODES = {direction: code for code, direction in enumerate(WIND_DIRECTIONS)}
+
+# Значение, которым в типизированных колонках отмечаются отсутствующие данные
+MISSING = -32768
+
+COLUMNS = (
+    "date",
+    "temp_morning",
+    "pressure_morning",
+    "wind_direction_morning",
+    "wind_speed_morning",
+    "temp_evening",
+    "pressure_evening",
+    "wind_direction_evening",
+    "wind_speed_evening",
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_number(text: str) -> int:
+    """
+    Функция parse_number переводит значение температуры или давления в целое число.
+
+    Аргументы:
+
+    text (str): значение из файла данных, например '+5', '-6', '753'
+    Возвращает:
+
+    value (int): число или MISSING, если значение отсутствует
+    """
+
+    text = text.strip().replace("−", "-")
+    try:
+        return int(text)
+    except ValueError:
+        return MISSING
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_wind(text: str) -> tuple:
+    """
+    Функция parse_wind разбирает значение ветра вида 'ЮВ 3м/с' на код направления и скорость.
+
+    Аргументы:
+
+    text (str): значение ветра из файла данных
+    Возвращает:
+
+    wind (tuple): код направления и скорость в м/с; для штиля - (0, 0),
+      для отсутствующего значения - (MISSING, MISSING)
+    """
+
+    direction, _, speed = text.strip().partition(" ")
+    code = WIND_CODES.get(direction)
+    if code is None:
+        return MISSING, MISSING
+    if code == 0:
+        return 0, 0
+    return code, parse_number(speed.replace("м/с", ""))
+
+
+def format_number(value: int, signed: bool = False) -> str:
+    if value == MISSING:
+        return ""
+    return f"{value:+d}" if signed and value else str(value)
+
+
+def format_wind(code: int, speed: int) -> str:
+    if code == MISSING:
+        return ""
+    if code == 0:
+        return WIND_DIRECTIONS[0]
+    return f"{WIND_DIRECTIONS[code]} {format_number(speed)}м/с"
+
+
+class WeatherRow:
+    """
+    WeatherRow - это представление одной строки WeatherTable без копирования данных.
+
+    Аргументы:
+
+    table (WeatherTable): таблица данных
+    row (int): номер строки
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row: int):
+        self._table = table
+        self._row = row
+
+    def __getattr__(self, name: str):
+        if name in COLUMNS:
+            return getattr(self._table, name)[self._row]
+        raise AttributeError(name)
+
+    @property
+    def day(self):
+        return ef.ordinal_to_date(self._table.date[self._row])
+
+    def as_list(self) -> list:
+        """
+        Метод as_list возвращает строку в исходном текстовом виде, как её возвращает read_data.
+        """
+
+        table, row = self._table, self._row
+        return [
+            ef.format_date(table.date[row]),
+            format_number(table.temp_morning[row], signed=True),
+            format_number(table.pressure_morning[row]),
+            format_wind(table.wind_direction_morning[row], table.wind_speed_morning[row]),
+            format_number(table.temp_evening[row], signed=True),
+            format_number(table.pressure_evening[row]),
+            format_wind(table.wind_direction_evening[row], table.wind_speed_evening[row]),
+        ]
+
+    def __repr__(self) -> str:
+        return f"WeatherRow({self.as_list()!r})"
+
+
+class WeatherTable:
+    """
+    WeatherTable - это колоночное хранилище набора данных о погоде.
+    Семь колонок файла разбираются один раз в типизированные массивы array.
+
+    Атрибуты:
+
+    date (array): порядковые номера дат
+    temp_morning, temp_evening (array): температура утром и вечером
+    pressure_morning, pressure_evening (array): давление утром и вечером
+    wind_direction_morning, wind_direction_evening (array): коды направления ветра (WIND_DIRECTIONS)
+    wind_speed_morning, wind_speed_evening (array): скорость ветра в м/с
+    Методы:
+
+    from_rows(cls, rows) -> WeatherTable:
+      Строит таблицу из строк в формате read_data.
+    from_csv(cls, path) -> WeatherTable:
+      Строит таблицу из файла данных.
+    bisect(self, date, right=False) -> int:
+      Возвращает позицию даты в упорядоченной таблице.
+    lookup(self, date) -> int | None:
+      Возвращает номер строки с заданной датой.
+    record(self, row) -> list:
+      Возвращает строку в текстовом виде, как её возвращает read_data.
+    """
+
+    __slots__ = COLUMNS + ("signature", "ordered", "rows")
+
+    def __init__(self):
+        self.date = array("i")
+        for name in COLUMNS[1:]:
+            setattr(self, name, array("h"))
+        self.signature = None
+        self.ordered = True
+        # Номера первых строк по датам для lookup в неупорядоченной таблице; строится при первом поиске
+        self.rows = None
+
+    @classmethod
+    def from_rows(cls, rows) -> "WeatherTable":
+        table = cls()
+        for row in rows:
+            if not row:
+                continue
+            table.append(row)
+        return table
+
+    @classmethod
+    def from_csv(cls, path: str) -> "WeatherTable":
+        with open(path, "r", encoding="utf-8") as file:
+            table = cls.from_rows(csv.reader(file))
+        table.signature = ef.file_signature(path)
+        return table
+
+    def append(self, row: list) -> None:
+        """
+        Метод append разбирает строку в формате read_data и добавляет её в конец таблицы.
+        """
+
+        ordinal = ef.date_to_ordinal(row[0])
+        if self.date and ordinal < self.date[-1]:
+            self.ordered = False
+        self.rows = None
+        self.date.append(ordinal)
+        self.temp_morning.append(parse_number(row[1]))
+        self.pressure_morning.append(parse_number(row[2]))
+        direction, speed = parse_wind(row[3])
+        self.wind_direction_morning.append(direction)
+        self.wind_speed_morning.append(speed)
+        self.temp_evening.append(parse_number(row[4]))
+        self.pressure_evening.append(parse_number(row[5]))
+        direction, speed = parse_wind(row[6])
+        self.wind_direction_evening.append(direction)
+        self.wind_speed_evening.append(speed)
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    def __getitem__(self, row: int) -> WeatherRow:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return WeatherRow(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield WeatherRow(self, row)
+
+    def bisect(self, date: datetime.date | str, right: bool = False) -> int:
+        """
+        Метод bisect возвращает номер первой строки с датой не меньше заданной
+        (при right=True - строго больше). Доступен только для упорядоченных таблиц.
+        """
+
+        if not self.ordered:
+            raise ValueError("Даты в таблице не упорядочены")
+        if right:
+            return bisect.bisect_right(self.date, ef.date_to_ordinal(date))
+        return bisect.bisect_left(self.date, ef.date_to_ordinal(date))
+
+    def record(self, row: int) -> list:
+        return self[row].as_list()
+
+    def lookup(self, date: datetime.date | str) -> int | None:
+        """
+        Метод lookup возвращает номер первой строки с заданной датой или None.
+        В упорядоченной таблице используется двоичный поиск, в неупорядоченной - словарь,
+        который строится при первом вызове.
+        """
+
+        ordinal = ef.date_to_ordinal(date)
+        if self.ordered:
+            row = self.bisect(date)
+            if row < len(self.date) and self.date[row] == ordinal:
+                return row
+            return None
+        if self.rows is None:
+            rows = {}
+            for row, value in enumerate(self.date):
+                rows.setdefault(value, row)
+            self.rows = rows
+        return self.rows.get(ordinal)
+
+    def nbytes(self) -> int:
+        """
+        Метод nbytes возвращает объём памяти, занятый данными колонок, в байтах.
+        """
+
+        return sum(len(column) * column.itemsize for column in (getattr(self, name) for name in COLUMNS))
+
+
+def decode_table(path: str, parse_csv: bool = True) -> WeatherTable | None:
+    """
+    Функция decode_table строит WeatherTable для файла данных без кэширования: из актуального
+    бинарного файла-спутника (modules.sidecar) или файла Parquet (modules.columnar), а если их нет -
+    разбором CSV-файла.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    parse_csv (bool): разбирать ли CSV-файл, если файла-спутника и файла Parquet нет или они устарели
+    Возвращает:
+
+    table (WeatherTable) | None: таблица данных или None, если parse_csv=False и готовых колонок нет
+    """
+
+    import modules.sidecar as sidecar
+
+    table = sidecar.open_table(path)
+    # modules.columnar импортирует pyarrow, поэтому загружается, только если файл Parquet есть
+    if table is None and os.path.exists(os.path.splitext(path)[0] + ".parquet"):
+        import modules.columnar as columnar
+
+        table = columnar.open_table(path)
+    if table is None and parse_csv:
+        table = WeatherTable.from_csv(path)
+    return table
+
+
+_tables = {}
+# Подписи файлов, для которых decode_table(parse_csv=False) не нашёл готовых колонок
+_missing = {}
+
+
+def companion_signatures(path: str) -> tuple:
+    """
+    Функция companion_signatures возвращает подписи файла данных, его файла-спутника и файла Parquet
+    (None для отсутствующих): пока они не меняются, результат decode_table тот же.
+    """
+
+    from modules.sidecar import sidecar_path
+
+    signatures = []
+    for companion in (path, sidecar_path(path), os.path.splitext(path)[0] + ".parquet"):
+        try:
+            signatures.append(ef.file_signature(companion))
+        except FileNotFoundError:
+            signatures.append(None)
+    return tuple(signatures)
+
+
+def load_table(path: str, parse_csv: bool = True) -> WeatherTable | None:
+    """
+    Функция load_table возвращает общую для всех модулей таблицу WeatherTable для файла данных.
+    Таблица строится decode_table один раз и перестраивается, если файл изменился.
+    Если готовых колонок нет или они устарели, при parse_csv=False это тоже запоминается:
+    устаревший файл-спутник того же размера, что и CSV-файл, сверяется по контрольной сумме
+    один раз, а не при каждом вызове.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    parse_csv (bool): разбирать ли CSV-файл, если файла-спутника и файла Parquet нет или они устарели
+    Возвращает:
+
+    table (WeatherTable) | None: таблица данных или None, если parse_csv=False и готовых колонок нет
+    """
+
+    key = os.path.abspath(path)
+    table = _tables.get(key)
+    if table is not None and table.signature == ef.file_signature(path):
+        return table
+    if not parse_csv:
+        signatures = companion_signatures(path)
+        if _missing.get(key) == signatures:
+            return None
+    table = decode_table(path, parse_csv)
+    if table is None:
+        _missing[key] = signatures
+        return None
+    _tables[key] = table
+    return table
+
+
+def open_dataset(path: str) -> WeatherTable | DateIndex:
+    """
+    Функция open_dataset возвращает источник строк файла данных для поиска и итерации:
+    таблицу из актуального файла-спутника или файла Parquet, а если их нет - индекс строк CSV-файла.
+    Оба источника поддерживают len, ordered, bisect, lookup и record.
+
+    Аргументы:
+
+    path (str): путь к файлу данных
+    Возвращает:
+
+    source (WeatherTable | DateIndex): источник строк
+    """
+
+    table = load_table(path, parse_csv=False)
+    if table is not None:
+        return table
+    return get_index(path)
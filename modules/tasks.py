@@ -0,0 +1,29 @@
+import threading
+
+# Как часто (в строках) долгие операции сообщают о ходе работы и проверяют отмену
+PROGRESS_ROWS = 4096
+
+
+class Cancelled(Exception):
+    """Исключение, которым долгая операция прерывается по запросу отмены"""
+
+
+class CancelToken(threading.Event):
+    """
+    CancelToken - это флаг отмены долгой операции, который устанавливается из другого потока.
+    Операция периодически вызывает check и прерывается исключением Cancelled.
+
+    Методы:
+
+    cancel(self) -> None:
+      Запрашивает отмену.
+    check(self) -> None:
+      Возбуждает Cancelled, если отмена запрошена.
+    """
+
+    def cancel(self) -> None:
+        self.set()
+
+    def check(self) -> None:
+        if self.is_set():
+            raise Cancelled()
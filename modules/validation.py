@@ -0,0 +1,183 @@
+import csv
+
+import modules.add_functions as ef
+from modules.table import WIND_CODES, format_number, format_wind
+
+# Допустимые значения полей дневника; значения вне диапазонов считаются ошибкой разбора страницы
+TEMPERATURE_RANGE = (-70, 60)
+PRESSURE_RANGE = (600, 820)
+WIND_SPEED_RANGE = (0, 60)
+
+FIELDS = ("date", "temp_morning", "pressure_morning", "wind_morning", "temp_evening", "pressure_evening",
+          "wind_evening")
+REPAIRS = ("ffill", "reject")
+
+
+def rejects_path(path: str) -> str:
+    return path + ".rejects.csv"
+
+
+def parse_integer(text: str, bounds: tuple) -> int | None:
+    """
+    Функция parse_integer строго разбирает целое число со знаком или без него.
+
+    Аргументы:
+
+    text (str): текст ячейки, например '+5', '−6', '753'
+    bounds (tuple): наименьшее и наибольшее допустимые значения
+    Возвращает:
+
+    value (int) | None: число или None, если текст не число или число вне диапазона
+    """
+
+    text = text.strip().replace("−", "-")
+    digits = text[1:] if text[:1] in "+-" else text
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    value = int(text)
+    return value if bounds[0] <= value <= bounds[1] else None
+
+
+def normalize_temperature(text: str) -> str | None:
+    value = parse_integer(text, TEMPERATURE_RANGE)
+    return None if value is None else format_number(value, signed=True)
+
+
+def normalize_pressure(text: str) -> str | None:
+    value = parse_integer(text, PRESSURE_RANGE)
+    return None if value is None else str(value)
+
+
+def normalize_wind(text: str) -> str | None:
+    """
+    Функция normalize_wind приводит значение ветра к виду 'ЮВ 3м/с'. Принимаются записи
+    с пробелом и без, 'м/с' и 'м/c', направление в любом регистре; штиль - 'Ш' или 'штиль'.
+
+    Аргументы:
+
+    text (str): текст ячейки
+    Возвращает:
+
+    wind (str) | None: значение в виде, который понимает modules.table.parse_wind, или None
+    """
+
+    text = text.strip().upper().replace(" ", "").replace("М/С", "").replace("М/C", "")
+    if text in ("Ш", "ШТИЛЬ", "Ш0"):
+        return format_wind(0, 0)
+    split = len(text) - len(text.lstrip("СВЮЗ"))
+    code = WIND_CODES.get(text[:split])
+    speed = parse_integer(text[split:], WIND_SPEED_RANGE) if text[split:] else None
+    if not code or speed is None:
+        return None
+    return format_wind(code, speed)
+
+
+NORMALIZERS = (normalize_temperature, normalize_pressure, normalize_wind) * 2
+
+
+class RowValidator:
+    """
+    RowValidator - это потоковая проверка строк дневника перед записью в набор данных.
+    Каждая строка проверяется за один проход с O(1) состоянием: дата, типы и диапазоны
+    значений, повторы и пропуски дат относительно предыдущей строки. Значения приводятся
+    к каноническому виду, поэтому записанный файл разбирается без обработки ошибок.
+
+    Неверное значение заменяется значением предыдущей строки (repair='ffill') или вся строка
+    отбрасывается (repair='reject'). Отброшенные строки, заполненные поля и пропуски дат
+    записываются в файл отказов: причина, поле и исходная строка (для пропуска - первая
+    и последняя отсутствующие даты). Файл открывается при первой записи.
+
+    Аргументы:
+
+    rejects (str | None): путь к файлу отказов; None - не записывать отказы
+    repair (str): 'ffill' или 'reject'
+    Атрибуты:
+
+    counts (dict): количество принятых, заполненных и отброшенных строк и пропусков дат
+    Методы:
+
+    validate(self, row) -> list | None:
+      Возвращает строку в каноническом виде или None, если строка отброшена.
+    reset(self) -> None:
+      Забывает дату предыдущей строки: следующая строка не проверяется на повтор и пропуск.
+    close(self) -> None:
+      Закрывает файл отказов.
+    """
+
+    def __init__(self, rejects: str = None, repair: str = "ffill"):
+        if repair not in REPAIRS:
+            raise ValueError(f"Неизвестный способ исправления: {repair}")
+        self.rejects = rejects
+        self.repair = repair
+        self.last = None
+        self.previous = [None] * len(NORMALIZERS)
+        self.counts = {"accepted": 0, "filled": 0, "rejected": 0, "duplicates": 0, "gaps": 0}
+        self.__file = None
+        self.__writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, rows):
+        for row in rows:
+            row = self.validate(row)
+            if row is not None:
+                yield row
+
+    def report(self, reason: str, field: str, values: list) -> None:
+        if self.rejects is None:
+            return
+        if self.__writer is None:
+            self.__file = open(self.rejects, "a", newline="", encoding="utf-8")
+            self.__writer = csv.writer(self.__file)
+        self.__writer.writerow([reason, field, *values])
+
+    def reject(self, reason: str, field: str, row: list) -> None:
+        self.counts["duplicates" if reason == "duplicate" else "rejected"] += 1
+        self.report(reason, field, row)
+
+    def validate(self, row: list) -> list | None:
+        if len(row) != len(FIELDS):
+            self.reject("columns", "", row)
+            return None
+        try:
+            ordinal = ef.date_to_ordinal(row[0])
+        except ValueError:
+            self.reject("invalid", FIELDS[0], row)
+            return None
+        if self.last is not None and ordinal <= self.last:
+            self.reject("duplicate" if ordinal == self.last else "order", FIELDS[0], row)
+            return None
+
+        values = [normalize(text) for normalize, text in zip(NORMALIZERS, row[1:])]
+        filled = []
+        for column, value in enumerate(values):
+            if value is not None:
+                continue
+            if self.repair == "reject" or self.previous[column] is None:
+                self.reject("invalid", FIELDS[column + 1], row)
+                return None
+            values[column] = self.previous[column]
+            filled.append(FIELDS[column + 1])
+
+        if self.last is not None and ordinal > self.last + 1:
+            self.counts["gaps"] += 1
+            self.report("gap", FIELDS[0], [ef.format_date(self.last + 1), ef.format_date(ordinal - 1)])
+        if filled:
+            self.counts["filled"] += 1
+            self.report("filled", ";".join(filled), row)
+        self.counts["accepted"] += 1
+        self.last = ordinal
+        self.previous = values
+        return [ef.format_date(ordinal), *values]
+
+    def reset(self) -> None:
+        self.last = None
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = self.__writer = None
@@ -1,47 +1,206 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from lxml import html as lxml_html
 import requests
-import csv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import argparse
+import datetime
+import json
+import threading
+import time
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
 
+import modules.add_functions as ef
+import modules.ingest as ingest
+import modules.stations as st
+from modules.validation import REPAIRS, RowValidator, rejects_path
 
+DIARY_URL = "https://www.gismeteo.ru/diary"
+STATION = 4618
+BASE_URL = f"{DIARY_URL}/{STATION}"
+HEADERS = {
+    "Accept": "*/*",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36 OPR/102.0.0.0 (Edition Yx GX)"
+}
 
 
-def get_url(year: int, month: int):
+
+
+def station_url(station, diary_url: str = DIARY_URL):
+    """
+        Строит адрес дневника погоды станции.
+
+        Args:
+        station (int | str): Идентификатор станции Gismeteo.
+        diary_url (str): Адрес раздела дневников.
+
+        Returns:
+        str: Адрес дневника станции.
+    """
+
+    return f"{diary_url}/{station}"
+
+
+def get_url(year: int, month: int, base_url: str = BASE_URL):
     """
         Строит URL для указанного года и месяца.
 
         Args:
         year (int): Год.
         month (int): Месяц.
+        base_url (str): Адрес дневника станции; для проверки без сети - адрес локального
+            сервера с сохранёнными страницами в папках {year}/{month}/index.html.
 
         Returns:
         str: Сформированный URL.
     """
 
-    url = f"https://www.gismeteo.ru/diary/4618/{year}/{month}/"
+    url = f"{base_url}/{year}/{month}/"
     return url
 
 
-def get_data(url: str):
+class RateLimiter:
+    """
+        Ограничивает частоту запросов к каждому хосту: между двумя запросами
+        к одному хосту проходит не меньше 1 / rate секунд. Потокобезопасен.
+
+        Args:
+        rate (float): Допустимое количество запросов в секунду к одному хосту; 0 - без ограничения.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_time = {}
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time.get(host, now))
+            self.next_time[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def create_session(workers: int = 1, retries: int = 3, backoff: float = 0.5):
+    """
+        Создаёт сессию requests с пулом соединений на workers потоков и повтором
+        запросов с экспоненциальной задержкой при сетевых ошибках и ответах 429/5xx.
+
+        Args:
+        workers (int): Количество потоков, которые используют сессию.
+        retries (int): Количество повторов запроса.
+        backoff (float): Базовая задержка между повторами в секундах.
+
+        Returns:
+        requests.Session: Сессия.
+    """
+
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_data(url: str, session=None, limiter: RateLimiter = None, timeout: float = 30):
     """
         Получает HTML-код страницы по указанному URL.
 
         Args:
         url (str): URL страницы.
+        session (requests.Session): Сессия с пулом соединений; без неё выполняется отдельный запрос.
+        limiter (RateLimiter): Ограничитель частоты запросов.
+        timeout (float): Таймаут запроса в секундах.
 
         Returns:
         str: HTML-код страницы.
+
+        Raises:
+        requests.HTTPError: Ответ сервера не 2xx.
     """
-    headers = {
-        "Accept": "*/*",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36 OPR/102.0.0.0 (Edition Yx GX)"
-    }
-    req = requests.get(url, headers=headers)
+    if limiter is not None:
+        limiter.wait(url)
+    if session is None:
+        req = requests.get(url, headers=HEADERS, timeout=timeout)
+    else:
+        req = session.get(url, timeout=timeout)
+    # Страница ошибки или ограничения (403, 429, 5xx) не должна разбираться как месяц без данных
+    req.raise_for_status()
+    if "charset" not in req.headers.get("Content-Type", ""):
+        # Страницы дневника в UTF-8; без явной кодировки requests считает текст ISO-8859-1
+        req.encoding = "utf-8"
     src = req.text
     return src
 
 
-def get_table_data(src: str, year: int, month: int):
+def make_record(cells: list, year: int, month: int):
+    """
+        Собирает словарь с данными о погоде из текстов ячеек строки таблицы дневника.
+
+        Args:
+        cells (list): Тексты ячеек строки (11 ячеек).
+        year (int): Год.
+        month (int): Месяц.
+
+        Returns:
+        dict: Данные о погоде за день.
+    """
+
+    return {
+        "day": ef.format_date(ef.parts_to_ordinal(year, month, cells[0])),
+        "temp_morning": cells[1],
+        "presure_morning": cells[2],
+        "wind_morning": cells[5],
+        "temp_evening": cells[6],
+        "presure_evening": cells[7],
+        "wind_evening": cells[10],
+    }
+
+
+class PageError(Exception):
+    """Страница загружена, но на ней нет таблицы дневника: капча, страница ошибки или другая разметка."""
+
+
+# Разборщики возвращают None, если на странице нет таблицы, и пустой список, если в таблице нет строк
+
+def parse_rows_soup(src: str):
+    # Строится дерево только для таблиц, остальная разметка страницы пропускается
+    soup = BeautifulSoup(src, "lxml", parse_only=SoupStrainer("table"))
+    table = soup.find("table")
+    if table is None:
+        return None
+    body = table.find("tbody")
+    if body is None:
+        return []
+    return [[td.text for td in item.find_all('td')] for item in body.find_all("tr")]
+
+
+def parse_rows_lxml(src: str):
+    try:
+        # lxml не принимает str с объявлением кодировки <?xml ... encoding=...?>
+        tree = lxml_html.fromstring(src.encode("utf-8") if src.startswith("<?xml") else src)
+    except etree.ParserError:
+        return None
+    tables = tree.xpath("(//table)[1]")
+    if not tables:
+        return None
+    return [[td.text_content() for td in item.iterfind('.//td')] for item in tables[0].xpath("./tbody[1]//tr")]
+
+
+PARSERS = {"lxml": parse_rows_lxml, "soup": parse_rows_soup}
+
+
+def get_table_data(src: str, year: int, month: int, backend: str = "lxml"):
     """
         Извлекает данные о погоде из HTML-кода для указанного года и месяца.
 
@@ -49,67 +208,411 @@ def get_table_data(src: str, year: int, month: int):
         src (str): HTML-код страницы.
         year (int): Год.
         month (int): Месяц.
+        backend (str): Способ разбора: "lxml" - XPath по дереву lxml, "soup" - BeautifulSoup,
+            ограниченный таблицей через SoupStrainer. Результат у обоих одинаковый.
 
         Returns:
-        list: Список словарей с данными о погоде.
+        list: Список словарей с данными о погоде; пустой, если таблица дневника есть,
+            но данных за месяц нет.
+
+        Raises:
+        PageError: На странице нет таблицы дневника.
     """
 
-    soup = BeautifulSoup(src, "lxml")
-    try:
-        table = soup.find("table").find("tbody").find_all("tr")
-    except Exception:
-        return []
-    data_table = []
-    for item in table:
-        data_td = item.find_all('td')
-        day = data_td[0].text
-        temp_morning = data_td[1].text
-        presure_morning = data_td[2].text
-        wind_morning = data_td[5].text
-        temp_evening = data_td[6].text
-        wind_evening = data_td[10].text
-        presure_evening = data_td[7].text
-        data_table.append(
-            {
-                "day": str(year) + "-" + str(month) + "-" + day,
-                "temp_morning": temp_morning,
-                "presure_morning": presure_morning,
-                "wind_morning": wind_morning,
-                "temp_evening": temp_evening,
-                "presure_evening": presure_evening,
-                "wind_evening": wind_evening,
-
-            }
-        )
-    return data_table
-
-
-
-def write_to_csv(data_table: list):
-    """
-       Записывает извлеченные данные о погоде в CSV-файл.
+    rows = PARSERS[backend](src)
+    if rows is None:
+        raise PageError(f"Нет таблицы дневника на странице за {year}-{month:02d}")
+    return [make_record(cells, year, month) for cells in rows]
+
+
+def parse_page(page: tuple):
+    src, year, month, backend = page
+    return get_table_data(src, year, month, backend)
+
+
+def parse_pages(pages: list, workers: int = None, backend: str = "lxml"):
+    """
+        Разбирает сохранённые страницы дневника в нескольких процессах.
+        Результаты возвращаются в порядке pages.
+
+        Args:
+        pages (list): Список кортежей (HTML-код, год, месяц).
+        workers (int): Количество процессов; по умолчанию - количество ядер.
+        backend (str): Способ разбора страниц (см. get_table_data).
+
+        Returns:
+        list: Списки словарей с данными о погоде для каждой страницы.
+    """
+
+    tasks = [(src, year, month, backend) for src, year, month in pages]
+    workers = workers or os.cpu_count()
+    if workers <= 1:
+        return [parse_page(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_page, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def item_to_row(item: dict):
+    """
+       Переводит словарь с данными о погоде в строку CSV-файла.
 
        Args:
+       item (dict): Данные о погоде за день.
+
+       Returns:
+       list: Строка из семи колонок.
+    """
+
+    return [item["day"], item["temp_morning"], item["presure_morning"], item["wind_morning"], item["temp_evening"],
+            item["presure_evening"], item["wind_evening"]]
+
+
+def write_rows(writer, data_table: list, validator: RowValidator = None):
+    """
+       Записывает извлеченные данные о погоде через открытый csv.writer.
+
+       Args:
+       writer: csv.writer открытого файла.
        data_table (list): Список словарей с данными о погоде.
+       validator (RowValidator): Проверка строк перед записью; None - строки пишутся как есть.
 
        Returns:
        None
     """
 
-    with open('dataset.csv', 'a', newline='', encoding='utf-8') as csvfile:
-        for item in data_table:
-            writer = csv.writer(csvfile, delimiter=",")
-            writer.writerow(
-                [item["day"], item["temp_morning"], item["presure_morning"], item["wind_morning"], item["temp_evening"],
-                 item["presure_evening"], item["wind_evening"]])
+    rows = map(item_to_row, data_table)
+    writer.writerows(rows if validator is None else validator(rows))
+
+
+def write_to_csv(data_table: list, path: str = 'dataset.csv', repair: str = "ffill"):
+    """
+       Записывает извлеченные данные о погоде в журнал загрузки CSV-файла (modules.ingest).
+       Строки проходят проверку RowValidator и попадают в новый сегмент; сам файл не
+       меняется, пока не накопится ingest.COMPACT_SEGMENTS сегментов. Оставшиеся сегменты
+       сливаются с файлом вызовом ingest.compact.
+
+       Args:
+       data_table (list): Список словарей с данными о погоде.
+       path (str): Путь к CSV-файлу.
+       repair (str): Что делать с неверными значениями: "ffill" или "reject".
+
+       Returns:
+       None
+    """
+
+    with RowValidator(rejects_path(path), repair) as validator:
+        ingest.append_segment(path, validator(map(item_to_row, data_table)))
+    ingest.compact(path, ingest.COMPACT_SEGMENTS)
+
+
+def validate_months(validator: RowValidator, months: list, tables):
+    """
+        Проверяет строки загруженных месяцев. Между несоседними месяцами дата предыдущей
+        строки сбрасывается, чтобы пропущенные при дозагрузке месяцы не считались пропусками дат.
+        Незагруженные месяцы (None) пропускаются так же.
+
+        Args:
+        validator (RowValidator): Проверка строк.
+        months (list): Пары (год, месяц) в порядке tables.
+        tables: Списки словарей с данными о погоде за каждый месяц или None.
+
+        Returns:
+        generator: Строки из семи колонок в каноническом виде.
+    """
+
+    previous = None
+    for (year, month), data_table in zip(months, tables):
+        if data_table is None:
+            continue
+        number = year * 12 + month
+        if previous is not None and number != previous + 1:
+            validator.reset()
+        previous = number
+        yield from validator(map(item_to_row, data_table))
+
+
+def fetch_months(months: list, workers: int = 8, rate: float = 0, base_url: str = BASE_URL, session=None,
+                 limiter: RateLimiter = None):
+    """
+        Параллельно загружает и разбирает страницы дневника за указанные месяцы.
+        Все потоки используют одну сессию с пулом соединений. Результаты
+        возвращаются в порядке months, независимо от порядка завершения загрузок.
+        Если страницу не удалось загрузить (сетевая ошибка, ответ не 2xx) или на ней нет
+        таблицы дневника, за месяц выдаётся None, а причина печатается в stderr.
+
+        Args:
+        months (list): Список пар (год, месяц).
+        workers (int): Количество потоков загрузки.
+        rate (float): Допустимое количество запросов в секунду к одному хосту; 0 - без ограничения.
+        base_url (str): Адрес дневника станции.
+        session (requests.Session): Сессия; по умолчанию создаётся create_session(workers).
+        limiter (RateLimiter): Общий ограничитель частоты; по умолчанию создаётся RateLimiter(rate).
+
+        Returns:
+        generator: Списки словарей с данными о погоде за каждый месяц или None.
+    """
+
+    session = session or create_session(workers)
+    limiter = limiter or RateLimiter(rate)
+
+    def fetch(month):
+        try:
+            src = get_data(get_url(*month, base_url=base_url), session, limiter)
+            return get_table_data(src, *month)
+        except (requests.RequestException, PageError) as error:
+            print(f"{month[0]}-{month[1]:02d}: {error}", file=sys.stderr)
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fetch, months)
+
+
+def scrape(months: list, path: str = 'dataset.csv', workers: int = 8, rate: float = 0, base_url: str = BASE_URL,
+           repair: str = "ffill"):
+    """
+        Загружает страницы за указанные месяцы и записывает данные в CSV-файл. Строки проходят
+        проверку RowValidator, пишутся в сегмент журнала загрузки и сливаются с файлом по дате
+        (modules.ingest): строки с уже записанными датами заменяются. Загруженные месяцы
+        (не позже текущего) записываются в файл состояния, как в scrape_incremental.
+
+        Args:
+        months (list): Список пар (год, месяц) в порядке возрастания.
+        path (str): Путь к CSV-файлу.
+        workers (int): Количество потоков загрузки.
+        rate (float): Допустимое количество запросов в секунду к одному хосту.
+        base_url (str): Адрес дневника станции.
+        repair (str): Что делать с неверными значениями: "ffill" или "reject".
+
+        Returns:
+        int: Количество записанных строк.
+    """
+
+    today = datetime.date.today()
+    fetched = set()
+
+    def tables():
+        for month, table in zip(months, fetch_months(months, workers, rate, base_url)):
+            # Будущий месяц без строк не считается загруженным: его данные ещё появятся
+            if table is not None and month <= (today.year, today.month):
+                fetched.add(month)
+            yield table
+
+    with RowValidator(rejects_path(path), repair) as validator:
+        ingest.append_segment(path, validate_months(validator, months, tables()))
+    ingest.compact(path)
+    write_coverage(path, read_coverage(path) | fetched)
+    return validator.counts["accepted"]
+
+
+def state_path(path: str):
+    return path + ".months.json"
+
+
+def read_coverage(path: str):
+    """
+        Возвращает месяцы, которые уже загружены в CSV-файл. Месяцы хранятся в файле
+        состояния рядом с набором данных; если его нет, они один раз собираются по датам файла.
+
+        Args:
+        path (str): Путь к CSV-файлу.
+
+        Returns:
+        set: Множество пар (год, месяц).
+    """
+
+    if os.path.exists(state_path(path)):
+        with open(state_path(path), encoding='utf-8') as file:
+            return {tuple(month) for month in json.load(file)["months"]}
+    months = set()
+    if os.path.exists(path):
+        with open(path, 'rb') as file:
+            for line in file:
+                try:
+                    day = ef.to_date(line.split(b",", 1)[0])
+                except ValueError:
+                    continue
+                months.add((day.year, day.month))
+    return months
+
+
+def write_coverage(path: str, months: set):
+    with open(state_path(path) + ".tmp", 'w', encoding='utf-8') as file:
+        json.dump({"months": sorted(months)}, file)
+    os.replace(state_path(path) + ".tmp", state_path(path))
+
+
+def months_to_fetch(covered: set, start_year: int, end_year: int, refresh: int = 2, today: datetime.date = None):
+    """
+        Выбирает месяцы для загрузки: отсутствующие в наборе данных и refresh последних
+        месяцев до текущего включительно, данные за которые могли быть неполными.
+
+        Args:
+        covered (set): Уже загруженные месяцы (год, месяц).
+        start_year (int): Первый год.
+        end_year (int): Последний год.
+        refresh (int): Сколько последних месяцев загружать повторно.
+        today (datetime.date): Текущая дата.
+
+        Returns:
+        list: Пары (год, месяц) в порядке возрастания.
+    """
+
+    today = today or datetime.date.today()
+    current = today.year * 12 + today.month - 1
+    months = []
+    for year in range(start_year, end_year + 1):
+        for month in range(1, 13):
+            number = year * 12 + month - 1
+            if number > current:
+                break
+            if (year, month) not in covered or current - number < refresh:
+                months.append((year, month))
+    return months
+
+
+def upsert_rows(path: str, rows: list):
+    """
+        Добавляет строки в CSV-файл, заменяя строки с теми же датами. Строки записываются
+        сегментом журнала загрузки и сливаются с файлом (modules.ingest.compact): файл остаётся
+        упорядоченным по дате и подменяется целиком, поэтому читатели не видят его недописанным.
+
+        Args:
+        path (str): Путь к CSV-файлу.
+        rows (list): Строки из семи колонок.
+
+        Returns:
+        int: Количество новых или обновлённых строк.
+    """
+
+    ingest.append_segment(path, rows)
+    return ingest.compact(path)
+
+
+def scrape_incremental(path: str = 'dataset.csv', start_year: int = 2007, end_year: int = 2023, refresh: int = 2,
+                       workers: int = 8, rate: float = 0, base_url: str = BASE_URL, session=None,
+                       limiter: RateLimiter = None, repair: str = "ffill", full: bool = False):
+    """
+        Загружает только отсутствующие в наборе данных месяцы и refresh последних месяцев,
+        записывая строки по датам без дублей. Повторный запуск без новых данных
+        ничего не загружает, кроме последних месяцев. Каждый месяц записывается отдельным
+        сегментом журнала загрузки сразу после загрузки, и тогда же отмечается в файле
+        состояния, поэтому в памяти не копятся загруженные месяцы, а прерванный запуск
+        не загружает записанное заново. Загруженным считается только месяц, страница которого
+        содержала таблицу дневника; месяцы с ошибкой загрузки запрашиваются снова при
+        следующем запуске.
+
+        Args:
+        path (str): Путь к CSV-файлу.
+        start_year (int): Первый год.
+        end_year (int): Последний год.
+        refresh (int): Сколько последних месяцев загружать повторно.
+        workers (int): Количество потоков загрузки.
+        rate (float): Допустимое количество запросов в секунду к одному хосту.
+        base_url (str): Адрес дневника станции.
+        session (requests.Session): Сессия с пулом соединений.
+        limiter (RateLimiter): Общий ограничитель частоты запросов.
+        repair (str): Что делать с неверными значениями: "ffill" или "reject".
+        full (bool): Загрузить заново все месяцы периода, а не только отсутствующие.
+
+        Returns:
+        int: Количество новых или обновлённых строк.
+    """
+
+    covered = read_coverage(path)
+    months = months_to_fetch(set() if full else covered, start_year, end_year, refresh)
+    count = 0
+    previous = None
+    with RowValidator(rejects_path(path), repair) as validator:
+        for month, table in zip(months, fetch_months(months, workers, rate, base_url, session, limiter)):
+            if table is None:
+                continue
+            # Как в validate_months: между несоседними месяцами дата предыдущей строки сбрасывается
+            number = month[0] * 12 + month[1]
+            if previous is not None and number != previous + 1:
+                validator.reset()
+            previous = number
+            ingest.append_segment(path, validator(map(item_to_row, table)))
+            # Таблица дневника без строк означает, что данных за месяц нет: такой месяц тоже загружен
+            covered.add(month)
+            write_coverage(path, covered)
+            count += ingest.compact(path, ingest.COMPACT_SEGMENTS)
+    return count + ingest.compact(path)
+
+
+def scrape_stations(stations: list, root: str = st.ROOT, start_year: int = 2007, end_year: int = 2023,
+                    refresh: int = 2, workers: int = 8, rate: float = 0, diary_url: str = DIARY_URL,
+                    repair: str = "ffill", full: bool = False):
+    """
+        Инкрементально загружает дневники нескольких станций в datasets/stations/<станция>/dataset.csv.
+        Все станции используют одну сессию с пулом соединений и общий ограничитель частоты,
+        так как запросы идут к одному хосту.
+
+        Args:
+        stations (list): Идентификаторы станций.
+        root (str): Папка с данными станций.
+        start_year (int): Первый год.
+        end_year (int): Последний год.
+        refresh (int): Сколько последних месяцев загружать повторно.
+        workers (int): Количество потоков загрузки.
+        rate (float): Допустимое количество запросов в секунду к одному хосту.
+        diary_url (str): Адрес раздела дневников.
+        repair (str): Что делать с неверными значениями: "ffill" или "reject".
+        full (bool): Загрузить заново все месяцы периода, а не только отсутствующие.
+
+        Returns:
+        dict: Количество новых или обновлённых строк по станциям.
+    """
+
+    session = create_session(workers)
+    limiter = RateLimiter(rate)
+    counts = {}
+    for station in stations:
+        os.makedirs(st.station_directory(station, root), exist_ok=True)
+        counts[station] = scrape_incremental(st.dataset_path(station, root), start_year, end_year, refresh, workers,
+                                             rate, station_url(station, diary_url), session, limiter, repair, full)
+    return counts
+
 
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка дневника погоды Gismeteo в CSV-файл")
+    parser.add_argument("--start-year", type=int, default=2007)
+    parser.add_argument("--end-year", type=int, default=2023)
+    parser.add_argument("--output", default="dataset.csv")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=4, help="запросов в секунду к одному хосту, 0 - без ограничения")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--station", type=int, action="append",
+                        help="идентификатор станции; можно указать несколько, данные пишутся в " + st.ROOT)
+    parser.add_argument("--diary-url", default=DIARY_URL)
+    parser.add_argument("--full", action="store_true", help="загрузить все месяцы заново (для каждой станции)")
+    parser.add_argument("--refresh", type=int, default=2, help="сколько последних месяцев загружать повторно")
+    parser.add_argument("--invalid", choices=REPAIRS, default="ffill",
+                        help="неверные значения: ffill - заменить предыдущими, reject - отбросить строку; "
+                             "отказы пишутся в <файл>.rejects.csv")
+    parser.add_argument("--parquet", action="store_true",
+                        help="записать рядом с CSV-файлом колоночный файл Parquet (нужен pyarrow)")
+    args = parser.parse_args()
+    if args.parquet:
+        import modules.columnar as columnar
 
-for year in range(2007, 2024):
-    for month in range(1, 13):
-        url = get_url(year, month)
-        src = get_data(url)
-        data_table = get_table_data(src, year, month)
-        write_to_csv(data_table)
+        columnar.require()
+    if args.station:
+        counts = scrape_stations(args.station, st.ROOT, args.start_year, args.end_year, args.refresh,
+                                 args.workers, args.rate, args.diary_url, args.invalid, args.full)
+        for station, count in counts.items():
+            print(f"Станция {station}: записано строк {count}")
+            if args.parquet:
+                columnar.write_table(st.dataset_path(station, st.ROOT))
+        return
+    if args.full:
+        months = [(year, month) for year in range(args.start_year, args.end_year + 1) for month in range(1, 13)]
+        count = scrape(months, args.output, args.workers, args.rate, args.base_url, args.invalid)
+    else:
+        count = scrape_incremental(args.output, args.start_year, args.end_year, args.refresh,
+                                   args.workers, args.rate, args.base_url, repair=args.invalid)
+    print(f"Записано строк: {count}")
+    if args.parquet:
+        columnar.write_table(args.output)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,30 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5 import QtWidgets
+
+from workers import TaskRunner
+from tests.helpers import make_dataset
+
+
+@pytest.fixture(scope="session")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = str(tmp_path / "dataset.csv")
+    make_dataset(path, 5_000)
+    return path
+
+
+@pytest.fixture
+def runner(app):
+    runner = TaskRunner(1)
+    yield runner
+    # Пул потоков при удалении ждёт задачи, удерживая GIL: задачи дожидаются здесь, пока GIL свободен
+    runner.cancel()
+    runner.wait()
@@ -0,0 +1,95 @@
+import csv
+import time
+import random
+import datetime
+
+WIND_DIRECTIONS = ["С", "СВ", "В", "ЮВ", "Ю", "ЮЗ", "З", "СЗ"]
+
+
+def make_dataset(path: str, rows: int, start: datetime.date = datetime.date(2007, 1, 1), seed: int = 0) -> None:
+    """
+    Функция make_dataset создаёт синтетический набор данных в формате datasets/dataset.csv.
+
+    Аргументы:
+
+    path (str): путь к создаваемому файлу
+    rows (int): количество строк (по одной на день, начиная с start)
+    start (datetime.date): первая дата набора
+    seed (int): начальное значение генератора случайных чисел
+    Возвращает:
+
+    None
+    """
+
+    generator = random.Random(seed)
+    day = start
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        for _ in range(rows):
+            wind = f"{generator.choice(WIND_DIRECTIONS)} {generator.randint(1, 9)}м/с"
+            writer.writerow([
+                f"{day.year}-{day.month}-{day.day}",
+                f"{generator.randint(-30, 35):+d}",
+                generator.randint(730, 770),
+                wind,
+                f"{generator.randint(-30, 35):+d}",
+                generator.randint(730, 770),
+                wind,
+            ])
+            day += datetime.timedelta(days=1)
+
+
+def make_diary_page(year: int, month: int, seed: int = 0) -> str:
+    """
+    Функция make_diary_page создаёт HTML-страницу дневника погоды за месяц в разметке Gismeteo:
+    таблица, в строке которой 11 ячеек (день, утро: температура, давление, облачность, явления,
+    ветер; вечер: то же самое).
+
+    Аргументы:
+
+    year (int): год
+    month (int): месяц
+    seed (int): начальное значение генератора случайных чисел
+    Возвращает:
+
+    html (str): HTML-код страницы
+    """
+
+    generator = random.Random(seed * 10000 + year * 100 + month)
+    day = datetime.date(year, month, 1)
+    rows = []
+    while day.month == month:
+        cells = [str(day.day)]
+        for _ in range(2):
+            wind = f"{generator.choice(WIND_DIRECTIONS)} {generator.randint(1, 9)}м/с"
+            cells += [f"{generator.randint(-30, 35):+d}", str(generator.randint(730, 770)),
+                      '<img src="sun.png">', "", f"<span>{wind}</span>"]
+        rows.append("<tr>" + "".join(f'<td class="c{i}">{cell}</td>' for i, cell in enumerate(cells)) + "</tr>")
+        day += datetime.timedelta(days=1)
+    return ("<html><head><title>Дневник погоды</title></head><body><div class=\"menu\">"
+            + "".join(f'<a href="/diary/{i}">{i}</a>' for i in range(50))
+            + "</div><table><thead><tr><th>День</th></tr></thead><tbody>" + "".join(rows)
+            + "</tbody></table><div class=\"footer\">Gismeteo</div></body></html>")
+
+
+def run_until(app, condition, timeout: float = 60.0) -> None:
+    """
+    Функция run_until обрабатывает события Qt, пока не выполнится условие.
+
+    Аргументы:
+
+    app (QApplication): приложение
+    condition (callable): условие завершения
+    timeout (float): предельное время ожидания в секундах
+    Возвращает:
+
+    None
+    """
+
+    from PyQt5 import QtCore
+
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("задача не завершилась")
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
@@ -0,0 +1,55 @@
+import os
+import json
+
+import modules.sidecar as sidecar
+import modules.aggregates as aggregates
+import modules.add_functions as ef
+import pars_data
+from modules.table import load_table
+
+
+def cube_json(cube: aggregates.AggregateCube) -> dict:
+    # Ячейки из файла хранятся разобранными лениво: сравнивается их запись в json
+    data = json.loads(json.dumps(cube.to_json()))
+    return {name: data[name] for name in ("rows", "counts", "partitions")}
+
+
+def rebuilt(path: str) -> aggregates.AggregateCube:
+    cube = aggregates.AggregateCube()
+    cube.update(load_table(path))
+    return cube
+
+
+def test_refresh_after_upsert_matches_rebuild(dataset, monkeypatch):
+    aggregates.load_cube(dataset)
+    table = load_table(dataset)
+    last = ef.ordinal_to_date(table.date[-1])
+    month = [table.record(row) for row in range(len(table) - 40, len(table))
+             if ef.ordinal_to_date(table.date[row]).replace(day=1) == last.replace(day=1)]
+    for number, change in enumerate(("+1", "-3")):
+        day = ef.format_date(last.toordinal() + number + 1)
+        rows = [row[:1] + [change] + row[2:] for row in month] + [[day, change, "750", "С 1м/с", "0", "751", "С 1м/с"]]
+        pars_data.upsert_rows(dataset, rows)
+        # Из памяти и из файла рядом с набором хранилище обновляется без полного пересчёта
+        for cached in (True, False):
+            if not cached:
+                aggregates._cubes.clear()
+            monkeypatch.setattr(aggregates.AggregateCube, "update", None)
+            cube = aggregates.load_cube(dataset, persist=cached)
+            monkeypatch.undo()
+            assert cube_json(cube) == cube_json(rebuilt(dataset))
+
+
+def test_touched_file_is_checksummed_once(dataset, monkeypatch):
+    aggregates.load_cube(dataset)
+    os.utime(dataset, ns=(10 ** 18, 10 ** 18))
+    calls = []
+    checksum = sidecar.checksum
+    monkeypatch.setattr(sidecar, "checksum", lambda *args: calls.append(args) or checksum(*args))
+    for _ in range(3):
+        # Каждый раз как в новом процессе: хранилище читается из файла
+        aggregates._cubes.clear()
+        cube = aggregates.load_cube(dataset)
+    assert len(calls) == 1
+    assert cube.mtime_ns == 10 ** 18
+    assert cube_json(cube) == cube_json(rebuilt(dataset))
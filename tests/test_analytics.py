@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+import analytics
+
+# 64 строки на часть: файл читается десятками частей
+MEMORY_LIMIT = 64 * analytics.ROW_BYTES
+
+
+@pytest.mark.parametrize("temperature, column", [(5, "temp_morning"), (-12, "temp_evening"), (100, "temp_morning")])
+def test_filter_by_temperature_chunked_matches_in_memory(dataset, temperature, column):
+    expected = analytics.filter_by_temperature(analytics.read_dataset(dataset), temperature, column)
+    chunked = analytics.filter_by_temperature_chunked(dataset, temperature, column, memory_limit=MEMORY_LIMIT)
+    pd.testing.assert_frame_equal(chunked, expected)
+
+
+@pytest.mark.parametrize("start, end", [("2008-02-01", "2008-02-29"), ("2006-01-01", "2007-01-03"),
+                                        ("2010-05-05", "2010-05-05"), ("2030-01-01", "2031-01-01")])
+def test_filter_by_date_chunked_matches_in_memory(dataset, start, end):
+    expected = analytics.filter_by_date(analytics.read_dataset(dataset), start, end)
+    chunked = analytics.filter_by_date_chunked(dataset, start, end, memory_limit=MEMORY_LIMIT)
+    pd.testing.assert_frame_equal(chunked, expected)
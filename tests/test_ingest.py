@@ -0,0 +1,51 @@
+import os
+import datetime
+import multiprocessing
+
+import pytest
+
+import modules.ingest as ingest
+from modules.table import load_table
+
+PROCESSES = 4
+BATCHES = 15
+
+
+def write_batches(path: str, number: int) -> None:
+    # Каждый процесс пишет свои даты и время от времени сливает сегменты
+    start = datetime.date(2007, 1, 1) + datetime.timedelta(days=number * BATCHES)
+    for batch in range(BATCHES):
+        day = start + datetime.timedelta(days=batch)
+        ingest.append_segment(path, [[day.isoformat(), "+1", "750", "С 1м/с", "+2", "751", "С 1м/с"]])
+        if batch % 5 == 4:
+            ingest.compact(path)
+
+
+def test_concurrent_processes_lose_no_batches(tmp_path):
+    path = str(tmp_path / "dataset.csv")
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=write_batches, args=(path, number)) for number in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    ingest.compact(path)
+    table = load_table(path)
+    assert list(table.date) == [datetime.date(2007, 1, 1).toordinal() + day for day in range(PROCESSES * BATCHES)]
+    assert ingest.segment_paths(path) == []
+
+
+def test_failed_compaction_removes_temporary_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "dataset.csv")
+    ingest.append_segment(path, [["2007-01-01", "+1", "750", "С 1м/с", "+2", "751", "С 1м/с"]])
+
+    def fail(rows, new):
+        raise OSError("диск заполнен")
+        yield
+
+    monkeypatch.setattr(ingest, "merge_rows", fail)
+    with pytest.raises(OSError):
+        ingest.compact(path)
+    assert not os.path.exists(path + ".compact.tmp")
+    assert len(ingest.segment_paths(path)) == 1
@@ -0,0 +1,68 @@
+import os
+import csv
+import datetime
+
+import pytest
+
+import modules.iterator as d_iter
+from modules.table import open_dataset
+from tests.helpers import make_dataset
+
+
+def read_rows(path: str) -> list:
+    with open(path, encoding="utf-8", newline="") as file:
+        return [tuple(row) for row in csv.reader(file) if row]
+
+
+def test_prefetch_steps_match_file(dataset):
+    rows = read_rows(dataset)
+    day = datetime.date(2013, 11, 2)
+    iterator = d_iter.PrefetchIterator(dataset)
+    index, fetched = iterator.fetch(day, 1)
+    iterator.install(fetched)
+    assert iterator.move(index) == rows[index]
+    assert rows[index][0] == "2013-11-3"
+    forward = [iterator.step(1) for _ in range(1000)]
+    assert forward == rows[index + 1:index + 1001]
+    assert [iterator.step(-1) for _ in range(1000)] == rows[index:index + 1000][::-1]
+
+
+def test_prefetch_returns_rows_of_rewritten_file(dataset):
+    iterator = d_iter.PrefetchIterator(dataset)
+    iterator.install(iterator.fetch(0)[1])
+    assert iterator.cached(100)
+    # Тот же файл переписан другими данными и укорочен
+    make_dataset(dataset, 3_000, seed=1)
+    os.utime(dataset, ns=(0, 0))
+    rows = read_rows(dataset)
+    index, fetched = iterator.fetch(0)
+    iterator.install(fetched)
+    assert len(iterator) == 3_000
+    assert not iterator.cached(3_000)
+    # Шаги за пределы подкачанных строк и подкачка по ходу движения читают новую версию файла
+    stepped = [iterator.move(index)]
+    while True:
+        rows_ahead = iterator.refill(1)
+        if rows_ahead:
+            iterator.install(iterator.read(rows_ahead))
+        try:
+            stepped.append(iterator.step(1))
+        except StopIteration:
+            break
+    assert stepped == rows
+    assert [iterator.step(-1) for _ in range(10)] == rows[-11:-1][::-1]
+
+
+def test_data_iterator_reads_appended_rows(dataset):
+    iterator = d_iter.DataIterator(dataset)
+    rows = list(iterator)
+    assert len(rows) == 5_000
+    with open(dataset, "a", encoding="utf-8", newline="") as file:
+        file.write("2030-01-01,+1,750,С 1м/с,+2,751,С 1м/с\r\n")
+    assert next(iterator) == ("2030-01-01", "+1", "750", "С 1м/с", "+2", "751", "С 1м/с")
+    # Переписанный файл замечается при переходе к дате
+    make_dataset(dataset, 100, seed=1)
+    os.utime(dataset, ns=(0, 0))
+    assert iterator.seek("2007-01-01") == 0
+    assert next(iterator) == tuple(open_dataset(dataset).record(1))
+    iterator.close()
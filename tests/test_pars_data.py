@@ -0,0 +1,47 @@
+import pytest
+
+import pars_data
+import modules.ingest as ingest
+from modules.table import load_table
+from tests.helpers import make_diary_page
+
+MONTHS = [(2010, month) for month in range(1, 7)]
+
+
+def fake_fetch(failed=(), interrupt_after=None):
+    def fetch_months(months, *args, **kwargs):
+        for number, (year, month) in enumerate(months):
+            if number == interrupt_after:
+                raise KeyboardInterrupt
+            yield None if (year, month) in failed else pars_data.get_table_data(make_diary_page(year, month), year, month)
+    return fetch_months
+
+
+def test_incremental_run_writes_each_month_as_it_arrives(tmp_path, monkeypatch):
+    path = str(tmp_path / "dataset.csv")
+    monkeypatch.setattr(pars_data, "fetch_months", fake_fetch(failed={(2010, 2)}, interrupt_after=4))
+    with pytest.raises(KeyboardInterrupt):
+        pars_data.scrape_incremental(path, 2010, 2010, refresh=0)
+    # Записанное до прерывания сохранено и отмечено, месяц с ошибкой - нет
+    assert pars_data.read_coverage(path) == {(2010, 1), (2010, 3), (2010, 4)}
+    assert len(ingest.segment_paths(path)) == 3
+
+    requested = []
+    fetch = fake_fetch()
+    monkeypatch.setattr(pars_data, "fetch_months", lambda months, *args, **kwargs: requested.extend(months) or fetch(months))
+    pars_data.scrape_incremental(path, 2010, 2010, refresh=0)
+    assert requested[:3] == [(2010, 2), (2010, 5), (2010, 6)]
+    assert ingest.segment_paths(path) == []
+    assert {(day.year, day.month) for day in map(pars_data.ef.ordinal_to_date, load_table(path).date)} == {(2010, month) for month in range(1, 13)}
+
+
+def test_full_scrape_records_coverage(tmp_path, monkeypatch):
+    path = str(tmp_path / "dataset.csv")
+    monkeypatch.setattr(pars_data, "fetch_months", fake_fetch(failed={(2010, 3)}))
+    pars_data.scrape(MONTHS, path)
+    assert pars_data.read_coverage(path) == set(MONTHS) - {(2010, 3)}
+    # Следующий инкрементальный запуск загружает только месяц с ошибкой
+    requested = []
+    monkeypatch.setattr(pars_data, "fetch_months", lambda months, *args, **kwargs: requested.extend(months) or iter([None] * len(months)))
+    pars_data.scrape_incremental(path, 2010, 2010, refresh=0)
+    assert [month for month in requested if month in MONTHS] == [(2010, 3)]
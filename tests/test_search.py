@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+
+import modules.search as ds
+from modules import division
+from modules.sidecar import write_sidecar
+from modules.stations import dataset_path
+from modules.table import COLUMNS, WeatherTable
+from tests.helpers import make_dataset
+
+STATION = 1
+RANGES = [
+    (datetime.date(2008, 2, 1), datetime.date(2008, 2, 29)),
+    (datetime.date(2007, 12, 30), datetime.date(2009, 1, 4)),
+    (datetime.date(2006, 1, 1), datetime.date(2007, 1, 10)),
+    (datetime.date(2010, 6, 15), datetime.date(2010, 6, 15)),
+    # Пустые выборки: до начала данных и конец раньше начала
+    (datetime.date(2001, 1, 1), datetime.date(2001, 12, 31)),
+    (datetime.date(2009, 5, 2), datetime.date(2009, 5, 1)),
+]
+
+
+@pytest.fixture
+def station(tmp_path, monkeypatch):
+    # Разбиения ищутся относительно текущей папки (datasets/stations/<станция>)
+    monkeypatch.chdir(tmp_path)
+    path = dataset_path(STATION)
+    (tmp_path / path).parent.mkdir(parents=True)
+    make_dataset(path, 1_500)
+    division.division_by_station([STATION])
+    yield WeatherTable.from_csv(path)
+    ds.partition_cache.clear()
+
+
+def brute_force(table: WeatherTable, start: datetime.date, end: datetime.date, columns) -> dict:
+    rows = [row for row in range(len(table)) if start.toordinal() <= table.date[row] <= end.toordinal()]
+    return {name: [getattr(table, name)[row] for row in rows] for name in columns}
+
+
+def as_lists(batch: dict) -> dict:
+    return {name: list(values) for name, values in batch.items()}
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+@pytest.mark.parametrize("kind", ["year", "month", "week", None])
+def test_query_range_matches_brute_force(station, kind, start, end):
+    expected = brute_force(station, start, end, COLUMNS)
+    assert as_lists(ds.query_range(start, end, kind=kind, station=STATION)) == expected
+    columns = ("date", "temp_evening")
+    batches = list(ds.query_batches(start, end, columns, kind=kind, station=STATION, batch_size=64))
+    assert all(len(batch["date"]) == 64 for batch in batches[:-1])
+    assert {name: sum((list(batch[name]) for batch in batches), []) for name in columns} == \
+        {name: expected[name] for name in columns}
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_query_range_over_sidecar_columns(station, start, end):
+    write_sidecar(dataset_path(STATION))
+    table = ds.partition_cache.get(dataset_path(STATION))
+    assert isinstance(table.date, memoryview)
+    expected = brute_force(station, start, end, COLUMNS)
+    assert as_lists(ds.query_range(start, end, kind=None, station=STATION)) == expected
+    batches = list(ds.query_batches(start, end, kind=None, station=STATION, batch_size=50))
+    assert {name: sum((list(batch[name]) for batch in batches), []) for name in COLUMNS} == expected
+
+
+def test_search_range_matches_brute_force(station):
+    start, end = RANGES[1]
+    records = ds.search_range(start, end, kind="month", station=STATION)
+    assert [WeatherTable.from_rows([record]).date[0] for record in records] == brute_force(station, start, end, ["date"])["date"]
+
+
+def test_take_over_memoryview():
+    column = memoryview(bytearray(range(10))).cast("h")
+    assert list(ds.take(column, range(1, 4))) == list(column[1:4])
+    assert list(ds.take(column, [3, 0])) == [column[3], column[0]]
+    assert ds.take(column, []).typecode == "h"
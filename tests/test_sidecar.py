@@ -0,0 +1,68 @@
+import os
+import mmap
+
+import modules.sidecar as sidecar
+from modules.table import COLUMNS, WeatherTable
+
+
+class TrackedMap(mmap.mmap):
+    opened = []
+
+    def __new__(cls, *args, **kwargs):
+        buffer = super().__new__(cls, *args, **kwargs)
+        cls.opened.append(buffer)
+        return buffer
+
+
+def columns(table: WeatherTable) -> dict:
+    return {name: list(getattr(table, name)) for name in COLUMNS}
+
+
+def rewrite(path: str, old: str, new: str):
+    with open(path, encoding="utf-8") as file:
+        lines = file.read().splitlines(keepends=True)
+    lines[-1] = lines[-1].replace(old, new, 1)
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+def test_stale_sidecar_is_rejected_or_fresh(dataset, monkeypatch):
+    monkeypatch.setattr(sidecar.mmap, "mmap", TrackedMap)
+    TrackedMap.opened.clear()
+    sidecar.write_sidecar(dataset)
+
+    # Файл только затронут: содержимое то же, таблица из файла-спутника годится
+    stat = os.stat(dataset)
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    table = sidecar.open_table(dataset)
+    assert table is not None
+    assert columns(table) == columns(WeatherTable.from_csv(dataset))
+    assert table.signature == (stat.st_mtime_ns + 10**9, stat.st_size)
+    del table
+
+    last = open(dataset, encoding="utf-8").read().splitlines()[-1].split(",")
+    pressure = last[2]
+    for old, new in ((pressure, str(int(pressure) % 9 + 1) + pressure[1:]), (pressure, pressure + "0")):
+        rewrite(dataset, old, new)
+        count = len(TrackedMap.opened)
+        assert sidecar.open_table(dataset) is None
+        # Отвергнутое отображение закрыто сразу, а не сборщиком мусора
+        assert all(buffer.closed for buffer in TrackedMap.opened[count:])
+        pressure = new
+
+    sidecar.write_sidecar(dataset)
+    table = sidecar.open_table(dataset)
+    assert table is not None
+    assert columns(table) == columns(WeatherTable.from_csv(dataset))
+
+
+def test_damaged_sidecar_is_closed(dataset, monkeypatch):
+    monkeypatch.setattr(sidecar.mmap, "mmap", TrackedMap)
+    TrackedMap.opened.clear()
+    target = sidecar.write_sidecar(dataset)
+    for size in (sidecar.HEADER.size - 1, os.path.getsize(target) - 2):
+        with open(target, "r+b") as file:
+            file.truncate(size)
+        assert sidecar.open_table(dataset) is None
+    assert len(TrackedMap.opened) == 2
+    assert all(buffer.closed for buffer in TrackedMap.opened)
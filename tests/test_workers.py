@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+
+import pytest
+
+from modules import division
+from modules.tasks import CancelToken, Cancelled
+from tests.helpers import make_dataset, run_until
+
+
+def wait_for_cancel(progress, cancel) -> None:
+    progress(0.5)
+    while True:
+        cancel.check()
+        time.sleep(0.001)
+
+
+def test_partition_cancel_removes_partial_output(tmp_path):
+    # Отмена проверяется раз в modules.tasks.PROGRESS_ROWS строк - файл должен быть заметно длиннее
+    dataset = str(tmp_path / "dataset.csv")
+    make_dataset(dataset, 40_000)
+    token = CancelToken()
+
+    def cancel_at(fraction: float) -> None:
+        if fraction > 0.2:
+            token.cancel()
+
+    with pytest.raises(Cancelled):
+        division.division_by_week(str(tmp_path), dataset, progress=cancel_at, cancel=token)
+    assert os.listdir(tmp_path) == ["dataset.csv"]
+
+
+def test_runner_delivers_cancel(app, runner):
+    outcome = []
+    runner.submit("split", wait_for_cancel, cancellable=True, on_progress=lambda fraction: runner.cancel("split"),
+                  on_done=lambda result: outcome.append("done"), on_cancelled=lambda: outcome.append("cancelled"))
+    run_until(app, lambda: outcome)
+    assert outcome == ["cancelled"]
+    assert not runner.busy("split")
+
+
+def test_cancelled_split_leaves_no_files(app, runner, tmp_path):
+    # Разбиение останавливается на середине, отмена запрашивается, пока задача ждёт, и только потом задача продолжается
+    dataset = str(tmp_path / "dataset.csv")
+    make_dataset(dataset, 40_000)
+    target = tmp_path / "weeks"
+    target.mkdir()
+    paused, release = threading.Event(), threading.Event()
+
+    def split(progress, cancel) -> None:
+        def report(fraction: float) -> None:
+            progress(fraction)
+            if fraction > 0.2 and not paused.is_set():
+                paused.set()
+                release.wait(60)
+
+        division.division_by_week(str(target), dataset, progress=report, cancel=cancel)
+
+    outcome = []
+    runner.submit("split", split, cancellable=True, on_done=lambda result: outcome.append("done"),
+                  on_cancelled=lambda: outcome.append("cancelled"))
+    run_until(app, paused.is_set)
+    assert os.listdir(target)
+    runner.cancel("split")
+    release.set()
+    run_until(app, lambda: outcome)
+    assert outcome == ["cancelled"]
+    assert os.listdir(target) == []
+
+
+def test_results_follow_submission_order(app, runner):
+    # Задачи одного потока выполняются в порядке запуска, в канале побеждает последняя
+    delivered = []
+    for number in range(20):
+        runner.submit(f"query {number}", lambda value: value, number, on_done=delivered.append)
+    for number in range(20):
+        runner.submit("info", lambda value: value, 100 + number, on_done=delivered.append)
+    run_until(app, lambda: not runner.current)
+    assert delivered == list(range(20)) + [119]
@@ -0,0 +1,152 @@
+from PyQt5 import QtCore
+
+from modules.tasks import CancelToken, Cancelled
+
+
+class WorkerSignals(QtCore.QObject):
+    """
+    WorkerSignals - это сигналы задачи Task. Объект создаётся в главном потоке, поэтому
+    сигналы, отправленные из потока пула, доставляются в цикл событий окна.
+    """
+
+    progress = QtCore.pyqtSignal(float)
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)
+    cancelled = QtCore.pyqtSignal()
+
+
+class Task(QtCore.QRunnable):
+    """
+    Task - это вызов функции в потоке QThreadPool. Результат, исключение или отмена
+    сообщаются сигналами WorkerSignals.
+
+    Аргументы:
+
+    function (callable): вызываемая функция
+    args, kwargs: её аргументы
+    cancellable (bool): передать ли функции аргументы progress и cancel
+      (как у modules.division.partition); такая функция при отмене сама убирает
+      свои результаты, а завершившаяся до отмены считается выполненной
+    Атрибуты:
+
+    signals (WorkerSignals): сигналы задачи
+    token (CancelToken): флаг отмены
+    """
+
+    def __init__(self, function, *args, cancellable: bool = False, **kwargs):
+        super().__init__()
+        # Задачей владеет TaskRunner, а не пул: так объект не удаляется, пока на него есть ссылки
+        self.setAutoDelete(False)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.token = CancelToken()
+        self.cancellable = cancellable
+        if cancellable:
+            self.kwargs.update(progress=self.signals.progress.emit, cancel=self.token)
+
+    def cancel(self) -> None:
+        self.token.cancel()
+
+    def run(self) -> None:
+        if self.token.is_set():
+            self.signals.cancelled.emit()
+            return
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except BaseException as error:
+            self.signals.failed.emit(error)
+        else:
+            # Записанное завершившейся функцией уже не отменить - о нём сообщается как о результате
+            if self.token.is_set() and not self.cancellable:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
+
+
+class TaskRunner(QtCore.QObject):
+    """
+    TaskRunner - это очередь задач окна. Задачи выполняются в собственном пуле потоков;
+    при max_threads=1 они выполняются строго в порядке запуска. Задачи одного канала
+    вытесняют друг друга: новая задача отменяет предыдущую, а результаты отменённых задач
+    не доставляются, поэтому устаревший ответ не перезапишет более новый.
+
+    Аргументы:
+
+    max_threads (int): количество потоков пула
+    parent (QObject): родительский объект
+    Методы:
+
+    submit(self, channel, function, *args, on_done, on_progress, on_error, on_cancelled, cancellable, **kwargs) -> Task:
+      Запускает функцию в пуле и вызывает обработчики в главном потоке.
+    cancel(self, channel=None) -> None:
+      Отменяет текущую задачу канала или все задачи.
+    wait(self, msecs=-1) -> bool:
+      Ждёт завершения всех задач пула.
+    """
+
+    def __init__(self, max_threads: int = 1, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.current = {}
+        self.__tasks = {}
+
+    def submit(self, channel: str, function, *args, on_done=None, on_progress=None, on_error=None,
+               on_cancelled=None, cancellable: bool = False, **kwargs) -> Task:
+        self.cancel(channel)
+        task = Task(function, *args, cancellable=cancellable, **kwargs)
+        self.current[channel] = task
+        self.__tasks[task.signals] = (channel, task, on_done, on_progress, on_error, on_cancelled)
+        task.signals.finished.connect(self.__finished)
+        task.signals.failed.connect(self.__failed)
+        task.signals.cancelled.connect(self.__cancelled)
+        task.signals.progress.connect(self.__progress)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, channel: str = None) -> None:
+        for name, task in list(self.current.items()):
+            if channel is None or name == channel:
+                task.cancel()
+
+    def busy(self, channel: str) -> bool:
+        return channel in self.current
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def __finish(self, signals, handler: int, *payload) -> None:
+        entry = self.__tasks.pop(signals, None)
+        if entry is None:
+            return
+        channel, task = entry[0], entry[1]
+        if self.current.get(channel) is task:
+            del self.current[channel]
+        # Отменённая или вытесненная задача завершается только обработчиком отмены,
+        # кроме отменяемой задачи, которая успела выполниться до отмены
+        if task.token.is_set() and not (handler == 2 and task.cancellable):
+            handler, payload = 5, ()
+        if entry[handler] is not None:
+            entry[handler](*payload)
+
+    @QtCore.pyqtSlot(object)
+    def __finished(self, result) -> None:
+        self.__finish(self.sender(), 2, result)
+
+    @QtCore.pyqtSlot(object)
+    def __failed(self, error) -> None:
+        self.__finish(self.sender(), 4, error)
+
+    @QtCore.pyqtSlot()
+    def __cancelled(self) -> None:
+        self.__finish(self.sender(), 5)
+
+    @QtCore.pyqtSlot(float)
+    def __progress(self, fraction: float) -> None:
+        entry = self.__tasks.get(self.sender())
+        if entry is not None and not entry[1].token.is_set() and entry[3] is not None:
+            entry[3](fraction)